@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark: request เร็วกับ request ช้าบน worker เดียวกัน
+
+เปรียบเทียบ query ช้าที่ใช้ Session แบบ sync (block event loop แบบเดิม)
+กับ AsyncSession ขณะที่มี client อื่นเรียก GET /api/v1/provinces/secondary พร้อมกัน
+
+    python benchmarks/bench_concurrency.py --slow-clients 4 --fast-clients 16 --duration 5
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import text
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from thaitour.main import app
+from thaitour.models import get_async_session, get_session
+
+# query ที่ใช้ CPU ใน SQLite ประมาณหลายร้อยมิลลิวินาที
+SLOW_QUERY = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) "
+    "SELECT count(*) FROM c"
+)
+
+@app.get("/__bench/slow-sync", include_in_schema=False)
+async def slow_sync(n: int = 1_000_000, session: Session = Depends(get_session)):
+    return {"count": session.exec(SLOW_QUERY, params={"n": n}).scalar()}
+
+@app.get("/__bench/slow-async", include_in_schema=False)
+async def slow_async(n: int = 1_000_000, session: AsyncSession = Depends(get_async_session)):
+    return {"count": (await session.exec(SLOW_QUERY, params={"n": n})).scalar()}
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def worker(client: httpx.AsyncClient, url: str, deadline: float, latencies: list[float]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(url)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+async def run_mode(mode: str, slow_clients: int, fast_clients: int, duration: float, n: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # warm up connection pool และ cache ของ SQLite
+        await client.get("/api/v1/provinces/secondary")
+
+        slow_latencies: list[float] = []
+        fast_latencies: list[float] = []
+        deadline = time.perf_counter() + duration
+        tasks = [
+            worker(client, f"/__bench/slow-{mode}?n={n}", deadline, slow_latencies)
+            for _ in range(slow_clients)
+        ] + [
+            worker(client, "/api/v1/provinces/secondary", deadline, fast_latencies)
+            for _ in range(fast_clients)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "slow_requests": len(slow_latencies),
+        "fast_requests": len(fast_latencies),
+        "fast_throughput_rps": round(len(fast_latencies) / elapsed, 1),
+        "fast_p50_ms": round(statistics.median(fast_latencies), 2) if fast_latencies else None,
+        "fast_p95_ms": round(percentile(fast_latencies, 95), 2),
+        "slow_p50_ms": round(statistics.median(slow_latencies), 2) if slow_latencies else None,
+    }
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slow-clients", type=int, default=4)
+    parser.add_argument("--fast-clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--n", type=int, default=1_000_000, help="ขนาดของ query ช้า")
+    args = parser.parse_args()
+
+    results = []
+    for mode in ("sync", "async"):
+        results.append(await run_mode(mode, args.slow_clients, args.fast_clients, args.duration, args.n))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Load test: latency ของผู้ใช้ปกติระหว่างมีการโจมตีแบบ credential stuffing
+
+รันกับฐานข้อมูลที่สร้างจาก scripts/init_db.py (สคริปต์จะเพิ่มผู้ใช้ bench-legit-* ให้เอง)
+
+    python benchmarks/bench_login_throttle.py --attackers 20 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from sqlmodel import Session, select
+
+from thaitour.core.config import settings
+from thaitour.core.security import get_password_hash
+from thaitour.main import app
+from thaitour.models import engine
+from thaitour.models.user_model import User, UserRole
+from thaitour.routers.v1.authentication_router import login_ip_limiter, login_username_limiter
+
+LEGIT_USERS = 50
+LEGIT_PASSWORD = "bench-secret"
+
+def ensure_legit_users() -> None:
+    """สร้างผู้ใช้สำหรับ traffic ปกติ (ใช้ hash เดียวกันเพื่อไม่ต้อง bcrypt ทีละคน)"""
+    hashed = get_password_hash(LEGIT_PASSWORD)
+    with Session(engine) as session:
+        existing = set(session.exec(select(User.username).where(User.username.like("bench-legit-%"))).all())
+        for i in range(LEGIT_USERS):
+            username = f"bench-legit-{i}"
+            if username not in existing:
+                session.add(User(username=username, hashed_password=hashed, role=UserRole.USER, is_active=True))
+        session.commit()
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def legit_traffic(duration: float, interval: float) -> list[float]:
+    """ผู้ใช้ปกติหลายคน (คนละ IP) ผลัดกัน login ทุก interval วินาที"""
+    latencies = []
+    deadline = time.perf_counter() + duration
+    request_number = 0
+    while time.perf_counter() < deadline:
+        user_index = request_number % LEGIT_USERS
+        request_number += 1
+        transport = httpx.ASGITransport(app=app, client=(f"198.51.100.{user_index + 1}", 50000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"username": f"bench-legit-{user_index}", "password": LEGIT_PASSWORD}
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.text
+        await asyncio.sleep(interval)
+    return latencies
+
+async def attacker(index: int, duration: float, counts: dict) -> None:
+    """ผู้โจมตีเดารหัสผ่านของบัญชีที่มีอยู่จริงต่อเนื่องจาก IP เดียว (ทุกครั้งต้องผ่าน bcrypt)"""
+    transport = httpx.ASGITransport(app=app, client=("203.0.113.66", 40000 + index))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + duration
+        attempt = 0
+        while time.perf_counter() < deadline:
+            attempt += 1
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"username": "admin", "password": f"guess-{index}-{attempt}"}
+            )
+            counts[response.status_code] = counts.get(response.status_code, 0) + 1
+            await asyncio.sleep(0)
+
+async def run_scenario(name: str, attackers: int, duration: float, interval: float) -> dict:
+    login_ip_limiter.reset()
+    login_username_limiter.reset()
+    counts: dict = {}
+    tasks = [asyncio.create_task(attacker(i, duration, counts)) for i in range(attackers)]
+    latencies = await legit_traffic(duration, interval)
+    await asyncio.gather(*tasks)
+    return {
+        "scenario": name,
+        "legit_requests": len(latencies),
+        "legit_p50_ms": round(statistics.median(latencies), 2),
+        "legit_p95_ms": round(percentile(latencies, 95), 2),
+        "legit_p99_ms": round(percentile(latencies, 99), 2),
+        "attack_responses": counts,
+    }
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attackers", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=0.2, help="ช่วงห่างระหว่าง login ของผู้ใช้ปกติ (วินาที)")
+    args = parser.parse_args()
+
+    ensure_legit_users()
+    results = [await run_scenario("baseline", 0, args.duration, args.interval)]
+
+    settings.login_rate_limit_enabled = False
+    results.append(await run_scenario("attack_unthrottled", args.attackers, args.duration, args.interval))
+
+    settings.login_rate_limit_enabled = True
+    results.append(await run_scenario("attack_throttled", args.attackers, args.duration, args.interval))
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    asyncio.run(main())
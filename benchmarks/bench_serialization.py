@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Serialization microbenchmark: หน้า 100 รายการของแต่ละ endpoint แบบเดิมเทียบกับ ResponseSerializer
+
+แบบเดิม: model_dump() -> response model -> FastAPI validate ซ้ำตาม response_model
+(serialize_response) -> json.dumps ของ JSONResponse
+(คอลัมน์ list เป็นชนิด JSON แล้ว จึงไม่มีขั้น json.loads ทีละคอลัมน์ในทั้งสองแบบ)
+แบบใหม่: validate จาก attribute ของ row ครั้งเดียว -> orjson
+
+วัด CPU ต่อหน้า (process_time) และหน่วยความจำสูงสุดที่จองระหว่างสร้างหน้า (tracemalloc)
+ไม่ใช้ฐานข้อมูล: row เป็น ORM object ที่สร้างในหน่วยความจำ
+
+    python benchmarks/bench_serialization.py --items 100 --iterations 300
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from thaitour.models.province_model import Province, ProvinceType
+from thaitour.models.registration_model import Registration, RegistrationStatus
+from thaitour.models.tax_model import TaxBenefit, TaxBenefitType
+from thaitour.routers.v1.province_router import province_response
+from thaitour.routers.v1.registration_router import registration_response
+from thaitour.routers.v1.tax_router import benefit_response
+from thaitour.schemas.province_schema import ProvinceResponse
+from thaitour.schemas.registration_schema import RegistrationResponse
+from thaitour.schemas.tax_schema import TaxBenefitResponse
+
+NOW = datetime(2025, 6, 1, 12, 30, 15, 123456)
+
+def make_provinces(count: int) -> list:
+    return [
+        Province(
+            id=index, name_th=f"จังหวัดที่ {index}", name_en=f"Province {index}", code=f"P{index:03d}",
+            province_type=ProvinceType.SECONDARY if index % 3 else ProvinceType.PRIMARY, region="เหนือ",
+            description="จังหวัดท่องเที่ยวเมืองรอง " * 4,
+            famous_attractions=["ดอยสูง", "น้ำตก", "วัดเก่า"],
+            local_specialties=["ผ้าทอ", "กาแฟ"],
+            tax_reduction_percentage=15.0, max_reduction_amount=15000.0, is_active=True, created_at=NOW,
+        )
+        for index in range(1, count + 1)
+    ]
+
+def make_benefits(count: int) -> list:
+    return [
+        TaxBenefit(
+            id=index, benefit_name=f"สิทธิประโยชน์ {index}", benefit_type=TaxBenefitType.SECONDARY_PROVINCE,
+            description="ลดหย่อนภาษีสำหรับการท่องเที่ยวเมืองรอง", province_id=None,
+            applicable_provinces=list(range(1, 11)),
+            reduction_percentage=15.0, max_reduction_amount=15000.0, min_spending_amount=1000.0,
+            eligible_activities=["ที่พัก", "ร้านอาหาร"],
+            required_documents=["ใบกำกับภาษี"],
+            start_date=NOW, end_date=NOW + timedelta(days=365), is_active=True, created_at=NOW,
+        )
+        for index in range(1, count + 1)
+    ]
+
+def make_registrations(count: int) -> list:
+    return [
+        Registration(
+            id=index, user_id=index, citizen_id=f"{index:013d}", first_name="สมชาย", last_name="ใจดี",
+            email=f"user{index}@example.com", phone="0812345678", date_of_birth=datetime(1990, 1, 1),
+            address="123 ถนนสุขุมวิท", province="กรุงเทพมหานคร", district="วัฒนา", sub_district="คลองเตยเหนือ",
+            postal_code="10110", status=RegistrationStatus.PENDING, registration_date=NOW, approved_date=None,
+            target_provinces=["น่าน", "เลย", "ตราด"],
+            interests=["ธรรมชาติ", "อาหาร"], created_at=NOW,
+        )
+        for index in range(1, count + 1)
+    ]
+
+def _run(coroutine):
+    # serialize_response ของ endpoint แบบ async ไม่ await อะไรจริง จึงขับ coroutine ตรง ๆ ได้
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("serialize_response awaited unexpectedly")
+
+def legacy_page(rows: list, model) -> bytes:
+    """ขั้นตอนเดิมของ handler + FastAPI + JSONResponse"""
+    result = [model(**row.model_dump()) for row in rows]
+    field = create_model_field("Response", List[model], mode="serialization")
+    content = _run(serialize_response(field=field, response_content=result, is_coroutine=True))
+    return JSONResponse(content).body
+
+ENDPOINTS = {
+    "GET /api/v1/provinces/": (make_provinces, ProvinceResponse, province_response),
+    "GET /api/v1/tax/benefits": (make_benefits, TaxBenefitResponse, benefit_response),
+    "GET /api/v1/registration/": (make_registrations, RegistrationResponse, registration_response),
+}
+
+def measure(function, iterations: int) -> dict:
+    function()  # warm up (สร้าง validator/field ครั้งแรก)
+    started = time.process_time()
+    for _ in range(iterations):
+        function()
+    cpu = (time.process_time() - started) / iterations
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"cpu_ms": round(cpu * 1000, 3), "peak_kib": round(peak / 1024, 1)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100, help="จำนวนรายการต่อหน้า")
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    results = {}
+    for endpoint, (factory, model, serializer) in ENDPOINTS.items():
+        rows = factory(args.items)
+        legacy = lambda: legacy_page(rows, model)
+        fast = lambda: serializer.dumps_many(rows)
+        assert json.loads(legacy()) == json.loads(fast()), f"{endpoint}: payloads differ"
+
+        before, after = measure(legacy, args.iterations), measure(fast, args.iterations)
+        results[endpoint] = {
+            "legacy": before,
+            "serializer": after,
+            "cpu_speedup": round(before["cpu_ms"] / after["cpu_ms"], 2),
+            "peak_memory_ratio": round(before["peak_kib"] / after["peak_kib"], 2),
+        }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Write-concurrency benchmark: SQLite แบบค่าเริ่มต้นเทียบกับ WAL + synchronous=NORMAL
+
+writer หลาย thread insert ทีละ transaction (เหมือนการลงทะเบียน) พร้อม reader ที่ query ตลอดเวลา
+
+    python benchmarks/bench_sqlite_writes.py --writers 8 --rows 300
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from thaitour.core.config import Settings
+from thaitour.models import build_engine
+
+PROFILES = {
+    # ค่าเริ่มต้นของ SQLite (rollback journal, fsync ทุก commit)
+    "default": Settings(
+        sqlite_journal_mode="DELETE", sqlite_synchronous="FULL",
+        sqlite_busy_timeout_ms=5000, sqlite_cache_size=-2000, sqlite_mmap_size=0,
+        db_pool_size=20, db_max_overflow=0,
+    ),
+    "tuned": Settings(db_pool_size=20, db_max_overflow=0),
+}
+
+def run_profile(name: str, config: Settings, writers: int, rows: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="thaitour-bench-")
+    engine = build_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", config)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE item (id INTEGER PRIMARY KEY, citizen_id TEXT, payload TEXT, created_at REAL)"
+        ))
+        connection.execute(text("CREATE INDEX ix_item_citizen_id ON item (citizen_id)"))
+
+    latencies: list[float] = []
+    errors = 0
+    reads = 0
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def writer(index: int) -> None:
+        nonlocal errors
+        for row in range(rows):
+            started = time.perf_counter()
+            try:
+                with engine.begin() as connection:
+                    connection.execute(
+                        text("INSERT INTO item (citizen_id, payload, created_at) VALUES (:c, :p, :t)"),
+                        {"c": f"{index:04d}{row:09d}", "p": "x" * 500, "t": time.time()},
+                    )
+            except OperationalError:
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    def reader() -> None:
+        nonlocal reads
+        while not stop.is_set():
+            with engine.connect() as connection:
+                connection.execute(text("SELECT count(*) FROM item WHERE citizen_id LIKE '0001%'")).scalar()
+            reads += 1
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    reader_thread.join()
+    engine.dispose()
+
+    ordered = sorted(latencies)
+    return {
+        "profile": name,
+        "writes": len(latencies),
+        "errors": errors,
+        "writes_per_second": round(len(latencies) / elapsed, 1),
+        "write_p50_ms": round(statistics.median(ordered), 2) if ordered else None,
+        "write_p99_ms": round(ordered[int(0.99 * (len(ordered) - 1))], 2) if ordered else None,
+        "concurrent_reads": reads,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=300, help="จำนวนแถวต่อ writer")
+    args = parser.parse_args()
+
+    results = [run_profile(name, config, args.writers, args.rows) for name, config in PROFILES.items()]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
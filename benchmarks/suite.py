@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite ของ API หลัก: รันทุก scenario บนฐานข้อมูลใหม่ที่สร้างตามขนาดที่กำหนด
+แล้วรายงาน throughput และ p50/p95/p99 ต่อ endpoint เป็น JSON
+
+scenario:
+    signup_wave     ลงทะเบียนพร้อมกันจำนวนมาก (bcrypt + insert)
+    catalog_storm   เปิดดูรายการจังหวัด/สิทธิประโยชน์
+    tax_burst       คำนวณลดหย่อนภาษีเป็นชุด ๆ พร้อมกัน
+    admin_paging    admin ไล่เปิดรายการลงทะเบียนทีละหน้า
+
+    python benchmarks/suite.py --registrations 20000 --output bench.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --tolerance 0.2
+    python benchmarks/suite.py --scenario catalog_storm --save-baseline benchmarks/baseline.json
+
+ค่าเริ่มต้นรันในโปรเซสเดียวกันผ่าน ASGI transport บน SQLite ชั่วคราว
+ใช้ --url/--database-url เพื่อยิงเซิร์ฟเวอร์จริง (ต้องชี้ไปที่ฐานข้อมูลเดียวกับเซิร์ฟเวอร์)
+"""
+
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# scripts/generate_dataset.py สร้างชุดข้อมูล registration
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+SCENARIOS = ("signup_wave", "catalog_storm", "tax_burst", "admin_paging")
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+class Recorder:
+    """เก็บ latency ต่อ endpoint ของ scenario เดียว"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    async def call(self, client, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies.setdefault(label, []).append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[label] = self.errors.get(label, 0) + 1
+        return response
+
+    def finish(self) -> None:
+        self.elapsed = time.perf_counter() - self.started
+
+    def report(self) -> dict:
+        endpoints = {}
+        for label, values in sorted(self.latencies.items()):
+            endpoints[label] = {
+                "requests": len(values),
+                "errors": self.errors.get(label, 0),
+                "throughput_rps": round(len(values) / self.elapsed, 1),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "duration_s": round(self.elapsed, 3),
+            "requests": total,
+            "throughput_rps": round(total / self.elapsed, 1),
+            "endpoints": endpoints,
+        }
+
+async def run_concurrently(jobs, concurrency: int) -> None:
+    """รัน coroutine factory ทั้งหมดโดยมี worker พร้อมกันไม่เกิน concurrency"""
+    queue = list(reversed(jobs))
+
+    async def worker():
+        while queue:
+            await queue.pop()()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+def registration_payload(rng: random.Random, index: int) -> dict:
+    return {
+        "citizen_id": f"9{index:012d}",
+        "first_name": rng.choice(["สมชาย", "สมหญิง", "วิชัย", "มาลี", "ประเสริฐ"]),
+        "last_name": rng.choice(["ใจดี", "รักไทย", "สุขสันต์", "มั่นคง"]),
+        "email": f"bench-signup-{index}@example.com",
+        "phone": f"08{rng.randrange(10 ** 8):08d}",
+        "date_of_birth": "1990-01-01T00:00:00",
+        "password": "bench-secret",
+        "address": "1 ถนนทดสอบ",
+        "province": "กรุงเทพมหานคร",
+        "district": "ทดสอบ",
+        "sub_district": "ทดสอบ",
+        "postal_code": "10000",
+        "target_provinces": rng.sample(["กาญจนบุรี", "เชียงราย", "ลำปาง", "ระยอง"], 2),
+        "interests": ["ธรรมชาติ"],
+    }
+
+async def signup_wave(client, ctx, recorder, requests: int, concurrency: int) -> None:
+    rng = random.Random(ctx["seed"])
+    jobs = [
+        (lambda i=i: recorder.call(
+            client, "POST /api/v1/registration/", "POST", "/api/v1/registration/",
+            json=registration_payload(rng, i),
+        ))
+        for i in range(requests)
+    ]
+    await run_concurrently(jobs, concurrency)
+
+async def catalog_storm(client, ctx, recorder, requests: int, concurrency: int) -> None:
+    rng = random.Random(ctx["seed"])
+    routes = [
+        ("GET /api/v1/provinces/", lambda: "/api/v1/provinces/"),
+        ("GET /api/v1/provinces/secondary", lambda: "/api/v1/provinces/secondary"),
+        ("GET /api/v1/provinces/{province_id}", lambda: f"/api/v1/provinces/{rng.choice(ctx['province_ids'])}"),
+        ("GET /api/v1/tax/benefits", lambda: "/api/v1/tax/benefits"),
+        ("GET /api/v1/tax/benefits/secondary-provinces", lambda: "/api/v1/tax/benefits/secondary-provinces"),
+    ]
+    jobs = []
+    for _ in range(requests):
+        label, url = rng.choice(routes)
+        jobs.append(lambda label=label, url=url(): recorder.call(client, label, "GET", url))
+    await run_concurrently(jobs, concurrency)
+
+async def tax_burst(client, ctx, recorder, requests: int, concurrency: int) -> None:
+    """ยิงเป็นชุดละ concurrency * 4 request พร้อมกัน เว้นช่วงสั้น ๆ ระหว่างชุด"""
+    rng = random.Random(ctx["seed"])
+    burst = concurrency * 4
+    sent = 0
+    while sent < requests:
+        size = min(burst, requests - sent)
+        await asyncio.gather(*(
+            recorder.call(
+                client, "POST /api/v1/tax/calculate", "POST", "/api/v1/tax/calculate",
+                json={
+                    "citizen_id": f"1{rng.randrange(10 ** 12):012d}",
+                    "province_id": rng.choice(ctx["province_ids"]),
+                    "spending_amount": round(rng.uniform(500, 50000), 2),
+                    "activities": ["ที่พัก", "อาหาร"],
+                },
+            )
+            for _ in range(size)
+        ))
+        sent += size
+        await asyncio.sleep(0.05)
+
+async def admin_paging(client, ctx, recorder, requests: int, concurrency: int) -> None:
+    headers = {"Authorization": f"Bearer {ctx['admin_token']}"}
+    page_size = 100
+    pages = max(1, ctx["registrations"] // page_size)
+    jobs = [
+        (lambda page=page: recorder.call(
+            client, "GET /api/v1/registration/", "GET",
+            f"/api/v1/registration/?skip={(page % pages) * page_size}&limit={page_size}",
+            headers=headers,
+        ))
+        for page in range(requests)
+    ]
+    await run_concurrently(jobs, concurrency)
+
+SCENARIO_FUNCTIONS = {
+    "signup_wave": signup_wave,
+    "catalog_storm": catalog_storm,
+    "tax_burst": tax_burst,
+    "admin_paging": admin_paging,
+}
+
+def prepare_dataset(registrations: int, seed: int) -> dict:
+    """
+    สร้าง schema และข้อมูลตั้งต้น: จังหวัด, สิทธิประโยชน์ที่ยังไม่หมดอายุ, admin
+    และ registration จาก scripts/generate_dataset.py (ต้องเรียกหลังตั้ง DATABASE_URL แล้วเท่านั้น)
+    """
+    from sqlmodel import Session, func, select
+
+    from thaitour.core.security import create_access_token, get_password_hash, user_token_claims
+    from thaitour.migrations import MigrationRunner
+    from thaitour.models import create_db_and_tables, engine
+    from thaitour.models.province_model import Province, ProvinceType
+    from thaitour.models.registration_model import Registration
+    from thaitour.models.tax_model import TaxBenefit, TaxBenefitType
+    from thaitour.models.user_model import User, UserRole
+    from thaitour.core.config import settings
+    from generate_dataset import generate_dataset
+
+    create_db_and_tables()
+    MigrationRunner(engine, log=lambda message: None).upgrade()
+    now = datetime.utcnow()
+
+    with Session(engine) as session:
+        if not session.exec(select(Province)).first():
+            names = [(name, ProvinceType.PRIMARY) for name in settings.primary_provinces]
+            names += [(name, ProvinceType.SECONDARY) for name in settings.secondary_provinces]
+            for index, (name, province_type) in enumerate(names):
+                secondary = province_type == ProvinceType.SECONDARY
+                session.add(Province(
+                    name_th=name, name_en=f"Province {index}", code=f"P{index:02d}",
+                    province_type=province_type, region="กลาง", description=name,
+                    famous_attractions=["วัด", "น้ำตก"], local_specialties=["อาหารพื้นเมือง"],
+                    tax_reduction_percentage=30.0 if secondary else 0.0,
+                    max_reduction_amount=15000.0 if secondary else 0.0,
+                ))
+            session.add(TaxBenefit(
+                benefit_name="ลดหย่อนภาษีจังหวัดรอง (benchmark)",
+                benefit_type=TaxBenefitType.SECONDARY_PROVINCE,
+                description="ลดหย่อนภาษี 30% สำหรับจังหวัดรอง",
+                reduction_percentage=30.0, max_reduction_amount=15000.0, min_spending_amount=1000.0,
+                eligible_activities=["ที่พัก", "อาหาร"], required_documents=["ใบเสร็จ"],
+                start_date=now - timedelta(days=30), end_date=now + timedelta(days=365), is_active=True,
+            ))
+            session.add(User(
+                username="bench-admin", hashed_password=get_password_hash("bench-secret"),
+                email="bench-admin@example.com", role=UserRole.ADMIN, is_active=True, is_verified=True,
+            ))
+            session.commit()
+
+        existing = session.exec(select(func.count()).select_from(Registration)).one()
+        if existing < registrations:
+            generate_dataset(engine, registrations - existing, seed=seed, log=lambda message: None)
+
+        admin = session.exec(select(User).where(User.username == "bench-admin")).one()
+        province_ids = list(session.exec(select(Province.id)).all())
+        return {
+            "seed": seed,
+            "registrations": registrations,
+            "province_ids": province_ids,
+            "admin_token": create_access_token(admin.username, claims=user_token_claims(admin)),
+        }
+
+async def run_suite(args) -> dict:
+    import httpx
+
+    ctx = prepare_dataset(args.registrations, args.seed)
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        from thaitour.main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+
+    from thaitour.models import async_engine
+
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60.0) as client:
+        for name in args.scenario or SCENARIOS:
+            recorder = Recorder()
+            await SCENARIO_FUNCTIONS[name](client, ctx, recorder, args.requests, args.concurrency)
+            recorder.finish()
+            results[name] = recorder.report()
+    # ปิด connection ของ aiosqlite (แต่ละ connection มี thread ของตัวเอง)
+    await async_engine.dispose()
+
+    return {
+        "meta": {
+            "registrations": args.registrations,
+            "requests_per_scenario": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "target": args.url or "in-process",
+            "python": sys.version.split()[0],
+        },
+        "scenarios": results,
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """
+    เทียบกับ baseline: ถือว่าถดถอยเมื่อ p95 สูงขึ้นหรือ throughput ลดลงเกิน tolerance
+    """
+    regressions = []
+    for scenario, report in results["scenarios"].items():
+        base_endpoints = baseline.get("scenarios", {}).get(scenario, {}).get("endpoints", {})
+        for label, current in report["endpoints"].items():
+            base = base_endpoints.get(label)
+            if not base:
+                continue
+            checks = [
+                ("p95_ms", current["p95_ms"] > base["p95_ms"] * (1 + tolerance)),
+                ("throughput_rps", current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance)),
+                ("errors", current["errors"] > base["errors"]),
+            ]
+            for metric, regressed in checks:
+                if regressed:
+                    regressions.append({
+                        "scenario": scenario, "endpoint": label, "metric": metric,
+                        "baseline": base[metric], "current": current[metric],
+                    })
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="เลือก scenario (ระบุซ้ำได้)")
+    parser.add_argument("--registrations", type=int, default=5000, help="จำนวน registration ในชุดข้อมูล")
+    parser.add_argument("--requests", type=int, default=500, help="จำนวน request ต่อ scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="ยิงเซิร์ฟเวอร์จริงแทนการรันในโปรเซส")
+    parser.add_argument("--database-url", help="ฐานข้อมูลที่ใช้สร้างชุดข้อมูล (ค่าเริ่มต้น: SQLite ชั่วคราว)")
+    parser.add_argument("--output", help="เขียนผลลัพธ์ลงไฟล์ JSON")
+    parser.add_argument("--baseline", help="ไฟล์ผลลัพธ์เดิมสำหรับเปรียบเทียบ")
+    parser.add_argument("--save-baseline", help="บันทึกผลลัพธ์นี้เป็น baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="ยอมให้แย่ลงได้กี่สัดส่วน (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.url and not args.database_url:
+        parser.error("--url ต้องระบุ --database-url ของเซิร์ฟเวอร์นั้นด้วย")
+
+    # ต้องตั้งค่าก่อน import thaitour (Settings ถูกอ่านตอน import)
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='thaitour-suite-'), 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+
+    results = asyncio.run(run_suite(args))
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        results["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    print(output)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as file:
+            file.write(output + "\n")
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
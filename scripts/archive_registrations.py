@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+ย้ายการลงทะเบียนเก่าไปตาราง registrationarchive ตามนโยบายใน Settings
+
+    python scripts/archive_registrations.py --dry-run
+    python scripts/archive_registrations.py [--chunk-size 500] [--pause 0.05]
+    python scripts/archive_registrations.py --statuses rejected --min-age-days 30 --registered-before 2025-01-01
+
+ค่าเริ่มต้นอ่านจาก ARCHIVE_STATUSES, ARCHIVE_MIN_AGE_DAYS และ ARCHIVE_REGISTERED_BEFORE
+แต่ละ chunk เป็น transaction ของตัวเอง รันซ้ำหรือหยุดกลางทางได้อย่างปลอดภัย
+"""
+
+import argparse
+from dataclasses import replace
+from datetime import datetime
+
+from thaitour.core.archive import ArchivePolicy, archive_registrations
+from thaitour.models import engine
+from thaitour.models.registration_model import RegistrationStatus
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--statuses", nargs="*", choices=[s.value for s in RegistrationStatus], help="สถานะที่ย้าย")
+    parser.add_argument("--min-age-days", type=int, help="ไม่ถูกแก้ไขมาแล้วอย่างน้อยกี่วัน")
+    parser.add_argument("--registered-before", type=datetime.fromisoformat, help="ย้ายทุกแถวที่ลงทะเบียนก่อนวันนี้")
+    parser.add_argument("--chunk-size", type=int, help="จำนวนแถวต่อ transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="หน่วงระหว่าง chunk (วินาที)")
+    parser.add_argument("--dry-run", action="store_true", help="นับจำนวนแถวที่จะย้ายเท่านั้น")
+    args = parser.parse_args()
+
+    policy = ArchivePolicy.from_settings()
+    if args.statuses is not None:
+        policy = replace(policy, statuses=tuple(RegistrationStatus(value) for value in args.statuses))
+    if args.min_age_days is not None:
+        policy = replace(policy, min_age_days=args.min_age_days)
+    if args.registered_before is not None:
+        policy = replace(policy, registered_before=args.registered_before)
+
+    if args.dry_run:
+        count = archive_registrations(engine, policy, dry_run=True)
+        print(f"ℹ️ มี {count} แถวที่ตรงนโยบาย")
+        return
+
+    print("📦 เริ่มย้ายการลงทะเบียนไปตาราง archive")
+    moved = archive_registrations(engine, policy, chunk_size=args.chunk_size, pause_seconds=args.pause)
+    print(f"🎉 ย้ายเรียบร้อย {moved} แถว")
+
+if __name__ == "__main__":
+    main()
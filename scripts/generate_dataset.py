@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator สำหรับ ThaiTour
+สร้าง registration (พร้อม User Account) จำนวนมากแบบ deterministic: seed เดียวกันได้ข้อมูลเดียวกันเสมอ
+
+    python scripts/generate_dataset.py --registrations 1000000 --workers 8
+    python scripts/generate_dataset.py --registrations 10000000 --defer-indexes
+
+worker หลายโปรเซสสร้างแถว (ส่วนที่ใช้ CPU) เป็น chunk ส่วนโปรเซสหลักเขียนลงฐานข้อมูล
+ด้วย executemany ของ driver โดยตรง (ข้าม ORM และ type processing ของ SQLAlchemy)
+"""
+
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+from typing import Callable
+import argparse
+import hashlib
+import json
+import random
+import time
+
+import bcrypt
+from sqlalchemy import func, select
+
+# ใช้ hash เดียวกันทุกบัญชี (bcrypt ต่อแถวจะใช้เวลาหลายวันสำหรับ 10 ล้านแถว)
+DEFAULT_PASSWORD = "thaitour-dataset"
+
+FIRST_NAMES = [
+    "สมชาย", "สมหญิง", "วิชัย", "มาลี", "ประเสริฐ", "สุดา", "อนันต์", "กาญจนา", "ธนพล", "ปวีณา",
+    "ณัฐวุฒิ", "พิมพ์ชนก", "กิตติ", "อรุณี", "ชัยวัฒน์", "จิราพร", "สุรชัย", "วรรณา", "ธีรพงษ์", "นภัสสร",
+    "ศักดิ์ชัย", "รัตนา", "อภิชาติ", "ศิริพร", "เกียรติศักดิ์", "ปิยะนุช", "วีระพงษ์", "สุภาพร", "ภานุวัฒน์", "ชุติมา",
+]
+LAST_NAMES = [
+    "ใจดี", "รักไทย", "สุขสันต์", "มั่นคง", "ศรีสุข", "วงศ์ใหญ่", "ทองดี", "แก้วมณี", "บุญมา", "สายทอง",
+    "พรหมมา", "จันทร์เพ็ญ", "ศรีวงศ์", "เพชรรัตน์", "อินทร์แก้ว", "สมบูรณ์", "ประเสริฐศรี", "ชัยมงคล", "รุ่งเรือง", "พึ่งบุญ",
+]
+PROVINCES = [
+    "กรุงเทพมหานคร", "กระบี่", "กาญจนบุรี", "กาฬสินธุ์", "กำแพงเพชร", "ขอนแก่น", "จันทบุรี", "ฉะเชิงเทรา",
+    "ชลบุรี", "ชัยนาท", "ชัยภูมิ", "ชุมพร", "เชียงราย", "เชียงใหม่", "ตรัง", "ตราด", "ตาก", "นครนายก",
+    "นครปฐม", "นครพนม", "นครราชสีมา", "นครศรีธรรมราช", "นครสวรรค์", "นนทบุรี", "นราธิวาส", "น่าน",
+    "บึงกาฬ", "บุรีรัมย์", "ปทุมธานี", "ประจวบคีรีขันธ์", "ปราจีนบุรี", "ปัตตานี", "พระนครศรีอยุธยา",
+    "พะเยา", "พังงา", "พัทลุง", "พิจิตร", "พิษณุโลก", "เพชรบุรี", "เพชรบูรณ์", "แพร่", "ภูเก็ต",
+    "มหาสารคาม", "มุกดาหาร", "แม่ฮ่องสอน", "ยโสธร", "ยะลา", "ร้อยเอ็ด", "ระนอง", "ระยอง", "ราชบุรี",
+    "ลพบุรี", "ลำปาง", "ลำพูน", "เลย", "ศรีสะเกษ", "สกลนคร", "สงขลา", "สตูล", "สมุทรปราการ",
+    "สมุทรสงคราม", "สมุทรสาคร", "สระแก้ว", "สระบุรี", "สิงห์บุรี", "สุโขทัย", "สุพรรณบุรี", "สุราษฎร์ธานี",
+    "สุรินทร์", "หนองคาย", "หนองบัวลำภู", "อ่างทอง", "อำนาจเจริญ", "อุดรธานี", "อุตรดิตถ์", "อุทัยธานี",
+    "อุบลราชธานี",
+]
+INTERESTS = ["ธรรมชาติ", "วัฒนธรรม", "อาหาร", "ประวัติศาสตร์", "ทะเล", "ภูเขา", "ช้อปปิ้ง", "ผจญภัย"]
+
+# สัดส่วนสถานะ (ใกล้เคียงระบบจริง: ส่วนใหญ่อนุมัติแล้ว)
+STATUS_WEIGHTS = [("APPROVED", 50), ("ACTIVE", 20), ("PENDING", 20), ("REJECTED", 5), ("SUSPENDED", 5)]
+
+# รูปแบบเดียวกับที่ SQLAlchemy ใช้เก็บ DateTime ใน SQLite (Postgres รับรูปแบบนี้ได้)
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+USER_COLUMNS = (
+    "id", "username", "hashed_password", "email", "full_name", "role",
+    "is_active", "is_verified", "token_version", "created_at",
+)
+REGISTRATION_COLUMNS = (
+    "id", "user_id", "citizen_id", "first_name", "last_name", "email", "phone", "date_of_birth",
+    "address", "province", "district", "sub_district", "postal_code", "status", "registration_date",
+    "approved_date", "approved_by", "target_provinces", "interests", "created_at",
+)
+
+def citizen_id_check_digit(first12: str) -> int:
+    """หลักตรวจสอบของเลขบัตรประชาชน: (11 - (Σ d[i] * (13 - i)) mod 11) mod 10"""
+    total = sum(int(digit) * (13 - index) for index, digit in enumerate(first12))
+    return (11 - total % 11) % 10
+
+def is_valid_citizen_id(citizen_id: str) -> bool:
+    return (
+        len(citizen_id) == 13
+        and citizen_id.isdigit()
+        and citizen_id_check_digit(citizen_id[:12]) == int(citizen_id[12])
+    )
+
+def make_citizen_id(index: int, rng: random.Random) -> str:
+    """
+    เลขบัตรที่ไม่ซ้ำกันตาม index: 11 หลักกลางเป็น bijection ของ index (คูณด้วยเลขที่ coprime กับ 10)
+    """
+    middle = (index * 7_919_113 + 12_345) % 10 ** 11
+    first12 = f"{rng.randint(1, 8)}{middle:011d}"
+    return first12 + str(citizen_id_check_digit(first12))
+
+def dataset_password_hash(seed: int) -> str:
+    """
+    bcrypt hash ของ DEFAULT_PASSWORD ที่ salt มาจาก seed (hash ปกติใช้ salt สุ่ม ทำให้ข้อมูลไม่เหมือนเดิม)
+    """
+    alphabet = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+    digest = hashlib.sha256(f"thaitour-dataset:{seed}".encode()).digest()
+    # salt 22 ตัวอักษร: ตัวสุดท้ายเก็บได้แค่ 2 บิต (., O, e, u)
+    salt = "".join(alphabet[byte % 64] for byte in digest[:21]) + alphabet[(digest[21] % 4) * 16]
+    return bcrypt.hashpw(DEFAULT_PASSWORD.encode(), f"$2b$12${salt}".encode()).decode()
+
+def _format(value: datetime) -> str:
+    return value.strftime(DATETIME_FORMAT)
+
+def generate_chunk(task: tuple) -> tuple[list, list]:
+    """
+    สร้างแถว user และ registration ของ index [start, stop)
+    ใช้ Random ที่ seed จาก (seed, start) จึงได้ผลเดิมไม่ว่า worker ใดเป็นผู้สร้าง
+    """
+    seed, start, stop, user_id_offset, registration_id_offset, hashed_password = task
+    rng = random.Random(f"{seed}:{start}")
+    epoch = datetime(2024, 1, 1)
+    statuses = [status for status, _ in STATUS_WEIGHTS]
+    weights = [weight for _, weight in STATUS_WEIGHTS]
+
+    users, registrations = [], []
+    for index in range(start, stop):
+        # เลขลำดับรวมข้อมูลเดิม: เพิ่มข้อมูลต่อท้ายฐานข้อมูลเดิมได้โดย email/เลขบัตรไม่ซ้ำ
+        number = registration_id_offset + index
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        email = f"traveler{number}@dataset.thaitour.example"
+        created_at = epoch + timedelta(seconds=rng.randrange(60 * 60 * 24 * 600))
+        status = rng.choices(statuses, weights)[0]
+        approved = status in ("APPROVED", "ACTIVE", "SUSPENDED")
+        user_id = user_id_offset + index
+        province = rng.choice(PROVINCES)
+
+        users.append((
+            user_id, email, hashed_password, email, f"{first_name} {last_name}", "USER",
+            status != "SUSPENDED", True, 0, _format(created_at),
+        ))
+        registrations.append((
+            number, user_id, make_citizen_id(number, rng), first_name, last_name, email,
+            f"0{rng.choice('689')}{rng.randrange(10 ** 8):08d}",
+            _format(datetime(1950, 1, 1) + timedelta(days=rng.randrange(365 * 55))),
+            f"{rng.randint(1, 999)}/{rng.randint(1, 99)} หมู่ {rng.randint(1, 15)}",
+            province, f"เมือง{province}", f"ตำบล{rng.randint(1, 20)}", f"{rng.randint(10, 96)}{rng.randrange(1000):03d}",
+            status, _format(created_at),
+            _format(created_at + timedelta(days=rng.randint(1, 14))) if approved else None,
+            "admin" if approved else None,
+            json.dumps(rng.sample(PROVINCES, rng.randint(1, 4)), ensure_ascii=False),
+            json.dumps(rng.sample(INTERESTS, rng.randint(1, 3)), ensure_ascii=False),
+            _format(created_at),
+        ))
+    return users, registrations
+
+def _insert_sql(connection, table: str, columns: tuple) -> str:
+    style = connection.dialect.paramstyle
+    placeholder = "?" if style == "qmark" else "%s"
+    quoted_table = connection.dialect.identifier_preparer.quote(table)
+    return f"INSERT INTO {quoted_table} ({', '.join(columns)}) VALUES ({', '.join([placeholder] * len(columns))})"
+
+def generate_dataset(engine, registrations: int, seed: int = 42, workers: int = 4, chunk_size: int = 10000,
+                     defer_indexes: bool = False, log: Callable[[str], None] = print) -> int:
+    """
+    เพิ่ม registration (และ user) จำนวน registrations แถวต่อท้ายข้อมูลเดิม คืนจำนวนแถวที่สร้าง
+    """
+    from thaitour.models.registration_model import Registration, reserve_registration_ids
+    from thaitour.models.user_model import User
+
+    user_table, registration_table = User.__table__, Registration.__table__
+    with engine.begin() as connection:
+        user_id_offset = (connection.execute(select(func.max(user_table.c.id))).scalar() or 0) + 1
+        # จองช่วง id ไว้ก่อน: ไม่ชนกับแถวที่ archive แล้วหรือ registration ที่สร้างระหว่างโหลด
+        registration_id_offset = reserve_registration_ids(connection, registrations)
+    hashed_password = dataset_password_hash(seed)
+
+    tasks = [
+        (seed, start, min(start + chunk_size, registrations), user_id_offset, registration_id_offset, hashed_password)
+        for start in range(0, registrations, chunk_size)
+    ]
+
+    indexes = [index for table in (user_table, registration_table) for index in table.indexes]
+    if defer_indexes:
+        # สร้าง index ครั้งเดียวหลังโหลดเสร็จ เร็วกว่าอัปเดต index ทุกแถว
+        with engine.begin() as connection:
+            for index in indexes:
+                index.drop(connection, checkfirst=True)
+
+    started = time.perf_counter()
+    written = 0
+    with Pool(workers) as pool, engine.begin() as connection:
+        user_sql = _insert_sql(connection, user_table.name, USER_COLUMNS)
+        registration_sql = _insert_sql(connection, registration_table.name, REGISTRATION_COLUMNS)
+        # imap รักษาลำดับ chunk: id และข้อมูลเหมือนเดิมทุกครั้งที่ใช้ seed เดียวกัน
+        for users, rows in pool.imap(generate_chunk, tasks):
+            connection.exec_driver_sql(user_sql, users)
+            connection.exec_driver_sql(registration_sql, rows)
+            written += len(rows)
+            rate = written / max(time.perf_counter() - started, 1e-9)
+            log(f"  … {written:,}/{registrations:,} แถว ({rate:,.0f} แถว/วินาที)")
+
+    if defer_indexes:
+        log("  … สร้าง index")
+        with engine.begin() as connection:
+            for index in indexes:
+                index.create(connection, checkfirst=True)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registrations", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--defer-indexes", action="store_true", help="ลบ index ก่อนโหลดแล้วสร้างใหม่ทีหลัง")
+    args = parser.parse_args()
+
+    from thaitour.migrations import MigrationRunner
+    from thaitour.models import create_db_and_tables, engine
+
+    print(f"🚀 สร้างข้อมูลสังเคราะห์ {args.registrations:,} รายการ (seed={args.seed})")
+    create_db_and_tables()
+    MigrationRunner(engine, log=lambda message: None).upgrade()
+    started = time.perf_counter()
+    written = generate_dataset(
+        engine, args.registrations, args.seed, args.workers, args.chunk_size, args.defer_indexes
+    )
+    print(f"🎉 เสร็จสิ้น {written:,} รายการใน {time.perf_counter() - started:.1f} วินาที")
+    print(f"   รหัสผ่านของทุกบัญชี: {DEFAULT_PASSWORD}")
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,9 @@ Database initialization script for ThaiTour
 สร้างฐานข้อมูลและใส่ข้อมูลเริ่มต้น
 """
 
-from thaitour.models import create_db_and_tables, get_session
+from thaitour.migrations import MigrationRunner
+import thaitour.core.changefeed  # noqa: F401  ข้อมูลเริ่มต้นเข้า change feed ด้วย
+from thaitour.models import create_db_and_tables, engine, get_session
 from thaitour.models.province_model import Province, ProvinceType
 from thaitour.models.tax_model import TaxBenefit, TaxBenefitType
 from thaitour.models.user_model import User, UserRole
@@ -16,6 +18,8 @@ def init_database():
     """สร้างตารางฐานข้อมูล"""
     print("🗄️ สร้างตารางฐานข้อมูล...")
     create_db_and_tables()
+    # บันทึก revision ทั้งหมด (และอัปเดตฐานข้อมูลเดิมที่ยังไม่ได้ migrate)
+    MigrationRunner(engine).upgrade()
     print("✅ สร้างตารางเรียบร้อย")
 
 def seed_provinces():
@@ -30,8 +34,8 @@ def seed_provinces():
             "province_type": ProvinceType.PRIMARY,
             "region": "กลาง",
             "description": "เมืองหลวงของประเทศไทย ศูนย์กลางทางเศรษฐกิจและการปกครอง",
-            "famous_attractions": '["วัดพระแก้ว", "วัดโพธิ์", "วัดอรุณ", "จตุจักร"]',
-            "local_specialties": '["ข้าวผัดกุ้ง", "ต้มยำกุ้ง", "ผักบุ้งไฟแดง"]',
+            "famous_attractions": ["วัดพระแก้ว", "วัดโพธิ์", "วัดอรุณ", "จตุจักร"],
+            "local_specialties": ["ข้าวผัดกุ้ง", "ต้มยำกุ้ง", "ผักบุ้งไฟแดง"],
             "tax_reduction_percentage": 0.0,
             "max_reduction_amount": 0.0
         },
@@ -42,8 +46,8 @@ def seed_provinces():
             "province_type": ProvinceType.PRIMARY,
             "region": "เหนือ",
             "description": "เมืองศิลปวัฒนธรรมภาคเหนือ เป็นจุดหมายท่องเที่ยวที่สำคัญ",
-            "famous_attractions": '["วัดพระธาตุดอยสุเทพ", "ถนนคนเดิน", "ไนท์บาซาร์"]',
-            "local_specialties": '["ขนมจีนน้ำเงี้ยว", "ไส้อั่ว", "แกงฮังเล"]',
+            "famous_attractions": ["วัดพระธาตุดอยสุเทพ", "ถนนคนเดิน", "ไนท์บาซาร์"],
+            "local_specialties": ["ขนมจีนน้ำเงี้ยว", "ไส้อั่ว", "แกงฮังเล"],
             "tax_reduction_percentage": 0.0,
             "max_reduction_amount": 0.0
         },
@@ -54,8 +58,8 @@ def seed_provinces():
             "province_type": ProvinceType.SECONDARY,
             "region": "กลาง",
             "description": "จังหวัดรองที่มีประวัติศาสตร์และธรรมชาติที่สวยงาม",
-            "famous_attractions": '["สะพานข้ามแม่น้ำแคว", "น้ำตกเอราวัณ", "อุทยานแห่งชาติไทรโยค"]',
-            "local_specialties": '["ข้าวโพดคั่ว", "มะม่วงน้ำดอกไม้", "ขนมถั่วแปบ"]',
+            "famous_attractions": ["สะพานข้ามแม่น้ำแคว", "น้ำตกเอราวัณ", "อุทยานแห่งชาติไทรโยค"],
+            "local_specialties": ["ข้าวโพดคั่ว", "มะม่วงน้ำดอกไม้", "ขนมถั่วแปบ"],
             "tax_reduction_percentage": 30.0,
             "max_reduction_amount": 15000.0
         },
@@ -66,8 +70,8 @@ def seed_provinces():
             "province_type": ProvinceType.SECONDARY,
             "region": "เหนือ",
             "description": "จังหวัดรองภาคเหนือ มีสถานที่ท่องเที่ยวที่เป็นเอกลักษณ์",
-            "famous_attractions": '["วัดร่องขุ่น", "บ้านดำ", "ไร่ชา"]',
-            "local_specialties": '["ชาอู่หลง", "ข้าวต้มมัด", "ลาบปลาดิบ"]',
+            "famous_attractions": ["วัดร่องขุ่น", "บ้านดำ", "ไร่ชา"],
+            "local_specialties": ["ชาอู่หลง", "ข้าวต้มมัด", "ลาบปลาดิบ"],
             "tax_reduction_percentage": 30.0,
             "max_reduction_amount": 15000.0
         },
@@ -78,8 +82,8 @@ def seed_provinces():
             "province_type": ProvinceType.PRIMARY,
             "region": "ใต้",
             "description": "เกาะท่องเที่ยวชื่อดังของไทย",
-            "famous_attractions": '["หาดป่าตอง", "วัดชลองวรราม", "อ่าวพังงา"]',
-            "local_specialties": '["หอยทอด", "ข้าวยำ", "ลูกชิ้นปลา"]',
+            "famous_attractions": ["หาดป่าตอง", "วัดชลองวรราม", "อ่าวพังงา"],
+            "local_specialties": ["หอยทอด", "ข้าวยำ", "ลูกชิ้นปลา"],
             "tax_reduction_percentage": 0.0,
             "max_reduction_amount": 0.0
         }
@@ -111,8 +115,8 @@ def seed_tax_benefits():
             "reduction_percentage": 30.0,
             "max_reduction_amount": 15000.0,
             "min_spending_amount": 1000.0,
-            "eligible_activities": '["ที่พัก", "อาหาร", "สถานที่ท่องเที่ยว", "กิจกรรม"]',
-            "required_documents": '["ใบเสร็จ", "หลักฐานการเดินทาง"]',
+            "eligible_activities": ["ที่พัก", "อาหาร", "สถานที่ท่องเที่ยว", "กิจกรรม"],
+            "required_documents": ["ใบเสร็จ", "หลักฐานการเดินทาง"],
             "start_date": datetime(2024, 1, 1),
             "end_date": datetime(2025, 12, 31),
             "is_active": True
@@ -125,8 +129,8 @@ def seed_tax_benefits():
             "reduction_percentage": 30.0,
             "max_reduction_amount": 15000.0,
             "min_spending_amount": 500.0,
-            "eligible_activities": '["ที่พัก", "อาหาร", "สถานที่ท่องเที่ยว"]',
-            "required_documents": '["ใบเสร็จ", "หลักฐานการเดินทาง"]',
+            "eligible_activities": ["ที่พัก", "อาหาร", "สถานที่ท่องเที่ยว"],
+            "required_documents": ["ใบเสร็จ", "หลักฐานการเดินทาง"],
             "start_date": datetime(2024, 6, 1),
             "end_date": datetime(2025, 8, 31),
             "is_active": True
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Schema migrations ของ ThaiTour
+
+    python scripts/migrate.py status
+    python scripts/migrate.py upgrade [--target 0002] [--chunk-size 1000] [--pause 0.05]
+
+backfill ถูกแบ่งเป็น transaction ละ chunk และบันทึก checkpoint ไว้
+ถ้าหยุดกลางทาง (Ctrl+C, deploy ใหม่) รัน upgrade อีกครั้งจะทำต่อจากจุดเดิม
+"""
+
+import argparse
+
+from thaitour.migrations import MigrationRunner
+from thaitour.models import engine
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    upgrade_parser = subparsers.add_parser("upgrade", help="รัน revision ที่ยังไม่ได้รัน")
+    upgrade_parser.add_argument("--target", help="revision สุดท้ายที่จะรัน (ค่าเริ่มต้น: ล่าสุด)")
+    upgrade_parser.add_argument("--chunk-size", type=int, default=1000, help="จำนวนแถวต่อ transaction")
+    upgrade_parser.add_argument("--pause", type=float, default=0.0, help="หน่วงระหว่าง chunk (วินาที)")
+
+    subparsers.add_parser("status", help="แสดง revision ที่รันแล้ว/ยังไม่ได้รัน")
+    args = parser.parse_args()
+
+    runner = MigrationRunner(engine)
+    if args.command == "status":
+        for migration, applied in runner.status():
+            mark = "✅" if applied else "⏳"
+            print(f"{mark} {migration.revision}  {migration.description}")
+        return
+
+    print("🚀 เริ่มต้น Migration")
+    applied = runner.upgrade(args.target, chunk_size=args.chunk_size, pause_seconds=args.pause)
+    if applied:
+        print(f"🎉 Migration เสร็จสิ้น: {', '.join(applied)}")
+    else:
+        print("ℹ️ ฐานข้อมูลเป็นเวอร์ชันล่าสุดแล้ว")
+
+if __name__ == "__main__":
+    main()
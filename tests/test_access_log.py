@@ -0,0 +1,92 @@
+import json
+import re
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from thaitour.main import app
+from thaitour.models import engine
+from thaitour.models.user_model import User
+from thaitour.core.access_log import start_access_log, stop_access_log
+from thaitour.core.config import settings
+from thaitour.core.security import create_access_token, user_token_claims
+
+client = TestClient(app)
+
+def _token(username: str) -> str:
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.username == username)).first()
+        return create_access_token(user.username, claims=user_token_claims(user))
+
+def _read_lines(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+@pytest.fixture
+def log_files(tmp_path, monkeypatch):
+    access_file = tmp_path / "access.log"
+    slow_file = tmp_path / "slow.log"
+    monkeypatch.setattr(settings, "access_log_enabled", True)
+    monkeypatch.setattr(settings, "access_log_file", str(access_file))
+    monkeypatch.setattr(settings, "slow_request_log_file", str(slow_file))
+    return access_file, slow_file
+
+def test_access_log_fields(log_files, monkeypatch):
+    """ทดสอบ access log แบบ JSON: route template, status และเวลาแยกส่วน"""
+    access_file, slow_file = log_files
+    monkeypatch.setattr(settings, "slow_request_threshold_ms", 60000.0)
+    listener = start_access_log()
+    try:
+        response = client.get(
+            "/api/v1/provinces/1/tax-info", headers={"Authorization": f"Bearer {_token('admin')}"}
+        )
+    finally:
+        stop_access_log(listener)
+
+    entries = _read_lines(access_file)
+    assert len(entries) == 1
+    entry = entries[0]
+    assert entry["logger"] == "thaitour.access"
+    assert entry["route"] == "/api/v1/provinces/{province_id}/tax-info"
+    assert entry["path"] == "/api/v1/provinces/1/tax-info"
+    assert entry["status"] == response.status_code
+    assert entry["queries"] >= 1
+    for key in ("duration_ms", "db_ms", "auth_ms", "serialization_ms"):
+        assert entry[key] >= 0
+    assert not slow_file.exists() or slow_file.read_text() == ""
+
+def test_slow_request_log_captures_sql(log_files, monkeypatch):
+    """ทดสอบ slow-request log: request ที่เกิน threshold ถูกบันทึกพร้อม SQL ที่รัน"""
+    access_file, slow_file = log_files
+    monkeypatch.setattr(settings, "access_log_enabled", False)
+    monkeypatch.setattr(settings, "slow_request_threshold_ms", 0.001)
+    listener = start_access_log()
+    try:
+        response = client.get("/api/v1/provinces/")
+    finally:
+        stop_access_log(listener)
+    assert response.status_code == 200
+
+    entries = _read_lines(slow_file)
+    assert len(entries) == 1
+    entry = entries[0]
+    assert entry["logger"] == "thaitour.slow"
+    assert entry["route"] == "/api/v1/provinces/"
+    assert entry["statements"]
+    assert all(re.match(r"SELECT\b", statement["sql"]) for statement in entry["statements"])
+    assert entry["statements_truncated"] is False
+    assert not access_file.exists() or access_file.read_text() == ""
+
+def test_no_logging_without_listener(caplog):
+    """ทดสอบว่าเมื่อไม่ได้เริ่ม listener จะไม่มีการสร้าง record (ไม่มีต้นทุนต่อ request)"""
+    with caplog.at_level("WARNING"):
+        client.get("/api/v1/provinces/")
+    assert not [record for record in caplog.records if record.name.startswith("thaitour.access")]
+
+def test_server_timing_includes_auth_and_serialization():
+    """ทดสอบว่า Server-Timing แยกเวลา auth และ serialization"""
+    response = client.get("/api/v1/registration/", headers={"Authorization": f"Bearer {_token('admin')}"})
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    auth = float(re.search(r"auth;dur=([\d.]+)", timing).group(1))
+    serialization = float(re.search(r"ser;dur=([\d.]+)", timing).group(1))
+    assert auth > 0
+    assert serialization > 0
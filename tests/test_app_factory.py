@@ -0,0 +1,92 @@
+import json
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from thaitour.core.catalog import catalog_cache
+from thaitour.core.config import Settings, configure_settings, get_settings
+from thaitour.main import create_app
+from thaitour.models import create_db_and_tables, get_database
+from thaitour.models.province_model import Province, ProvinceType
+
+# งบเวลา import (วินาที) หลังจาก import library ภายนอกแล้ว: วัดเฉพาะโค้ดของโปรเจค
+IMPORT_BUDGET_SECONDS = 0.25
+CREATE_APP_BUDGET_SECONDS = 2.0
+
+_IMPORT_PROBE = """
+import json, sys, time
+import fastapi, fastapi.routing, sqlmodel, sqlalchemy.ext.asyncio, pydantic_settings, jose.jwt, passlib.context
+started = time.perf_counter()
+import thaitour.main
+imported = time.perf_counter()
+models = sys.modules.get("thaitour.models")
+state = {
+    "settings_created": sys.modules["thaitour.core.config"]._settings is not None,
+    "database_created": models is not None and models._database is not None,
+    "app_created": "app" in vars(thaitour.main),
+}
+thaitour.main.app
+print(json.dumps({"import": imported - started, "create_app": time.perf_counter() - imported, **state}))
+"""
+
+def test_import_time_budget():
+    """ทดสอบว่า import thaitour.main ไม่สร้าง Settings, engine หรือ app และอยู่ในงบเวลา"""
+    result = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE], capture_output=True, text=True, check=True,
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert not probe["settings_created"]
+    assert not probe["database_created"]
+    assert not probe["app_created"]
+    assert probe["import"] < IMPORT_BUDGET_SECONDS
+    assert probe["create_app"] < CREATE_APP_BUDGET_SECONDS
+
+def test_create_app_with_injected_database(tmp_path):
+    """ทดสอบ create_app(settings): lifespan สร้าง engine ของฐานข้อมูลที่กำหนด, warm cache และ OpenAPI"""
+    original_settings = get_settings()
+    original_database = get_database()
+    custom = Settings(database_url=f"sqlite:///{tmp_path / 'factory.db'}")
+    try:
+        app = create_app(custom)
+        assert app.state.settings is custom
+        with TestClient(app) as client:
+            database = get_database()
+            assert database is not original_database
+            assert database.url == custom.database_url
+            assert app.openapi_schema is not None
+
+            create_db_and_tables(database.engine)
+            response = client.get("/api/v1/provinces/")
+            assert response.status_code == 200
+            assert response.json() == []
+        assert get_database() is original_database
+    finally:
+        configure_settings(original_settings)
+
+def test_catalog_cache_invalidated_on_commit(tmp_path):
+    """ทดสอบว่า cache ของจังหวัดรองถูกล้างเมื่อ commit การเปลี่ยนแปลงของ Province"""
+    original_settings = get_settings()
+    custom = Settings(database_url=f"sqlite:///{tmp_path / 'catalog.db'}")
+    try:
+        app = create_app(custom)
+        with TestClient(app) as client:
+            database = get_database()
+            create_db_and_tables(database.engine)
+            catalog_cache.clear()
+
+            assert client.get("/api/v1/provinces/secondary").json() == []
+            assert "provinces:secondary" in catalog_cache
+
+            with Session(database.engine) as session:
+                session.add(Province(
+                    name_th="น่าน", name_en="Nan", code="NAN",
+                    province_type=ProvinceType.SECONDARY, region="เหนือ",
+                ))
+                session.commit()
+            assert "provinces:secondary" not in catalog_cache
+
+            provinces = client.get("/api/v1/provinces/secondary").json()
+            assert [province["name_th"] for province in provinces] == ["น่าน"]
+    finally:
+        catalog_cache.clear()
+        configure_settings(original_settings)
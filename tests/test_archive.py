@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from thaitour.core.archive import ArchivePolicy, archive_registrations
+from thaitour.core.config import Settings, configure_settings, get_settings
+from thaitour.main import create_app
+from thaitour.models import build_engine, create_db_and_tables, get_database
+from thaitour.models.registration_model import Registration, RegistrationArchive, RegistrationStatus
+
+NOW = datetime.utcnow()
+
+def _registration(index: int, status: RegistrationStatus, changed_days_ago: int, registered_days_ago: int = 400) -> Registration:
+    return Registration(
+        citizen_id=f"{index:013d}", first_name="ทดสอบ", last_name=str(index), email=f"archive{index}@example.com",
+        phone="0800000000", date_of_birth=datetime(1990, 1, 1), address="1", province="น่าน", district="เมือง",
+        sub_district="ในเวียง", postal_code="55000", status=status, target_provinces=["น่าน"],
+        registration_date=NOW - timedelta(days=registered_days_ago), updated_at=NOW - timedelta(days=changed_days_ago),
+    )
+
+def test_archive_moves_rows_matching_policy(tmp_path):
+    """ทดสอบงาน archive: ย้ายเฉพาะแถวตามนโยบายแบบแบ่ง chunk และรันซ้ำไม่ย้ายซ้ำ"""
+    engine = build_engine(f"sqlite:///{tmp_path / 'archive.db'}", Settings())
+    create_db_and_tables(engine)
+    with Session(engine) as session:
+        session.add(_registration(1, RegistrationStatus.REJECTED, changed_days_ago=60))
+        session.add(_registration(2, RegistrationStatus.REJECTED, changed_days_ago=1))
+        session.add(_registration(3, RegistrationStatus.APPROVED, changed_days_ago=60))
+        session.add(_registration(4, RegistrationStatus.PENDING, changed_days_ago=60, registered_days_ago=800))
+        session.add(_registration(5, RegistrationStatus.REJECTED, changed_days_ago=90))
+        session.commit()
+
+    policy = ArchivePolicy(min_age_days=30, registered_before=NOW - timedelta(days=700))
+    assert archive_registrations(engine, policy, dry_run=True) == 3
+    assert archive_registrations(engine, policy, chunk_size=2, log=lambda message: None) == 3
+    assert archive_registrations(engine, policy, log=lambda message: None) == 0
+
+    with Session(engine) as session:
+        hot = session.exec(select(Registration.id).order_by(Registration.id)).all()
+        archived = session.exec(select(RegistrationArchive).order_by(RegistrationArchive.id)).all()
+    assert hot == [2, 3]
+    assert [row.id for row in archived] == [1, 4, 5]
+    assert archived[0].target_provinces == ["น่าน"]
+    assert archived[0].status == RegistrationStatus.REJECTED
+    assert all(row.archived_at is not None for row in archived)
+    engine.dispose()
+
+def test_archived_ids_are_not_reissued(tmp_path):
+    """ทดสอบว่าหลัง archive แถวล่าสุด การลงทะเบียนใหม่ได้ id ใหม่ จึง archive ซ้ำได้โดยไม่ชนกัน"""
+    engine = build_engine(f"sqlite:///{tmp_path / 'archive.db'}", Settings())
+    create_db_and_tables(engine)
+    policy = ArchivePolicy(min_age_days=30)
+
+    with Session(engine) as session:
+        session.add(_registration(1, RegistrationStatus.REJECTED, changed_days_ago=60))
+        session.commit()
+    assert archive_registrations(engine, policy, log=lambda message: None) == 1
+
+    with Session(engine) as session:
+        registration = _registration(2, RegistrationStatus.REJECTED, changed_days_ago=60)
+        session.add(registration)
+        session.commit()
+        assert registration.id == 2
+    assert archive_registrations(engine, policy, log=lambda message: None) == 1
+
+    with Session(engine) as session:
+        archived = session.exec(select(RegistrationArchive.id).order_by(RegistrationArchive.id)).all()
+    assert archived == [1, 2]
+    engine.dispose()
+
+def test_read_through_and_unique_checks_span_archive(tmp_path):
+    """ทดสอบว่าค้นหาด้วยเลขบัตรประชาชนเจอแถวที่ archive แล้ว และสมัครซ้ำด้วยเลขบัตร/อีเมลเดิมไม่ได้"""
+    original_settings = get_settings()
+    custom = Settings(database_url=f"sqlite:///{tmp_path / 'read_through.db'}", access_log_enabled=False)
+    payload = {
+        "citizen_id": "1100000000099", "first_name": "สมหญิง", "last_name": "ทดสอบ", "email": "archived@example.com",
+        "password": "secret123", "phone": "0812345678", "date_of_birth": "1990-01-01T00:00:00",
+        "address": "1", "province": "น่าน", "district": "เมือง", "sub_district": "ในเวียง", "postal_code": "55000",
+        "target_provinces": ["น่าน"], "interests": ["ธรรมชาติ"],
+    }
+    try:
+        app = create_app(custom)
+        with TestClient(app) as client:
+            database = get_database()
+            create_db_and_tables(database.engine)
+            assert client.post("/api/v1/registration/", json=payload).status_code == 201
+
+            policy = ArchivePolicy(statuses=(), registered_before=datetime.utcnow() + timedelta(days=1))
+            assert archive_registrations(database.engine, policy, log=lambda message: None) == 1
+
+            response = client.get(f"/api/v1/registration/citizen/{payload['citizen_id']}")
+            assert response.status_code == 200
+            assert response.json()["email"] == payload["email"]
+
+            duplicate = client.post("/api/v1/registration/", json=payload)
+            assert duplicate.status_code == 400
+            assert "เลขบัตรประชาชน" in duplicate.json()["detail"]
+
+            same_email = client.post("/api/v1/registration/", json={**payload, "citizen_id": "1100000000100"})
+            assert same_email.status_code == 400
+            assert "อีเมล" in same_email.json()["detail"]
+    finally:
+        configure_settings(original_settings)
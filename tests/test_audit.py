@@ -0,0 +1,120 @@
+import asyncio
+import random
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from thaitour.core.audit import BLOCK, DROP_NEWEST, DROP_OLDEST, AuditLog
+from thaitour.core.config import Settings
+from thaitour.core.security import create_access_token, user_token_claims
+from thaitour.main import app
+from thaitour.models import build_engine, create_db_and_tables, engine
+from thaitour.models.audit_model import AuditEvent
+from thaitour.models.user_model import User
+
+client = TestClient(app)
+
+def _token(username: str) -> str:
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.username == username)).first()
+        return create_access_token(user.username, claims=user_token_claims(user))
+
+@pytest.fixture
+def audit_engine(tmp_path):
+    audit_engine = build_engine(f"sqlite:///{tmp_path / 'audit.db'}", Settings())
+    create_db_and_tables(audit_engine)
+    yield audit_engine
+    audit_engine.dispose()
+
+def _emit_many(log: AuditLog, count: int) -> None:
+    async def scenario():
+        for index in range(count):
+            await log.emit("province", index, "update", "admin", {"region": ["เหนือ", "ใต้"]})
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize("policy, kept", [(DROP_OLDEST, ["2", "3", "4"]), (DROP_NEWEST, ["0", "1", "2"])])
+def test_overflow_drop_policies(policy, kept):
+    """ทดสอบว่าเมื่อคิวเต็ม นโยบาย drop ทิ้ง event ตามที่กำหนดและนับจำนวนที่ทิ้ง"""
+    log = AuditLog(max_size=3, policy=policy)
+    _emit_many(log, 5)
+    assert [event["entity_id"] for event in log._queue] == kept
+    assert log.dropped == 2
+
+def test_block_policy_writes_instead_of_dropping(audit_engine, monkeypatch):
+    """ทดสอบว่านโยบาย block เขียน batch ลงตารางเมื่อคิวเต็ม ไม่มี event หาย"""
+    log = AuditLog(max_size=3, policy=BLOCK, batch_size=2)
+    monkeypatch.setattr(log, "flush", lambda engine=None: AuditLog.flush(log, audit_engine))
+    _emit_many(log, 10)
+    log.flush()
+    assert log.dropped == 0
+    assert log.written == 10
+    with Session(audit_engine) as session:
+        events = session.exec(select(AuditEvent).order_by(AuditEvent.id)).all()
+    assert [event.entity_id for event in events] == [str(index) for index in range(10)]
+    assert events[0].changes == {"region": ["เหนือ", "ใต้"]}
+
+def test_failed_flush_keeps_events_in_order(audit_engine):
+    """ทดสอบว่า batch ที่เขียนไม่สำเร็จถูกใส่กลับหัวคิวตามลำดับเดิม"""
+    log = AuditLog(batch_size=2)
+    _emit_many(log, 3)
+    AuditEvent.__table__.drop(audit_engine)
+    with pytest.raises(Exception):
+        log.flush(audit_engine)
+    assert [event["entity_id"] for event in log._queue] == ["0", "1", "2"]
+    AuditEvent.__table__.create(audit_engine)
+    assert log.flush(audit_engine) == 3
+    assert log.pending() == 0
+
+def test_audit_events_are_append_only(audit_engine):
+    """ทดสอบว่าแก้ไขหรือลบ audit event ผ่าน ORM ไม่ได้"""
+    with Session(audit_engine) as session:
+        session.add(AuditEvent(entity="province", entity_id="1", action="delete"))
+        session.commit()
+        event = session.exec(select(AuditEvent)).one()
+        event.action = "update"
+        with pytest.raises(ValueError):
+            session.commit()
+        session.rollback()
+        session.delete(event)
+        with pytest.raises(ValueError):
+            session.commit()
+
+def test_status_change_recorded_and_listed_for_admin():
+    """ทดสอบว่าการเปลี่ยนสถานะถูกบันทึก (ผู้ทำ ค่าเดิม/ค่าใหม่) และดูได้เฉพาะ admin"""
+    citizen_id = f"{random.randint(1000000000000, 9999999999999)}"
+    created = client.post("/api/v1/registration/", json={
+        "citizen_id": citizen_id, "first_name": "สมศักดิ์", "last_name": "ตรวจสอบ",
+        "email": f"audit{citizen_id}@example.com", "password": "secret123", "phone": "0812345678",
+        "date_of_birth": "1990-01-01T00:00:00", "address": "1", "province": "น่าน", "district": "เมือง",
+        "sub_district": "ในเวียง", "postal_code": "55000", "target_provinces": ["น่าน"], "interests": ["ธรรมชาติ"],
+    })
+    assert created.status_code == 201
+    registration_id = created.json()["id"]
+    admin = {"Authorization": f"Bearer {_token('admin')}"}
+
+    response = client.patch(f"/api/v1/registration/{registration_id}/status", json={"status": "approved"}, headers=admin)
+    assert response.status_code == 200
+
+    response = client.get(
+        "/api/v1/audit/", params={"entity": "registration", "entity_id": str(registration_id)}, headers=admin
+    )
+    assert response.status_code == 200
+    events = response.json()
+    assert len(events) == 1
+    assert events[0]["action"] == "status_change"
+    assert events[0]["actor"] == "admin"
+    assert events[0]["changes"]["status"] == ["pending", "approved"]
+    assert events[0]["changes"]["approved_by"] == [None, "admin"]
+
+    user_token = create_access_token(f"audit{citizen_id}@example.com")
+    assert client.get("/api/v1/audit/", headers={"Authorization": f"Bearer {user_token}"}).status_code == 403
+
+def test_failed_flush_does_not_fail_listing(monkeypatch):
+    """ทดสอบว่าถ้าเขียน event ที่ค้างไม่สำเร็จ การดูประวัติยังคืนผลจากฐานข้อมูลได้"""
+    from thaitour.core.audit import audit_log
+
+    def fail(engine=None):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(audit_log, "flush", fail)
+    response = client.get("/api/v1/audit/", headers={"Authorization": f"Bearer {_token('admin')}"})
+    assert response.status_code == 200
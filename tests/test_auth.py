@@ -0,0 +1,203 @@
+import random
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from thaitour.main import app
+from thaitour.models import engine
+from thaitour.models.user_model import User, UserRole
+from thaitour.core.deps import principal_cache
+from thaitour.core.last_login import last_login_buffer
+from thaitour.core.security import decode_token
+from thaitour.routers.v1.authentication_router import login_ip_limiter, login_username_limiter
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def reset_login_limiters():
+    yield
+    login_ip_limiter.reset()
+    login_username_limiter.reset()
+
+def _login(email: str, password: str = "authpass123") -> str:
+    login_response = client.post("/api/v1/auth/login", json={"username": email, "password": password})
+    assert login_response.status_code == 200
+    return login_response.json()["access_token"]
+
+def _register_and_login():
+    """ลงทะเบียนผู้ใช้ใหม่แล้วคืน (email, access_token)"""
+    citizen_id = f"{random.randint(1000000000000, 9999999999999)}"
+    email = f"authtest{random.randint(100000, 999999)}@example.com"
+    registration_data = {
+        "citizen_id": citizen_id,
+        "first_name": "ทดสอบ",
+        "last_name": "สิทธิ์",
+        "email": email,
+        "phone": "0811111111",
+        "date_of_birth": "1990-01-01T00:00:00",
+        "password": "authpass123",
+        "address": "123 ถนนทดสอบ",
+        "province": "กรุงเทพมหานคร",
+        "district": "ทดสอบ",
+        "sub_district": "ทดสอบ",
+        "postal_code": "10000",
+        "target_provinces": ["เชียงใหม่"],
+        "interests": ["ทดสอบ"]
+    }
+    response = client.post("/api/v1/registration/", json=registration_data)
+    assert response.status_code == 201
+
+    return email, _login(email)
+
+def _set_user(email: str, **fields):
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.username == email)).first()
+        for field, value in fields.items():
+            setattr(user, field, value)
+        session.add(user)
+        session.commit()
+
+def test_principal_cached_after_first_request():
+    """ทดสอบว่า token ที่ตรวจสอบแล้วถูกเก็บใน cache"""
+    email, token = _register_and_login()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/api/v1/registration/", headers=headers)
+    assert response.status_code == 403
+
+    principal = principal_cache.get(token)
+    assert principal is not None
+    assert principal.username == email
+    assert principal.role == UserRole.USER
+
+def test_role_claims_in_token():
+    """ทดสอบว่า access token มี role และ token version"""
+    email, token = _register_and_login()
+    payload = decode_token(token)
+    assert payload["sub"] == email
+    assert payload["role"] == "user"
+    assert payload["ver"] == 0
+    assert payload["uid"] is not None
+
+def test_role_change_revokes_old_token():
+    """ทดสอบว่าการเปลี่ยน role ทำให้ token เดิมใช้ไม่ได้และต้อง login ใหม่"""
+    email, token = _register_and_login()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/api/v1/registration/", headers=headers).status_code == 403
+
+    _set_user(email, role=UserRole.MODERATOR)
+    assert principal_cache.get(token) is None
+    assert client.get("/api/v1/registration/", headers=headers).status_code == 401
+
+    new_token = _login(email)
+    assert decode_token(new_token)["ver"] == 1
+    response = client.get("/api/v1/registration/", headers={"Authorization": f"Bearer {new_token}"})
+    assert response.status_code == 200
+
+def test_deactivation_revokes_token():
+    """ทดสอบว่าการระงับบัญชีทำให้ token ใช้ไม่ได้ทันที"""
+    email, _ = _register_and_login()
+    _set_user(email, role=UserRole.MODERATOR)
+    token = _login(email)
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/v1/registration/", headers=headers).status_code == 200
+
+    _set_user(email, is_active=False)
+    assert client.get("/api/v1/registration/", headers=headers).status_code == 401
+
+def test_rolled_back_role_change_keeps_token_valid():
+    """ทดสอบว่าการเปลี่ยน role ที่ rollback ไม่ทำให้ token ของผู้ใช้ใช้ไม่ได้"""
+    email, _ = _register_and_login()
+    _set_user(email, role=UserRole.MODERATOR)
+    token = _login(email)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.username == email)).first()
+        user.is_active = False
+        session.add(user)
+        session.flush()
+        session.rollback()
+
+    assert client.get("/api/v1/registration/", headers=headers).status_code == 200
+    assert client.get("/api/v1/registration/", headers={"Authorization": f"Bearer {_login(email)}"}).status_code == 200
+
+def test_invalid_token_rejected():
+    """ทดสอบ token ที่ไม่ถูกต้อง"""
+    response = client.get("/api/v1/registration/", headers={"Authorization": "Bearer invalid"})
+    assert response.status_code == 401
+
+def _login_response(email: str, password: str = "authpass123") -> dict:
+    response = client.post("/api/v1/auth/login", json={"username": email, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+def test_refresh_token_rotation():
+    """ทดสอบการรีเฟรช token และ rotate refresh token"""
+    email, _ = _register_and_login()
+    tokens = _login_response(email)
+    assert tokens["refresh_token"]
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["refresh_token"] != tokens["refresh_token"]
+    assert decode_token(data["access_token"])["sub"] == email
+
+    # refresh token ใหม่ยังใช้ต่อได้
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": data["refresh_token"]})
+    assert response.status_code == 200
+
+def test_refresh_token_reuse_revokes_family():
+    """ทดสอบว่าการใช้ refresh token ซ้ำทำให้ทั้ง family ถูกยกเลิก"""
+    email, _ = _register_and_login()
+    tokens = _login_response(email)
+
+    rotated = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+
+    reuse = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert reuse.status_code == 401
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 401
+
+def test_logout_revokes_refresh_token():
+    """ทดสอบว่า logout ยกเลิก refresh token"""
+    email, _ = _register_and_login()
+    tokens = _login_response(email)
+
+    response = client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+def test_invalid_refresh_token():
+    """ทดสอบ refresh token ที่ไม่มีอยู่"""
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": "not-a-token"})
+    assert response.status_code == 401
+
+def test_last_login_is_written_behind():
+    """ทดสอบว่า last_login ถูกบันทึกเมื่อ flush ไม่ใช่ตอน login"""
+    email, _ = _register_and_login()
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.username == email)).first()
+        assert user.last_login is None
+
+    assert last_login_buffer.flush() >= 1
+
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.username == email)).first()
+        assert user.last_login is not None
+
+def test_last_login_flushed_on_shutdown():
+    """ทดสอบว่าค่า last_login ที่ค้างอยู่ถูก flush ตอนปิดแอป"""
+    with TestClient(app) as lifespan_client:
+        email, _ = _register_and_login()
+        assert last_login_buffer.pending() >= 1
+
+    assert last_login_buffer.pending() == 0
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.username == email)).first()
+        assert user.last_login is not None
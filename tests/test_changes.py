@@ -0,0 +1,103 @@
+import random
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+from thaitour.core.changefeed import TXID_SHIFT, _assign_seqs
+from thaitour.core.security import create_access_token, user_token_claims
+from thaitour.main import app
+from thaitour.models import engine
+from thaitour.models.province_model import Province
+from thaitour.models.user_model import User
+
+client = TestClient(app)
+
+def _headers() -> dict:
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.username == "admin")).first()
+        return {"Authorization": f"Bearer {create_access_token(user.username, claims=user_token_claims(user))}"}
+
+def _cursor(headers: dict) -> int:
+    """cursor ล่าสุด (อ่านจนหมดทุกหน้า)"""
+    cursor = 0
+    while True:
+        page = client.get("/api/v1/changes/", params={"since": cursor, "limit": 1000}, headers=headers).json()
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            return cursor
+
+def _province_payload() -> dict:
+    code = f"T{random.randint(100000, 999999)}"
+    return {
+        "name_th": f"จังหวัดทดสอบ {code}", "name_en": f"Test {code}", "code": code,
+        "province_type": "primary", "region": "เหนือ",
+    }
+
+def test_feed_returns_upserts_and_tombstones_in_commit_order():
+    """ทดสอบ change feed: เพิ่ม/แก้ไข/ลบหลัง cursor ได้ตามลำดับ commit และการลบเป็น tombstone"""
+    headers = _headers()
+    cursor = _cursor(headers)
+
+    kept = client.post("/api/v1/provinces/", json=_province_payload(), headers=headers).json()
+    removed = client.post("/api/v1/provinces/", json=_province_payload(), headers=headers).json()
+    client.put(f"/api/v1/provinces/{kept['id']}", json={"region": "ใต้"}, headers=headers)
+    assert client.delete(f"/api/v1/provinces/{removed['id']}", headers=headers).status_code == 200
+
+    page = client.get("/api/v1/changes/", params={"since": cursor, "entity": "province"}, headers=headers).json()
+    changes = {change["entity_id"]: change for change in page["changes"]}
+    assert [change["entity_id"] for change in page["changes"]] == [str(kept["id"]), str(removed["id"])]
+    assert changes[str(kept["id"])]["op"] == "upsert"
+    assert changes[str(kept["id"])]["data"]["region"] == "ใต้"
+    assert changes[str(removed["id"])]["op"] == "delete"
+    assert changes[str(removed["id"])]["data"] is None
+    assert page["has_more"] is False
+
+    # ไม่มีการเปลี่ยนแปลงใหม่: cursor เดิม ไม่มีรายการ
+    again = client.get("/api/v1/changes/", params={"since": page["next_cursor"]}, headers=headers).json()
+    assert again == {"changes": [], "next_cursor": page["next_cursor"], "has_more": False}
+
+def test_feed_pages_and_skips_unchanged_updates():
+    """ทดสอบว่าแบ่งหน้าด้วย cursor ได้ครบ และการบันทึกค่าเดิมไม่สร้างรายการใน feed"""
+    headers = _headers()
+    cursor = _cursor(headers)
+    created = [client.post("/api/v1/provinces/", json=_province_payload(), headers=headers).json() for _ in range(3)]
+
+    with Session(engine) as session:
+        province = session.get(Province, created[0]["id"])
+        province.region = province.region  # ค่าเดิม
+        session.add(province)
+        session.commit()
+
+    first = client.get("/api/v1/changes/", params={"since": cursor, "limit": 2}, headers=headers).json()
+    assert first["has_more"] is True
+    second = client.get("/api/v1/changes/", params={"since": first["next_cursor"], "limit": 2}, headers=headers).json()
+    assert second["has_more"] is False
+    ids = [change["entity_id"] for change in first["changes"] + second["changes"]]
+    assert ids == [str(province["id"]) for province in created]
+
+def test_feed_requires_admin_or_moderator():
+    """ทดสอบว่าผู้ใช้ทั่วไปอ่าน change feed ไม่ได้"""
+    token = create_access_token("someone@example.com")
+    response = client.get("/api/v1/changes/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code in (401, 403)
+
+def test_writes_without_changelog_table_are_not_recorded():
+    """ทดสอบว่าฐานข้อมูลที่ยังไม่มีตาราง changelog เขียนข้อมูลได้ตามปกติ (ไม่บันทึก change feed)"""
+    memory_engine = create_engine("sqlite://")
+    SQLModel.metadata.tables["province"].create(memory_engine)
+    with Session(memory_engine) as session:
+        session.add(Province(**_province_payload()))
+        session.commit()
+        assert session.exec(select(Province)).one().id == 1
+
+def test_postgres_seqs_follow_transaction_id():
+    """ทดสอบว่า seq บน Postgres เรียงตาม txid ก่อน แล้วตามลำดับใน transaction (ต่อเนื่องข้าม flush)"""
+    class Connection:
+        def execute(self, statement):
+            return type("Result", (), {"scalar": lambda self: 7})()
+
+    session = Session()
+    first, second = [{}, {}], [{}]
+    _assign_seqs(session, Connection(), first)
+    _assign_seqs(session, Connection(), second)
+    base = 7 << TXID_SHIFT
+    assert [row["seq"] for row in first + second] == [base, base + 1, base + 2]
+    assert base + 2 < 8 << TXID_SHIFT  # transaction ถัดไปได้ seq มากกว่าเสมอ
@@ -0,0 +1,58 @@
+import gzip
+import pytest
+from fastapi.testclient import TestClient
+from thaitour.main import app
+from thaitour.core import compression
+from thaitour.core.compression import Compressor, choose_encoding
+
+client = TestClient(app)
+
+def test_choose_encoding():
+    """ทดสอบการเลือก encoding ตาม q-value และ encoding ที่มี"""
+    assert choose_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5", ("br", "gzip")) == "gzip"
+    assert choose_encoding("br", ("gzip",)) is None
+    assert choose_encoding("*", ("gzip",)) == "gzip"
+    assert choose_encoding("gzip;q=0", ("gzip",)) is None
+    assert choose_encoding("", ("gzip",)) is None
+
+def test_large_list_is_gzipped(monkeypatch):
+    """ทดสอบว่ารายการจังหวัดถูกบีบอัดด้วย gzip และ decode กลับได้ JSON เดิม"""
+    monkeypatch.setattr(compression, "brotli", None)
+    plain = client.get("/api/v1/provinces/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["vary"]  # cache ต้องแยก body ตาม encoding
+
+    response = client.get("/api/v1/provinces/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(plain.content)
+    assert response.json() == plain.json()
+
+def test_small_response_not_compressed():
+    """ทดสอบว่า response ที่เล็กกว่า threshold ไม่ถูกบีบอัด"""
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+
+    no_header = client.get("/health", headers={"Accept-Encoding": ""})
+    assert "Accept-Encoding" in no_header.headers["vary"]
+
+def test_compressed_bytes_cached():
+    """ทดสอบว่า body เดิมใช้ผลบีบอัดจาก cache แทนการบีบอัดใหม่"""
+    compressor = Compressor(gzip_level=6, cache_size=8)
+    body = ("จังหวัดเมืองรอง " * 200).encode()
+    first = compressor.compress(body, "gzip")
+    second = compressor.compress(body, "gzip")
+    assert second is first
+    assert compressor.cache.hits == 1
+    assert gzip.decompress(first) == body
+
+def test_brotli_when_installed():
+    """ทดสอบ br เมื่อมี brotli ติดตั้ง"""
+    brotli = pytest.importorskip("brotli")
+    response = client.get("/api/v1/provinces/", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(Compressor(cache_size=0).compress(b"x" * 2000, "br")) == b"x" * 2000
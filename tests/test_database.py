@@ -0,0 +1,22 @@
+import pytest
+from sqlalchemy import text
+from thaitour.core.config import Settings
+from thaitour.models import build_engine, get_async_database_url
+
+def test_async_database_url():
+    """ทดสอบการแปลง URL เป็น driver แบบ async"""
+    assert get_async_database_url("sqlite:///./thaitour.db") == "sqlite+aiosqlite:///./thaitour.db"
+    assert get_async_database_url("postgresql://u:p@db/thaitour") == "postgresql+asyncpg://u:p@db/thaitour"
+    assert get_async_database_url("postgresql+psycopg2://u:p@db/thaitour") == "postgresql+asyncpg://u:p@db/thaitour"
+
+def test_sqlite_pragmas_applied(tmp_path):
+    """ทดสอบว่า engine ตั้งค่า SQLite pragmas ตาม Settings"""
+    config = Settings(sqlite_busy_timeout_ms=1234, sqlite_synchronous="NORMAL", db_echo=False)
+    engine = build_engine(f"sqlite:///{tmp_path / 'pragmas.db'}", config)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+    assert engine.echo is False
+    assert engine.pool.size() == config.db_pool_size
+    engine.dispose()
@@ -0,0 +1,47 @@
+import importlib.util
+import os
+import sys
+import pytest
+from sqlalchemy import text
+from thaitour.core.config import Settings
+from thaitour.core.security import verify_password
+from thaitour.models import build_engine, create_db_and_tables
+
+_spec = importlib.util.spec_from_file_location(
+    "generate_dataset", os.path.join(os.path.dirname(__file__), "..", "scripts", "generate_dataset.py")
+)
+generate_dataset = importlib.util.module_from_spec(_spec)
+sys.modules["generate_dataset"] = generate_dataset  # ให้ worker ของ multiprocessing pickle ฟังก์ชันได้
+_spec.loader.exec_module(generate_dataset)
+
+def test_citizen_id_checksum():
+    """ทดสอบหลักตรวจสอบเลขบัตรประชาชน"""
+    assert generate_dataset.is_valid_citizen_id("1101700230708")
+    assert not generate_dataset.is_valid_citizen_id("1101700230705")
+    assert not generate_dataset.is_valid_citizen_id("110170023070")
+
+def test_chunk_is_deterministic_and_valid():
+    """ทดสอบว่า seed เดียวกันได้ข้อมูลเดียวกัน และเลขบัตรถูกต้องไม่ซ้ำกัน"""
+    task = (42, 0, 500, 1, 1, "hash")
+    users, registrations = generate_dataset.generate_chunk(task)
+    assert (users, registrations) == generate_dataset.generate_chunk(task)
+    assert registrations != generate_dataset.generate_chunk((7, 0, 500, 1, 1, "hash"))[1]
+
+    citizen_ids = [row[2] for row in registrations]
+    assert len(set(citizen_ids)) == len(citizen_ids)
+    assert all(generate_dataset.is_valid_citizen_id(citizen_id) for citizen_id in citizen_ids)
+
+def test_generate_dataset_bulk_insert(tmp_path):
+    """ทดสอบการสร้างข้อมูลลงฐานข้อมูลด้วยหลาย worker"""
+    engine = build_engine(f"sqlite:///{tmp_path / 'dataset.db'}", Settings())
+    create_db_and_tables(engine)
+
+    written = generate_dataset.generate_dataset(engine, 250, seed=1, workers=2, chunk_size=100, log=lambda message: None)
+    assert written == 250
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM registration WHERE user_id IS NOT NULL")).scalar() == 250
+        assert connection.execute(text('SELECT count(*) FROM "user"')).scalar() == 250
+        hashed = connection.execute(text('SELECT hashed_password FROM "user" LIMIT 1')).scalar()
+    assert verify_password(generate_dataset.DEFAULT_PASSWORD, hashed)
+    engine.dispose()
@@ -0,0 +1,44 @@
+import logging
+import re
+import pytest
+from fastapi.testclient import TestClient
+from thaitour.main import app
+from thaitour.core.config import settings
+from thaitour.core.instrumentation import RequestStats, check_query_budget
+
+client = TestClient(app)
+
+def test_server_timing_header():
+    """ทดสอบว่า response มี Server-Timing ที่นับ query ของ request"""
+    response = client.get("/api/v1/provinces/")
+    assert response.status_code == 200
+
+    timing = response.headers["server-timing"]
+    match = re.search(r'db;dur=([\d.]+);desc="(\d+) queries"', timing)
+    assert match
+    assert int(match.group(2)) >= 1
+    assert "total;dur=" in timing
+
+def test_query_budget_warning(monkeypatch, caplog):
+    """ทดสอบ warning เมื่อเกินงบ query และเมื่อ statement เดิมซ้ำ (N+1)"""
+    monkeypatch.setattr(settings, "sql_query_budget", 3)
+    monkeypatch.setattr(settings, "sql_repeat_threshold", 3)
+    stats = RequestStats()
+    for _ in range(4):
+        stats.record_query("SELECT * FROM user WHERE id = ?", 0.001)
+    stats.record_query("SELECT * FROM province", 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="thaitour.core.instrumentation"):
+        check_query_budget(stats, "GET", "/api/v1/registration/")
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("issued 5 queries (budget 3" in message for message in messages)
+    assert any("repeated the same statement 4 times" in message for message in messages)
+    assert not any("FROM province" in message for message in messages)
+
+def test_no_warning_within_budget(caplog):
+    """ทดสอบว่า request ปกติไม่เกิด warning"""
+    with caplog.at_level(logging.WARNING, logger="thaitour.core.instrumentation"):
+        response = client.get("/api/v1/provinces/secondary")
+    assert response.status_code == 200
+    assert not caplog.records
@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from sqlmodel import Session, SQLModel
+from thaitour.core import invalidation
+from thaitour.core.catalog import catalog_cache
+from thaitour.core.config import Settings, settings
+from thaitour.core.invalidation import InvalidationBus, publish
+from thaitour.models import build_async_engine, build_engine
+from thaitour.models.province_model import Province, ProvinceType
+
+@pytest.fixture
+def engines(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "invalidation_bus_enabled", True)
+    url = f"sqlite:///{tmp_path / 'bus.db'}"
+    engine = build_engine(url, Settings())
+    SQLModel.metadata.create_all(engine, tables=[
+        SQLModel.metadata.tables["cacheversion"], SQLModel.metadata.tables["province"],
+    ])
+    async_engine = build_async_engine(url, Settings())
+    yield engine, async_engine
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+def _version(engine, channel: str) -> int:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(
+            "SELECT version FROM cacheversion WHERE channel = ?", (channel,)
+        ).scalar() or 0
+
+def test_poll_dispatches_changed_channels(engines, monkeypatch):
+    """ทดสอบว่า version ที่ worker อื่นเพิ่มทำให้ handler ของ channel ถูกเรียก (ไม่เรียกตอนเริ่ม)"""
+    engine, async_engine = engines
+    calls = []
+    monkeypatch.setitem(invalidation._handlers, "test", [lambda: calls.append("sync")])
+
+    async def scenario():
+        bus = InvalidationBus(async_engine)
+        with engine.begin() as connection:
+            publish(connection, "test")
+        await bus.start()
+        assert await bus.poll() == []
+
+        with engine.begin() as connection:
+            publish(connection, "test")
+        assert await bus.poll() == ["test"]
+        assert await bus.poll() == []
+
+    asyncio.run(scenario())
+    assert calls == ["sync"]
+
+def test_province_commit_invalidates_other_workers(engines):
+    """ทดสอบว่า commit ของ Province เพิ่ม version ของ catalog และ worker อื่นล้าง catalog cache"""
+    engine, async_engine = engines
+    bus = InvalidationBus(async_engine)
+    asyncio.run(bus.start())
+
+    with Session(engine) as session:
+        session.add(Province(name_th="น่าน", name_en="Nan", code="NAN", province_type=ProvinceType.SECONDARY, region="เหนือ"))
+        session.rollback()
+    assert _version(engine, "catalog") == 0
+
+    with Session(engine) as session:
+        session.add(Province(name_th="น่าน", name_en="Nan", code="NAN", province_type=ProvinceType.SECONDARY, region="เหนือ"))
+        session.commit()
+    assert _version(engine, "catalog") == 1
+
+    # จำลอง worker อื่น: cache ยังมีข้อมูลเก่าจนกว่าจะ poll
+    catalog_cache.set("provinces:secondary", b"[]")
+    try:
+        assert asyncio.run(bus.poll()) == ["catalog"]
+        assert "provinces:secondary" not in catalog_cache
+    finally:
+        catalog_cache.clear()
+
+def test_publish_disabled_by_default(engines, monkeypatch):
+    """ทดสอบว่าเมื่อปิด bus จะไม่เขียนตาราง cacheversion"""
+    engine, _ = engines
+    monkeypatch.setattr(settings, "invalidation_bus_enabled", False)
+    with engine.begin() as connection:
+        publish(connection, "catalog")
+    assert _version(engine, "catalog") == 0
@@ -0,0 +1,70 @@
+import json
+import os
+import time
+import pytest
+from fastapi.testclient import TestClient
+from thaitour.main import app
+from thaitour.core.metrics import merge_snapshots, metrics_registry, render
+
+client = TestClient(app)
+
+def _sample(body: str, series: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{series} not found")
+
+def test_metrics_by_route_template():
+    """ทดสอบว่า /metrics นับ request ตาม route template ไม่ใช่ path จริง"""
+    client.get("/api/v1/provinces/1")
+    client.get("/api/v1/provinces/2")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    body = response.text
+    assert 'route="/api/v1/provinces/{province_id}"' in body
+    assert 'route="/api/v1/provinces/1"' not in body
+    assert "thaitour_http_request_duration_seconds_bucket" in body
+    assert 'thaitour_db_pool_checkouts_total{pool="primary"}' in body
+    assert 'thaitour_cache_hits_total{cache="principal"}' in body
+    assert "thaitour_password_hash_queue_depth" in body
+
+def test_metrics_aggregate_worker_snapshots(tmp_path):
+    """ทดสอบการรวม snapshot ของหลาย worker: counter รวมกัน, gauge ของ worker ที่ตายแล้วไม่นับ"""
+    own = metrics_registry.snapshot()
+    labels = ["GET", "/api/v1/tax/benefits", "200"]
+    buckets = [0] * 12 + [0.0]
+    buckets[2] = 3
+    buckets[-1] = 0.06
+    dead_worker = {
+        "pid": 2 ** 22 + 12345,  # pid ที่ไม่มีอยู่จริง
+        "histograms": {"thaitour_http_request_duration_seconds": [[labels, buckets]]},
+        "counters": {"thaitour_db_pool_checkouts_total": [[["primary"], 7]]},
+        "gauges": {"thaitour_http_requests_in_flight": [[[], 5]]},
+    }
+    (tmp_path / f"{dead_worker['pid']}.json").write_text(json.dumps(dead_worker))
+
+    snapshots = metrics_registry.collect(str(tmp_path))
+    assert len(snapshots) == 2
+    assert (tmp_path / f"{own['pid']}.json").exists()
+
+    body = render(merge_snapshots(snapshots))
+    assert 'thaitour_http_requests_total{method="GET",route="/api/v1/tax/benefits",status="200"} 3' in body
+    assert 'thaitour_http_request_duration_seconds_bucket{method="GET",route="/api/v1/tax/benefits",status="200",le="0.025"} 3' in body
+    own_checkouts = dict((tuple(k), v) for k, v in own["counters"]["thaitour_db_pool_checkouts_total"])
+    assert _sample(body, 'thaitour_db_pool_checkouts_total{pool="primary"}') >= own_checkouts.get(("primary",), 0) + 7
+    assert _sample(body, "thaitour_http_requests_in_flight") < 5
+
+def test_stale_snapshots_removed_at_startup(tmp_path):
+    """ทดสอบว่า snapshot ที่ไม่ถูกเขียนทับหลายรอบ (worker/deployment ก่อนหน้า) ถูกลบ ของ worker ที่ยังทำงานอยู่ไม่ถูกลบ"""
+    stale, fresh = tmp_path / "100.json", tmp_path / "200.json"
+    stale.write_text("{}")
+    fresh.write_text("{}")
+    old = time.time() - 3600
+    os.utime(stale, (old, old))
+
+    assert metrics_registry.remove_stale_snapshots(str(tmp_path), 5.0) == 1
+    assert not stale.exists()
+    assert fresh.exists()
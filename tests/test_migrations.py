@@ -0,0 +1,114 @@
+import pytest
+from sqlalchemy import text
+from thaitour.core.config import Settings
+from thaitour.migrations import MigrationContext, MigrationRunner, load_migrations
+from thaitour.models import build_engine
+
+# schema ก่อนมี registration.user_id และ user.token_version
+OLD_SCHEMA = [
+    'CREATE TABLE "user" (id INTEGER PRIMARY KEY, username VARCHAR(50) UNIQUE NOT NULL, '
+    "hashed_password VARCHAR(255) NOT NULL, email VARCHAR(100) UNIQUE, full_name VARCHAR(200), "
+    "role VARCHAR(9) NOT NULL, is_active BOOLEAN NOT NULL, is_verified BOOLEAN NOT NULL, "
+    "created_at DATETIME NOT NULL, updated_at DATETIME, last_login DATETIME)",
+    "CREATE TABLE registration (id INTEGER PRIMARY KEY, email VARCHAR UNIQUE NOT NULL, "
+    "first_name VARCHAR(100) NOT NULL, last_name VARCHAR(100) NOT NULL)",
+]
+
+@pytest.fixture
+def old_engine(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'old.db'}", Settings())
+    with engine.begin() as connection:
+        for statement in OLD_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(text(
+            "INSERT INTO \"user\" (username, hashed_password, email, role, is_active, is_verified, created_at) "
+            "VALUES ('somchai@example.com', 'x', 'somchai@example.com', 'USER', 1, 1, '2024-01-01')"
+        ))
+        connection.execute(
+            text("INSERT INTO registration (email, first_name, last_name) VALUES (:e, 'ทดสอบ', :l)"),
+            [{"e": "somchai@example.com", "l": "0"}]
+            + [{"e": f"traveler{i}@example.com", "l": str(i)} for i in range(1, 7)],
+        )
+    yield engine
+    engine.dispose()
+
+def test_upgrade_backfills_and_records_revisions(old_engine):
+    """ทดสอบ upgrade ฐานข้อมูลเดิม: เพิ่มคอลัมน์, สร้าง user ที่ขาด, บันทึก revision"""
+    runner = MigrationRunner(old_engine, log=lambda message: None)
+    applied = runner.upgrade(chunk_size=2)
+    assert applied == ["0001", "0002", "0003", "0004", "0005", "0006", "0007", "0008", "0009", "0010"]
+    assert runner.pending() == []
+
+    with old_engine.connect() as connection:
+        unlinked = connection.execute(text("SELECT count(*) FROM registration WHERE user_id IS NULL")).scalar()
+        users = connection.execute(text('SELECT count(*) FROM "user"')).scalar()
+        hashes = connection.execute(text('SELECT count(DISTINCT hashed_password) FROM "user" WHERE id > 1')).scalar()
+        linked = connection.execute(text("SELECT user_id FROM registration WHERE email = 'somchai@example.com'")).scalar()
+        versions = connection.execute(text('SELECT DISTINCT token_version FROM "user"')).scalars().all()
+        feed = connection.execute(text("SELECT entity_id FROM changelog WHERE entity = 'registration' ORDER BY seq")).scalars().all()
+        last_id = connection.execute(text("SELECT last_id FROM idsequence WHERE name = 'registration'")).scalar()
+    assert unlinked == 0
+    assert users == 7  # user เดิม 1 คน + ใหม่ 6 คน
+    assert hashes == 1  # hash รหัสผ่านเริ่มต้นครั้งเดียว
+    assert linked == 1
+    assert versions == [0]
+    assert feed == [str(i) for i in range(1, 8)]  # แถวเดิมอยู่ใน change feed ตั้งแต่ cursor 0
+    assert last_id == 7  # registration ใหม่ได้ id ต่อจากแถวเดิม
+
+    # รันซ้ำไม่มีผล
+    assert runner.upgrade() == []
+
+def test_backfill_resumes_from_checkpoint(old_engine):
+    """ทดสอบว่า backfill ที่หยุดกลางทางทำต่อจาก checkpoint โดยไม่ทำ chunk เดิมซ้ำ"""
+    MigrationRunner(old_engine, migrations=[]).ensure_tables()
+    ctx = MigrationContext(old_engine, "test", chunk_size=2, log=lambda message: None)
+    seen = []
+
+    def failing(connection, rows):
+        if len(seen) >= 4:
+            raise RuntimeError("หยุดกลางทาง")
+        seen.extend(row.id for row in rows)
+
+    select_sql = "SELECT id FROM registration WHERE id > :last_id ORDER BY id LIMIT :limit"
+    with pytest.raises(RuntimeError):
+        ctx.backfill("ids", select_sql, failing)
+    assert ctx.get_checkpoint("ids") == 4
+
+    resumed = []
+    processed = ctx.backfill("ids", select_sql, lambda connection, rows: resumed.extend(r.id for r in rows))
+    assert resumed == [5, 6, 7]
+    assert processed == 3
+
+def test_json_columns_normalized(tmp_path):
+    """ทดสอบ 0004: แถว JSON เดิมไม่ถูกแก้, string ว่างเป็น NULL, ข้อความคั่น comma เป็น list และ ORM ได้ list"""
+    from sqlmodel import Session, SQLModel, select
+    from thaitour.models.province_model import Province
+
+    engine = build_engine(f"sqlite:///{tmp_path / 'json.db'}", Settings())
+    SQLModel.metadata.tables["province"].create(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO province (name_th, name_en, code, province_type, region, famous_attractions, "
+                 "tax_reduction_percentage, max_reduction_amount, is_active, created_at) "
+                 "VALUES (:n, :n, :n, 'SECONDARY', 'เหนือ', :f, 0, 0, 1, '2024-01-01')"),
+            [
+                {"n": "น่าน", "f": '["ดอยเสมอดาว", "วัดภูมินทร์"]'},
+                {"n": "เลย", "f": ""},
+                {"n": "ตราด", "f": "เกาะช้าง, เกาะกูด"},
+            ],
+        )
+
+    migration = next(m for m in load_migrations() if m.revision == "0004")
+    MigrationRunner(engine, migrations=[]).ensure_tables()
+    migration.upgrade(MigrationContext(engine, "0004", chunk_size=2, log=lambda message: None))
+
+    with engine.connect() as connection:
+        raw = connection.execute(text("SELECT famous_attractions FROM province ORDER BY id")).scalars().all()
+    assert raw[0] == '["ดอยเสมอดาว", "วัดภูมินทร์"]'
+    assert raw[1] is None
+    with Session(engine) as session:
+        provinces = session.exec(select(Province).order_by(Province.id)).all()
+    assert [p.famous_attractions for p in provinces] == [
+        ["ดอยเสมอดาว", "วัดภูมินทร์"], None, ["เกาะช้าง", "เกาะกูด"],
+    ]
+    engine.dispose()
@@ -0,0 +1,56 @@
+import pstats
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from thaitour.main import app
+from thaitour.models import engine
+from thaitour.models.user_model import User
+from thaitour.core.profiling import ProfilingMiddleware
+from thaitour.core.security import create_access_token, user_token_claims
+
+def _token(username: str) -> str:
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.username == username)).first()
+        return create_access_token(user.username, claims=user_token_claims(user))
+
+@pytest.fixture
+def profiled_client(tmp_path):
+    return TestClient(ProfilingMiddleware(app, directory=str(tmp_path), sample_interval=0.001)), tmp_path
+
+def test_profiling_not_installed_by_default():
+    """ทดสอบว่า middleware ไม่ถูกติดตั้งเมื่อปิด profiling"""
+    assert not any(m.cls is ProfilingMiddleware for m in app.user_middleware)
+
+def test_cprofile_for_admin(profiled_client):
+    """ทดสอบ cProfile สำหรับ admin: ได้ X-Profile-Id และไฟล์ .prof ที่อ่านได้"""
+    client, directory = profiled_client
+    headers = {"Authorization": f"Bearer {_token('admin')}", "X-Profile": "cprofile"}
+    response = client.get("/api/v1/provinces/", headers=headers)
+    assert response.status_code == 200
+
+    profile_id = response.headers["x-profile-id"]
+    assert profile_id.endswith(".prof")
+    stats = pstats.Stats(str(directory / profile_id))
+    assert stats.total_calls > 0
+
+def test_sampling_profile_for_admin(profiled_client):
+    """ทดสอบ sampling profiler: ไฟล์ .folded แต่ละบรรทัดเป็น '<stack> <count>'"""
+    client, directory = profiled_client
+    headers = {"Authorization": f"Bearer {_token('admin')}", "X-Profile": "sample"}
+    response = client.get("/api/v1/provinces/", headers=headers)
+    assert response.status_code == 200
+
+    profile_id = response.headers["x-profile-id"]
+    assert profile_id.endswith(".folded")
+    for line in (directory / profile_id).read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+
+def test_profiling_ignored_for_non_admin(profiled_client):
+    """ทดสอบว่า request ของผู้ใช้ทั่วไปหรือไม่มี token ไม่ถูก profile"""
+    client, directory = profiled_client
+    for headers in ({"Authorization": f"Bearer {_token('user')}", "X-Profile": "cprofile"}, {"X-Profile": "cprofile"}):
+        response = client.get("/api/v1/provinces/", headers=headers)
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+    assert list(directory.iterdir()) == []
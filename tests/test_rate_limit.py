@@ -0,0 +1,74 @@
+import pytest
+from fastapi.testclient import TestClient
+from thaitour.main import app
+from thaitour.core.config import settings
+from thaitour.core.rate_limit import RateLimiter
+from thaitour.routers.v1.authentication_router import login_ip_limiter, login_username_limiter
+
+attacker = TestClient(app, client=("203.0.113.66", 50000))
+legit_client = TestClient(app, client=("198.51.100.7", 50000))
+
+@pytest.fixture(autouse=True)
+def reset_limiters():
+    login_ip_limiter.reset()
+    login_username_limiter.reset()
+    yield
+    login_ip_limiter.reset()
+    login_username_limiter.reset()
+
+def test_token_bucket_refill():
+    """ทดสอบ token bucket: ใช้ครบ burst แล้วต้องรอ refill"""
+    limiter = RateLimiter(capacity=2, refill_per_second=1)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") > 0
+    # key อื่นไม่ได้รับผลกระทบ
+    assert limiter.acquire("b") == 0
+
+def test_bucket_memory_is_bounded():
+    """ทดสอบว่าจำนวน bucket ไม่เกิน maxsize"""
+    limiter = RateLimiter(capacity=1, refill_per_second=1, maxsize=100)
+    for i in range(1000):
+        limiter.acquire(f"ip-{i}")
+    assert len(limiter) == 100
+
+def test_login_username_throttled():
+    """ทดสอบว่าการเดารหัสผ่านซ้ำ ๆ ได้ 429 พร้อม Retry-After"""
+    for _ in range(settings.login_username_burst):
+        response = attacker.post("/api/v1/auth/login", json={"username": "admin", "password": "wrong"})
+        assert response.status_code == 401
+
+    response = attacker.post("/api/v1/auth/login", json={"username": "admin", "password": "wrong"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+def test_login_ip_throttled_but_other_clients_unaffected():
+    """ทดสอบว่า IP ที่โจมตีถูกจำกัด แต่ผู้ใช้ปกติจาก IP อื่นยัง login ได้"""
+    for i in range(settings.login_ip_burst):
+        attacker.post("/api/v1/auth/login", json={"username": f"victim{i}", "password": "wrong"})
+
+    response = attacker.post("/api/v1/auth/login", json={"username": "someone-else", "password": "wrong"})
+    assert response.status_code == 429
+
+    response = legit_client.post("/api/v1/auth/login", json={"username": "user", "password": "secret"})
+    assert response.status_code == 200
+
+def test_zero_rate_rejected_by_settings_and_retry_after_capped():
+    """ทดสอบว่า rate 0 ตั้งค่าไม่ได้ และ bucket ที่ไม่ refill ยังตอบ 429 พร้อม Retry-After ที่จำกัด"""
+    from pydantic import ValidationError
+    from thaitour.core.config import Settings
+    from thaitour.routers.v1 import authentication_router
+
+    with pytest.raises(ValidationError):
+        Settings(login_username_per_minute=0)
+
+    limiter = RateLimiter(capacity=1, refill_per_second=0)
+    original = authentication_router.login_ip_limiter
+    authentication_router.login_ip_limiter = limiter
+    try:
+        attacker.post("/api/v1/auth/login", json={"username": "nobody", "password": "wrong"})
+        response = attacker.post("/api/v1/auth/login", json={"username": "nobody", "password": "wrong"})
+    finally:
+        authentication_router.login_ip_limiter = original
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == str(authentication_router.MAX_RETRY_AFTER_SECONDS)
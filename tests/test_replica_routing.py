@@ -0,0 +1,75 @@
+import asyncio
+import random
+import sqlite3
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from thaitour.main import app
+from thaitour.models import build_async_engine, session_router
+from thaitour.models.routing import STICKY_COOKIE, SessionRouter
+
+def _make_sqlite(path, marker: str) -> str:
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE marker (name TEXT)")
+        connection.execute("INSERT INTO marker VALUES (?)", (marker,))
+    return f"sqlite:///{path}"
+
+async def _read_marker(router: SessionRouter, read_only: bool, sticky: bool = False) -> str:
+    async with router.session(read_only=read_only, sticky=sticky) as session:
+        return (await session.exec(text("SELECT name FROM marker"))).scalar()
+
+def test_session_router_with_two_sqlite_files(tmp_path):
+    """ทดสอบการแยกอ่าน/เขียนด้วยไฟล์ SQLite สองไฟล์"""
+    primary = build_async_engine(_make_sqlite(tmp_path / "primary.db", "primary"))
+    replica = build_async_engine(_make_sqlite(tmp_path / "replica.db", "replica"))
+    router = SessionRouter(primary, [replica], sticky_seconds=5)
+
+    assert asyncio.run(_read_marker(router, read_only=False)) == "primary"
+    assert asyncio.run(_read_marker(router, read_only=True)) == "replica"
+    assert asyncio.run(_read_marker(router, read_only=True, sticky=True)) == "primary"
+
+def test_session_router_without_replicas_uses_primary(tmp_path):
+    """ทดสอบว่าไม่มี replica ก็อ่านจาก primary"""
+    primary = build_async_engine(_make_sqlite(tmp_path / "primary.db", "primary"))
+    router = SessionRouter(primary)
+    assert asyncio.run(_read_marker(router, read_only=True)) == "primary"
+
+@pytest.fixture
+def stale_replica(tmp_path):
+    """replica ที่เป็นสำเนาของฐานข้อมูลหลัก ณ ตอนเริ่มทดสอบ (จึงไม่เห็นข้อมูลที่เขียนภายหลัง)"""
+    replica_path = tmp_path / "replica.db"
+    with sqlite3.connect("thaitour.db") as source, sqlite3.connect(replica_path) as target:
+        source.backup(target)
+    session_router.set_replicas([build_async_engine(f"sqlite:///{replica_path}")])
+    yield
+    session_router.set_replicas([])
+
+def test_read_your_writes_after_write(stale_replica):
+    """ทดสอบว่า client ที่เพิ่งเขียนข้อมูลอ่านจาก primary ส่วน client อื่นอ่านจาก replica"""
+    writer = TestClient(app)
+    other = TestClient(app)
+    citizen_id = f"{random.randint(1000000000000, 9999999999999)}"
+    registration_data = {
+        "citizen_id": citizen_id,
+        "first_name": "ทดสอบ",
+        "last_name": "replica",
+        "email": f"replica{random.randint(100000, 999999)}@example.com",
+        "phone": "0811111111",
+        "date_of_birth": "1990-01-01T00:00:00",
+        "password": "replicapass",
+        "address": "123 ถนนทดสอบ",
+        "province": "กรุงเทพมหานคร",
+        "district": "ทดสอบ",
+        "sub_district": "ทดสอบ",
+        "postal_code": "10000",
+        "target_provinces": ["เชียงใหม่"],
+        "interests": ["ทดสอบ"]
+    }
+    response = writer.post("/api/v1/registration/", json=registration_data)
+    assert response.status_code == 201
+    assert STICKY_COOKIE in response.cookies
+
+    # client ที่เขียนข้อมูลเห็นข้อมูลของตัวเองทันที
+    assert writer.get(f"/api/v1/registration/citizen/{citizen_id}").status_code == 200
+    # client อื่นอ่านจาก replica ที่ยังไม่ได้รับข้อมูลใหม่
+    assert other.get(f"/api/v1/registration/citizen/{citizen_id}").status_code == 404
@@ -0,0 +1,40 @@
+import json
+from datetime import datetime
+from fastapi.testclient import TestClient
+from thaitour.main import app
+from thaitour.core.serialization import ResponseSerializer
+from thaitour.models.province_model import Province, ProvinceType
+from thaitour.schemas.province_schema import ProvinceResponse
+
+client = TestClient(app)
+
+def _province(**overrides) -> Province:
+    values = dict(
+        id=1, name_th="น่าน", name_en="Nan", code="NAN", province_type=ProvinceType.SECONDARY,
+        region="เหนือ", description=None, famous_attractions=["ดอยเสมอดาว", "วัดภูมินทร์"],
+        local_specialties=None, tax_reduction_percentage=15.0, max_reduction_amount=15000.0,
+        is_active=True, created_at=datetime(2025, 1, 2, 3, 4, 5, 678000),
+    )
+    values.update(overrides)
+    return Province(**values)
+
+def test_serializer_matches_response_model():
+    """ทดสอบว่า JSON จาก ResponseSerializer ตรงกับการสร้าง response model แบบเดิม"""
+    province = _province()
+    expected = ProvinceResponse(**province.model_dump()).model_dump(mode="json")
+
+    payload = json.loads(ResponseSerializer(ProvinceResponse).dumps_one(province))
+    assert payload == expected
+    assert payload["famous_attractions"] == ["ดอยเสมอดาว", "วัดภูมินทร์"]
+    assert payload["province_type"] == "secondary"
+    assert payload["created_at"] == "2025-01-02T03:04:05.678000"
+
+def test_list_endpoint_uses_serializer():
+    """ทดสอบว่า endpoint รายการคืน JSON ที่ตรงกับ response model"""
+    response = client.get("/api/v1/provinces/?limit=5")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    provinces = response.json()
+    assert provinces
+    for province in provinces:
+        ProvinceResponse(**province)
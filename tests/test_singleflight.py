@@ -0,0 +1,136 @@
+import asyncio
+import pytest
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import Request
+from thaitour.core import catalog
+from thaitour.core.catalog import catalog_cache, get_catalog, invalidate_catalog
+from thaitour.core.singleflight import SingleFlight, request_key
+
+def _request(query: bytes) -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": "/api/v1/provinces/",
+        "query_string": query, "headers": [], "path_params": {},
+    })
+
+def test_concurrent_calls_share_one_execution():
+    """ทดสอบว่า call ที่ key เดียวกันพร้อมกันรันงานครั้งเดียวและได้ผลเดียวกัน"""
+    flight = SingleFlight("test")
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return b"[]"
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("k", load) for _ in range(50)))
+        assert set(results) == {b"[]"}
+        assert len(flight) == 0
+        await flight.do("k", load)  # งานเสร็จแล้ว: call ถัดไปเริ่มใหม่
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert (flight.leaders, flight.shared) == (2, 49)
+
+def test_failure_reaches_all_waiters_and_next_call_retries():
+    """ทดสอบว่า exception ส่งถึงทุกคนที่รอ และ call ถัดไปเริ่มงานใหม่"""
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def ok():
+        return "ok"
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("k", fail) for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await flight.do("k", ok) == "ok"
+
+    asyncio.run(scenario())
+
+def test_cancelled_waiter_does_not_cancel_others():
+    """ทดสอบว่า leader ที่ถูกยกเลิก (client ตัดการเชื่อมต่อ) ไม่ทำให้คนอื่นที่รอได้ผลผิดพลาด"""
+    flight = SingleFlight("test")
+
+    async def load():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("k", load))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", load))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == 42
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    asyncio.run(scenario())
+
+def test_catalog_miss_loads_once(monkeypatch):
+    """ทดสอบว่า cache miss พร้อมกันของ catalog โหลดจากฐานข้อมูลครั้งเดียว"""
+    calls = []
+
+    async def loader(session):
+        calls.append(session)
+        await asyncio.sleep(0.01)
+        return b"[1]"
+
+    monkeypatch.setitem(catalog.catalog_loaders, "test:key", loader)
+    catalog_cache.clear()
+
+    async def scenario():
+        return await asyncio.gather(*(get_catalog("test:key") for _ in range(20)))
+
+    try:
+        assert asyncio.run(scenario()) == [b"[1]"] * 20
+        assert len(calls) == 1
+        assert catalog_cache.get("test:key") == b"[1]"
+    finally:
+        catalog_cache.clear()
+
+def test_catalog_load_started_before_invalidation_not_cached(monkeypatch):
+    """ทดสอบว่าผลที่เริ่มโหลดก่อนการล้าง cache ไม่ถูกเก็บลง cache"""
+    async def loader(session):
+        invalidate_catalog()  # ข้อมูลเปลี่ยนระหว่างโหลด
+        return b"[]"
+
+    monkeypatch.setitem(catalog.catalog_loaders, "test:key", loader)
+    catalog_cache.clear()
+    assert asyncio.run(get_catalog("test:key")) == b"[]"
+    assert "test:key" not in catalog_cache
+
+def test_catalog_load_uses_its_own_session(monkeypatch):
+    """ทดสอบว่า catalog โหลดด้วย session ของตัวเอง ผู้รอคนอื่นได้ผลแม้ request ที่เริ่มงานถูกยกเลิก"""
+    sessions = []
+
+    async def loader(session):
+        await asyncio.sleep(0.02)
+        sessions.append(session)
+        return (await session.exec(select(1))).one()
+
+    monkeypatch.setitem(catalog.catalog_loaders, "test:key", loader)
+    catalog_cache.clear()
+
+    async def scenario():
+        leader = asyncio.ensure_future(get_catalog("test:key"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(get_catalog("test:key"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    try:
+        assert asyncio.run(scenario()) == 1
+        assert len(sessions) == 1 and isinstance(sessions[0], AsyncSession)
+    finally:
+        catalog_cache.clear()
+
+def test_request_key_normalizes_query_order():
+    """ทดสอบว่า key ไม่ขึ้นกับลำดับ query parameter"""
+    assert request_key(_request(b"region=x&limit=5")) == request_key(_request(b"limit=5&region=x"))
+    assert request_key(_request(b"limit=5")) != request_key(_request(b"limit=6"))
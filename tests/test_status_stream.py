@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from thaitour.core import changefeed  # noqa: F401  บันทึกการเปลี่ยนแปลงลง changelog
+from thaitour.core.config import Settings
+from thaitour.core.status_stream import StatusBroadcaster, status_event_stream, status_payload
+from thaitour.main import app
+from thaitour.models import build_async_engine, build_engine, create_db_and_tables
+from thaitour.models.registration_model import Registration, RegistrationStatus
+
+client = TestClient(app)
+
+def _loader(status: str):
+    async def load(registration_id: int):
+        return status_payload(registration_id, status, None)
+    return load
+
+async def _next(stream) -> bytes:
+    return await asyncio.wait_for(stream.__anext__(), 1)
+
+def test_stream_sends_current_status_then_transitions_only():
+    """ทดสอบ stream: event แรกคือสถานะปัจจุบัน ต่อด้วยการเปลี่ยนสถานะ (แก้ไขส่วนอื่นไม่ถูกส่ง)"""
+    broadcaster = StatusBroadcaster(buffer_size=16)
+    broadcaster.cursor = 10
+
+    async def scenario():
+        subscriber = broadcaster.subscribe(1)
+        stream = status_event_stream(broadcaster, subscriber, _loader("pending"), heartbeat_seconds=0.01)
+        assert (await _next(stream)).startswith(b"retry:")
+        first = await _next(stream)
+        assert first.startswith(b"id: 10\n") and b'"status":"pending"' in first
+        broadcaster.publish(11, 1, status_payload(1, "pending", None))  # แก้ไขข้อมูลส่วนอื่น
+        broadcaster.publish(12, 2, status_payload(2, "approved", None))  # registration อื่น
+        broadcaster.publish(13, 1, status_payload(1, "approved", None))
+        frame = await _next(stream)
+        assert frame.startswith(b"id: 13\nevent: status\n") and b'"status":"approved"' in frame
+        assert await _next(stream) == b": ping\n\n"
+        await stream.aclose()
+        assert len(broadcaster) == 0
+
+    asyncio.run(scenario())
+
+def test_resume_with_last_event_id_replays_from_buffer():
+    """ทดสอบ Last-Event-ID: ส่ง event ที่พลาดจาก ring buffer หรือสถานะปัจจุบันถ้าหลุด buffer แล้ว"""
+    broadcaster = StatusBroadcaster(buffer_size=3)
+    broadcaster.cursor = 0
+    for seq, status in enumerate(["pending", "rejected", "pending", "approved"], start=1):
+        broadcaster.publish(seq, 1, status_payload(1, status, None))
+    broadcaster.cursor = 4
+
+    assert [seq for seq, _, _ in broadcaster.replay(1, 2)] == [3, 4]
+    assert broadcaster.replay(2, 2) == []
+    assert broadcaster.replay(1, 0) is None  # seq 1 หลุดจาก buffer แล้ว
+
+    async def scenario():
+        subscriber = broadcaster.subscribe(1, last_event_id=2)
+        stream = status_event_stream(broadcaster, subscriber, _loader("approved"), last_event_id=2)
+        frames = [await _next(stream) for _ in range(3)]
+        await stream.aclose()
+        return frames
+
+    retry, third, fourth = asyncio.run(scenario())
+    assert third.startswith(b"id: 3\n") and fourth.startswith(b"id: 4\n")
+
+def test_slow_client_is_disconnected_and_limits_enforced():
+    """ทดสอบว่า client ที่คิวเต็มถูกปิด stream (ให้ resume) และจำกัดจำนวน client ต่อ worker"""
+    broadcaster = StatusBroadcaster(queue_size=2, max_clients=1)
+    broadcaster.cursor = 0
+
+    async def scenario():
+        subscriber = broadcaster.subscribe(1)
+        assert broadcaster.subscribe(2) is None
+        for seq in range(1, 4):
+            broadcaster.publish(seq, 1, status_payload(1, "approved", None))
+        stream = status_event_stream(broadcaster, subscriber, _loader("approved"))
+        return [frame async for frame in stream]
+
+    frames = asyncio.run(scenario())
+    assert len(frames) == 2  # retry + สถานะปัจจุบัน แล้วปิด
+    assert broadcaster.overflows == 1
+    assert len(broadcaster) == 0
+
+def test_poll_publishes_committed_status_changes(tmp_path):
+    """ทดสอบว่า poll อ่าน changelog แล้วส่งสถานะปัจจุบันโดยใช้ seq เป็น event id"""
+    url = f"sqlite:///{tmp_path / 'stream.db'}"
+    engine = build_engine(url, Settings())
+    create_db_and_tables(engine)
+    async_engine = build_async_engine(url, Settings())
+    with Session(engine) as session:
+        registration = Registration(
+            citizen_id="1100000000001", first_name="ทดสอบ", last_name="สตรีม", email="stream@example.com",
+            phone="0800000000", date_of_birth=datetime(1990, 1, 1), address="1", province="น่าน",
+            district="เมือง", sub_district="ในเวียง", postal_code="55000", target_provinces=["น่าน"],
+        )
+        session.add(registration)
+        session.commit()
+        registration_id = registration.id
+
+    broadcaster = StatusBroadcaster(engine=async_engine)
+
+    async def scenario():
+        await broadcaster.start()
+        subscriber = broadcaster.subscribe(registration_id)
+        with Session(engine) as session:
+            row = session.get(Registration, registration_id)
+            row.status = RegistrationStatus.APPROVED
+            session.commit()
+        assert await broadcaster.poll() == 1
+        assert await broadcaster.poll() == 0
+        seq, status, frame = subscriber.queue.get_nowait()
+        await async_engine.dispose()
+        return seq, status, frame
+
+    seq, status, frame = asyncio.run(scenario())
+    assert seq == broadcaster.cursor == 2
+    assert status == "approved"
+    assert b'"registration_id":%d' % registration_id in frame
+    engine.dispose()
+
+def test_stream_unknown_registration_returns_404():
+    """ทดสอบว่าขอ stream ของการลงทะเบียนที่ไม่มีอยู่ได้ 404 (ไม่เปิด stream ค้างไว้)"""
+    assert client.get("/api/v1/registration/999999999/events").status_code == 404
+    assert client.get("/api/v1/registration/citizen/0000000000000/events").status_code == 404
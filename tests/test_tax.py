@@ -1,6 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
+from datetime import datetime
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, SQLModel, create_engine, select
 from thaitour.main import app
+from thaitour.models.tax_model import TaxBenefit, TaxBenefitType
+from thaitour.models.types import json_array_contains
 
 client = TestClient(app)
 
@@ -128,3 +133,21 @@ def test_filter_benefits_by_type():
     data = response.json()
     for benefit in data:
         assert benefit["benefit_type"] == "secondary_province"
+
+def test_applicable_provinces_filter_matches_whole_ids():
+    """ทดสอบตัวกรอง applicable_provinces: เทียบทีละ id ใน JSON array (1 ไม่ตรงกับ 10, 11)"""
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.tables["taxbenefit"].create(engine)
+    with Session(engine) as session:
+        for name, provinces in (("a", [1, 2]), ("b", [10, 11]), ("c", None)):
+            session.add(TaxBenefit(
+                benefit_name=name, benefit_type=TaxBenefitType.ACTIVITY_BASED, description=name,
+                applicable_provinces=provinces, start_date=datetime(2024, 1, 1), end_date=datetime(2030, 1, 1),
+            ))
+        session.commit()
+        statement = select(TaxBenefit.benefit_name).where(json_array_contains(TaxBenefit.applicable_provinces, 1))
+        assert session.exec(statement).all() == ["a"]
+        assert session.exec(select(TaxBenefit).where(TaxBenefit.benefit_name == "b")).one().applicable_provinces == [10, 11]
+
+    compiled = str(statement.compile(dialect=postgresql.dialect()))
+    assert "@> jsonb_build_array(" in compiled
@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+import json
+import logging
+import queue
+import sys
+
+from thaitour.core.config import settings
+
+access_logger = logging.getLogger("thaitour.access")
+slow_logger = logging.getLogger("thaitour.slow")
+
+class JSONFormatter(logging.Formatter):
+    """เขียน record ละหนึ่งบรรทัด JSON (fields จาก extra={"fields": {...}})"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "logger": record.name,
+        }
+        fields = getattr(record, "fields", None)
+        if fields is not None:
+            entry.update(fields)
+        else:
+            entry["message"] = record.getMessage()
+        return json.dumps(entry, ensure_ascii=False)
+
+class _FieldsQueueHandler(QueueHandler):
+    """
+    QueueHandler ที่ไม่ format record บน event loop: ส่ง dict fields ไปให้ listener thread
+    แปลงเป็น JSON เอง (QueueHandler ปกติเรียก format() ก่อนใส่คิว)
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if getattr(record, "fields", None) is not None:
+            return record
+        return super().prepare(record)
+
+def _stream_handler(path: Optional[str], name: str) -> logging.Handler:
+    handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JSONFormatter())
+    handler.addFilter(logging.Filter(name))
+    return handler
+
+def start_access_log() -> Optional[QueueListener]:
+    """
+    ติดตั้ง access log และ slow-request log: logger ใส่ record ลงคิว (ไม่ block event loop)
+    แล้ว thread ของ QueueListener เป็นผู้เขียนไฟล์/stderr
+    """
+    handlers = []
+    if settings.access_log_enabled:
+        handlers.append(_stream_handler(settings.access_log_file, access_logger.name))
+    if settings.slow_request_threshold_ms:
+        handlers.append(_stream_handler(settings.slow_request_log_file, slow_logger.name))
+    if not handlers:
+        return None
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _FieldsQueueHandler(records)
+    for logger, enabled in ((access_logger, settings.access_log_enabled),
+                            (slow_logger, bool(settings.slow_request_threshold_ms))):
+        if enabled:
+            logger.addHandler(queue_handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    listener = QueueListener(records, *handlers)
+    listener.queue_handler = queue_handler
+    listener.start()
+    return listener
+
+def stop_access_log(listener: Optional[QueueListener]) -> None:
+    """เขียน record ที่ค้างในคิวให้หมด แล้วถอด handler ออกจาก logger"""
+    if listener is None:
+        return
+    listener.stop()
+    for logger in (access_logger, slow_logger):
+        logger.removeHandler(listener.queue_handler)
+        logger.propagate = True
+    for handler in listener.handlers:
+        handler.close()
+
+def _normalize(statement: str) -> str:
+    return " ".join(statement.split())
+
+def log_request(scope, status: int, stats) -> None:
+    """
+    เขียน access log ของ request (route template, status และเวลาแยกส่วน)
+    และเขียน slow-request log พร้อม SQL ที่รันเมื่อใช้เวลาเกิน SLOW_REQUEST_THRESHOLD_MS
+    """
+    elapsed = stats.elapsed()
+    threshold = settings.slow_request_threshold_ms
+    slow = (bool(threshold) and elapsed * 1000 >= threshold and not stats.streaming
+            and slow_logger.isEnabledFor(logging.INFO))
+    if not slow and not access_logger.isEnabledFor(logging.INFO):
+        return
+
+    route = scope.get("route")
+    client = scope.get("client")
+    fields = {
+        "method": scope["method"],
+        "route": getattr(route, "path", None) or "unmatched",
+        "path": scope["path"],
+        "status": status,
+        "duration_ms": round(elapsed * 1000, 2),
+        "db_ms": round(stats.db_time * 1000, 2),
+        "queries": stats.query_count,
+        "auth_ms": round(stats.auth_time * 1000, 2),
+        "serialization_ms": round(stats.serialization_time * 1000, 2),
+        "client": client[0] if client else None,
+    }
+    if access_logger.isEnabledFor(logging.INFO):
+        access_logger.info("request", extra={"fields": fields})
+    if slow:
+        slow_logger.info("slow request", extra={"fields": {
+            **fields,
+            "threshold_ms": threshold,
+            "statements": [
+                {"sql": _normalize(statement), "ms": round(duration * 1000, 2)}
+                for statement, duration in stats.queries
+            ],
+            "statements_truncated": stats.query_count > len(stats.queries),
+        }})
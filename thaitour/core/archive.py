@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+import time
+
+from sqlalchemy import DateTime, false, func, literal, or_, select
+from sqlalchemy.engine import Engine
+
+from thaitour.core.config import Settings, get_settings
+from thaitour.models.registration_model import Registration, RegistrationArchive, RegistrationStatus
+
+@dataclass(frozen=True)
+class ArchivePolicy:
+    """
+    แถวที่ย้ายไปตาราง archive: สถานะใน statuses ที่ไม่ถูกแก้ไขมาอย่างน้อย min_age_days วัน
+    หรือลงทะเบียนก่อน registered_before (แคมเปญที่จบแล้ว)
+    """
+    statuses: tuple[RegistrationStatus, ...] = (RegistrationStatus.REJECTED,)
+    min_age_days: int = 30
+    registered_before: Optional[datetime] = None
+
+    @classmethod
+    def from_settings(cls, config: Optional[Settings] = None) -> "ArchivePolicy":
+        config = config or get_settings()
+        return cls(
+            statuses=tuple(RegistrationStatus(value) for value in config.archive_statuses),
+            min_age_days=config.archive_min_age_days,
+            registered_before=config.archive_registered_before,
+        )
+
+    def condition(self, now: datetime):
+        table = Registration.__table__
+        clauses = []
+        if self.statuses:
+            last_changed = func.coalesce(table.c.updated_at, table.c.registration_date)
+            clauses.append(
+                table.c.status.in_(self.statuses) & (last_changed < now - timedelta(days=self.min_age_days))
+            )
+        if self.registered_before is not None:
+            clauses.append(table.c.registration_date < self.registered_before)
+        return or_(*clauses) if clauses else false()
+
+def archive_registrations(engine: Engine, policy: Optional[ArchivePolicy] = None, chunk_size: Optional[int] = None,
+                          pause_seconds: float = 0.0, dry_run: bool = False,
+                          log: Callable[[str], None] = print) -> int:
+    """
+    ย้ายแถวที่ตรงนโยบายจาก registration ไป registrationarchive ทีละ chunk
+    แต่ละ chunk คัดลอกและลบใน transaction เดียว (ล็อกแถวก่อนบน Postgres) จึงหยุดกลางทางได้
+    โดยไม่มีแถวซ้ำหรือหาย คืนจำนวนแถวที่ย้าย (dry_run: จำนวนที่จะย้าย)
+    """
+    policy = policy or ArchivePolicy.from_settings()
+    chunk_size = chunk_size or get_settings().archive_chunk_size
+    now = datetime.utcnow()
+    condition = policy.condition(now)
+    hot = Registration.__table__
+    archive = RegistrationArchive.__table__
+    columns = [column.name for column in hot.columns]
+
+    if dry_run:
+        with engine.connect() as connection:
+            return connection.execute(select(func.count()).select_from(hot).where(condition)).scalar()
+
+    moved = 0
+    last_id = 0
+    started = time.perf_counter()
+    while True:
+        with engine.begin() as connection:
+            ids = connection.execute(
+                select(hot.c.id).where((hot.c.id > last_id) & condition)
+                .order_by(hot.c.id).limit(chunk_size).with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not ids:
+                break
+            connection.execute(archive.insert().from_select(
+                [*columns, "archived_at"],
+                select(*(hot.c[name] for name in columns), literal(now, DateTime).label("archived_at"))
+                .where(hot.c.id.in_(ids)),
+            ))
+            connection.execute(hot.delete().where(hot.c.id.in_(ids)))
+
+        last_id = ids[-1]
+        moved += len(ids)
+        rate = moved / max(time.perf_counter() - started, 1e-9)
+        log(f"  … ย้ายแล้ว {moved} แถว ({rate:.0f} แถว/วินาที, id ล่าสุด {last_id})")
+        if pause_seconds:
+            # เว้นช่วงให้ request ที่เขียนตารางหลักได้ lock ระหว่าง chunk
+            time.sleep(pause_seconds)
+    return moved
@@ -0,0 +1,134 @@
+from collections import deque
+from datetime import datetime
+from threading import Lock
+from typing import Any, Optional
+import asyncio
+import logging
+
+from sqlalchemy.engine import Engine
+
+from thaitour.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# นโยบายเมื่อคิวเต็ม
+DROP_OLDEST = "drop_oldest"  # ทิ้ง event เก่าสุด (request ไม่ช้าลง แต่ข้อมูลหายได้)
+DROP_NEWEST = "drop_newest"  # ทิ้ง event ใหม่
+BLOCK = "block"              # request ที่ส่ง event รอจนกว่าจะเขียนลงตารางได้ (ไม่มีข้อมูลหาย)
+
+def diff(obj: Any, update_data: dict) -> dict:
+    """field ที่ค่าจะเปลี่ยน -> [ค่าเดิม, ค่าใหม่] (เรียกก่อน setattr)"""
+    changes = {}
+    for field, value in update_data.items():
+        old = getattr(obj, field, None)
+        if value is not None and old != value:
+            changes[field] = [old, value]
+    return changes
+
+class AuditLog:
+    """
+    audit event แบบ append-only: router ใส่ event ลงคิวในหน่วยความจำ (ไม่มี INSERT ใน request)
+    background writer เขียนเป็น batch ละหนึ่ง transaction (commit/fsync ครั้งเดียวต่อ batch)
+
+    คิวมีขนาดจำกัด AUDIT_QUEUE_MAX; เมื่อเต็มทำตาม AUDIT_OVERFLOW_POLICY
+    """
+
+    def __init__(self, max_size: Optional[int] = None, policy: Optional[str] = None, batch_size: Optional[int] = None):
+        self._max_size = max_size
+        self._policy = policy
+        self._batch_size = batch_size
+        self._queue: deque[dict] = deque()
+        self._lock = Lock()
+        self.dropped = 0
+        self.written = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size if self._max_size is not None else settings.audit_queue_max
+
+    @property
+    def policy(self) -> str:
+        return self._policy or settings.audit_overflow_policy
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size or settings.audit_batch_size
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def _append(self, event: dict) -> bool:
+        """ใส่ลงคิว คืน False เมื่อคิวเต็มและต้องรอ (นโยบาย block)"""
+        with self._lock:
+            if len(self._queue) >= self.max_size:
+                if self.policy == BLOCK:
+                    return False
+                self.dropped += 1
+                if self.policy == DROP_NEWEST:
+                    return True
+                self._queue.popleft()
+            self._queue.append(event)
+        return True
+
+    @staticmethod
+    def _event(entity: str, entity_id: Any, action: str, actor: Optional[str], changes: Optional[dict]) -> dict:
+        return {
+            "occurred_at": datetime.utcnow(),
+            "actor": actor,
+            "entity": entity,
+            "entity_id": str(entity_id),
+            "action": action,
+            "changes": changes or None,
+        }
+
+    async def emit(self, entity: str, entity_id: Any, action: str, actor: Optional[str] = None,
+                   changes: Optional[dict] = None) -> None:
+        """
+        ใส่ event ลงคิวจาก request handler (เรียกหลัง commit) ถ้าคิวเต็มและนโยบายเป็น block
+        จะเขียน batch ใน thread ก่อน: request นี้ช้าลงแทนที่จะทิ้ง event
+        """
+        if not settings.audit_enabled:
+            return
+        event = self._event(entity, entity_id, action, actor, changes)
+        while not self._append(event):
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                # ข้อมูลหลัก commit ไปแล้ว: ไม่ทำให้ request ล้มเพราะ audit
+                logger.exception("Failed to write audit events; event dropped")
+                self.dropped += 1
+                return
+
+    def flush(self, engine: Optional[Engine] = None) -> int:
+        """เขียน event ที่ค้างอยู่ทั้งหมดเป็น batch ละ AUDIT_BATCH_SIZE แถว คืนจำนวนแถว"""
+        from thaitour.models.audit_model import AuditEvent
+        if engine is None:
+            from thaitour.models import engine
+
+        written = 0
+        while True:
+            with self._lock:
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            if not batch:
+                return written
+            try:
+                with engine.begin() as connection:
+                    connection.execute(AuditEvent.__table__.insert(), batch)
+            except Exception:
+                # ใส่กลับหัวคิวตามลำดับเดิมเพื่อลองใหม่รอบถัดไป
+                with self._lock:
+                    self._queue.extendleft(reversed(batch))
+                raise
+            written += len(batch)
+            self.written += len(batch)
+
+    async def run_periodic(self, interval: float, engine: Optional[Engine] = None) -> None:
+        """background task: flush ทุก interval วินาทีจนกว่าจะถูก cancel"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush, engine)
+            except Exception:
+                logger.exception("Failed to write audit events")
+
+audit_log = AuditLog()
@@ -0,0 +1,96 @@
+from typing import Any, Awaitable, Callable
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from thaitour.core.cache import TTLCache
+from thaitour.core.config import settings
+from thaitour.core.invalidation import on_invalidate, publish
+from thaitour.core.singleflight import SingleFlight
+
+Loader = Callable[[AsyncSession], Awaitable[Any]]
+
+# key -> response ที่ validate แล้ว (ใช้ร่วมกันทุก request จนหมดอายุหรือข้อมูลเปลี่ยน)
+catalog_cache = TTLCache(maxsize=64, name="catalog")
+
+# โหลด key เดียวกันพร้อมกัน (cache หมดอายุหรือถูกล้างตอนมีคนเข้าจำนวนมาก) ทำครั้งเดียว
+catalog_flight = SingleFlight("catalog")
+
+# เพิ่มทุกครั้งที่ล้าง cache: ผลที่เริ่มโหลดก่อนถูกล้างไม่ถูกเก็บ และ request ใหม่ไม่รอผลเก่า
+_generation = 0
+
+# model ที่ข้อมูลใน catalog_cache มาจาก
+_watched_models: tuple = ()
+
+# key -> ฟังก์ชันโหลดข้อมูล (ลงทะเบียนโดย router ใช้ตอน warm cache ตอน startup)
+catalog_loaders: dict[str, Loader] = {}
+
+def catalog_loader(key: str):
+    """ลงทะเบียนฟังก์ชันโหลดข้อมูล catalog ภายใต้ key"""
+    def decorator(loader: Loader) -> Loader:
+        catalog_loaders[key] = loader
+        return loader
+    return decorator
+
+async def _load_catalog(key: str, generation: int) -> Any:
+    from thaitour.models import get_database
+
+    # งานนี้ใช้ร่วมกันหลาย request: เปิด session ของตัวเอง ไม่ใช้ session ของ request ที่เริ่มงาน
+    async with get_database().session_router.session(read_only=True) as session:
+        value = await catalog_loaders[key](session)
+    if settings.catalog_cache_ttl_seconds > 0 and generation == _generation:
+        catalog_cache.set(key, value, expires_at=time.time() + settings.catalog_cache_ttl_seconds)
+    return value
+
+async def get_catalog(key: str) -> Any:
+    """
+    คืนค่าจาก cache หรือโหลดใหม่ด้วย loader ของ key แล้วเก็บไว้ CATALOG_CACHE_TTL_SECONDS วินาที
+    request ที่ไม่เจอ cache พร้อมกันรอการโหลดครั้งเดียวกัน
+    """
+    value = catalog_cache.get(key)
+    if value is not None:
+        return value
+    generation = _generation
+    return await catalog_flight.do((key, generation), lambda: _load_catalog(key, generation))
+
+async def warm_catalog() -> int:
+    """โหลดทุก key เข้า cache ล่วงหน้า (เรียกจาก lifespan) คืนจำนวน key"""
+    for key in catalog_loaders:
+        catalog_cache.pop(key)
+        await get_catalog(key)
+    return len(catalog_loaders)
+
+@on_invalidate("catalog")
+def invalidate_catalog() -> None:
+    global _generation
+    _generation += 1
+    catalog_cache.clear()
+
+def watch_catalog_model(model) -> None:
+    """ล้าง cache หลัง commit ที่เพิ่ม แก้ไข หรือลบ model นี้"""
+    global _watched_models
+    if model not in _watched_models:
+        _watched_models = (*_watched_models, model)
+
+@event.listens_for(Session, "after_flush")
+def _mark_catalog_changes(session, flush_context):
+    if not _watched_models or session.info.get("catalog_changed"):
+        return
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _watched_models):
+            session.info["catalog_changed"] = True
+            # แจ้ง worker อื่นใน transaction เดียวกัน (ครั้งเดียวต่อ transaction)
+            publish(session.connection(), "catalog")
+            return
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    # ล้างหลัง commit (ไม่ใช่ตอน flush) เพื่อไม่ให้ request อื่นโหลดข้อมูลเก่ากลับเข้า cache
+    if session.info.pop("catalog_changed", False):
+        invalidate_catalog()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_changes(session):
+    session.info.pop("catalog_changed", None)
@@ -0,0 +1,100 @@
+from datetime import datetime
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event, func, inspect, text, true
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from thaitour.models.changelog_model import ChangeLog
+from thaitour.models.province_model import Province
+from thaitour.models.registration_model import Registration
+from thaitour.models.tax_model import TaxBenefit
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# model -> ชื่อ entity ใน change feed
+tracked_models: dict[type, str] = {}
+
+# Postgres: seq = txid ของ transaction ที่เขียน << TXID_SHIFT | ลำดับภายใน transaction (ไม่ต้องล็อกร่วมกันระหว่าง writer)
+# seq จึงเรียงตาม txid และ reader อ่านเฉพาะ transaction ที่ต่ำกว่า xmin ของ snapshot (จบหมดแล้ว)
+# entry ที่มาทีหลังจึงมี seq มากกว่าทุก entry ที่อ่านไปแล้วเสมอ
+TXID_SHIFT = 20
+_TXID_SQL = text("SELECT txid_current()")
+
+# engine ที่มีตาราง changelog แล้ว (ฐานข้อมูลที่ยังไม่มีตาราง เช่น ก่อน migrate ไม่บันทึก)
+_changelog_engines: "WeakKeyDictionary[Engine, bool]" = WeakKeyDictionary()
+
+def track_changes(model, entity: str) -> None:
+    """บันทึกการเพิ่ม แก้ไข และลบ model นี้ลง change feed ใน transaction เดียวกับการเขียน"""
+    tracked_models[model] = entity
+
+def settled(dialect: str):
+    """
+    เงื่อนไขของ entry ที่ไม่มี entry seq น้อยกว่าตามมาทีหลัง (ใช้กับทุก query ที่อ่านต่อจาก cursor)
+    SQLite เขียนทีละ transaction: ทุก entry ที่เห็นแล้วใช้ได้
+    """
+    if dialect != "postgresql":
+        return true()
+    return ChangeLog.seq < func.txid_snapshot_xmin(func.txid_current_snapshot()) * (1 << TXID_SHIFT)
+
+def _has_changelog(connection) -> bool:
+    if connection.engine in _changelog_engines:
+        return True
+    if not inspect(connection).has_table(ChangeLog.__tablename__):
+        return False
+    _changelog_engines[connection.engine] = True
+    return True
+
+def _assign_seqs(session, connection, rows: list[dict]) -> None:
+    """Postgres: ใส่ seq จาก txid ของ transaction นี้ (ครั้งแรกของ transaction อ่าน txid)"""
+    if "changelog_txid" not in session.info:
+        session.info["changelog_txid"] = connection.execute(_TXID_SQL).scalar()
+        session.info["changelog_count"] = 0
+    base = session.info["changelog_txid"] << TXID_SHIFT
+    count = session.info["changelog_count"]
+    if count + len(rows) > 1 << TXID_SHIFT:
+        raise ValueError(f"change feed บันทึกได้ไม่เกิน {1 << TXID_SHIFT} รายการต่อ transaction")
+    for offset, row in enumerate(rows, count):
+        row["seq"] = base + offset
+    session.info["changelog_count"] = count + len(rows)
+
+@event.listens_for(Session, "after_flush")
+def _record_changes(session, flush_context):
+    if not tracked_models:
+        return
+    rows = []
+    now = datetime.utcnow()
+    # dirty รวม object ที่แค่ถูก setattr ค่าเดิม: ไม่นับเป็นการเปลี่ยนแปลง
+    changes = (
+        (session.new, UPSERT, False),
+        (session.dirty, UPSERT, True),
+        (session.deleted, DELETE, False),
+    )
+    for instances, op, check_modified in changes:
+        for instance in instances:
+            entity = tracked_models.get(type(instance))
+            if entity is None:
+                continue
+            if check_modified and not session.is_modified(instance, include_collections=False):
+                continue
+            rows.append({"entity": entity, "entity_id": str(instance.id), "op": op, "changed_at": now})
+    if not rows:
+        return
+
+    connection = session.connection()
+    if not _has_changelog(connection):
+        return
+    if connection.dialect.name == "postgresql":
+        _assign_seqs(session, connection, rows)
+    connection.execute(ChangeLog.__table__.insert(), rows)
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _reset_changelog_txid(session):
+    session.info.pop("changelog_txid", None)
+    session.info.pop("changelog_count", None)
+
+track_changes(Province, "province")
+track_changes(TaxBenefit, "tax_benefit")
+track_changes(Registration, "registration")
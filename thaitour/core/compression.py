@@ -0,0 +1,161 @@
+from typing import Optional
+import gzip
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from thaitour.core.cache import TTLCache
+from thaitour.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli เป็น dependency เสริม (thaitour[compression]); ไม่มีก็ใช้ gzip อย่างเดียว
+    brotli = None
+
+# ชนิดเนื้อหาที่บีบอัดได้คุ้ม (JSON/ข้อความภาษาไทยเป็น UTF-8 ที่ซ้ำกันมาก)
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+# stream ที่ต้องส่งทันทีทีละ event ห้ามรวบ body
+UNBUFFERED_TYPES = ("text/event-stream",)
+
+def varies_by_encoding(headers: Headers) -> bool:
+    """
+    response ที่บีบอัดได้ (ชนิดข้อความ ไม่ใช่ stream) ต้องมี Vary: Accept-Encoding เสมอ
+    แม้ครั้งนี้จะส่งแบบไม่บีบอัด (ไม่มี Accept-Encoding หรือเล็กกว่า minimum_size)
+    ไม่งั้น shared cache อาจส่ง body ผิด encoding ให้ client อื่น
+    """
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(UNBUFFERED_TYPES)
+
+def available_encodings() -> tuple[str, ...]:
+    """encoding ที่เซิร์ฟเวอร์ทำได้ เรียงตามที่อยากใช้ก่อน"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def choose_encoding(accept_encoding: str, available: Optional[tuple[str, ...]] = None) -> Optional[str]:
+    """
+    เลือก encoding จาก Accept-Encoding ตาม q-value (เท่ากันใช้ลำดับของ available)
+    None = ส่งแบบไม่บีบอัด
+    """
+    available = available or available_encodings()
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+class Compressor:
+    """
+    บีบอัด body ที่สมบูรณ์แล้ว และ cache ผลตาม digest ของ body + encoding
+    response ที่ได้ bytes เดิมซ้ำ (catalog cache, หน้าเดิมของรายการ) จึงไม่บีบอัดใหม่ทุก request
+    """
+
+    def __init__(self, gzip_level: Optional[int] = None, brotli_quality: Optional[int] = None,
+                 cache_size: Optional[int] = None):
+        self.gzip_level = settings.compression_gzip_level if gzip_level is None else gzip_level
+        self.brotli_quality = settings.compression_brotli_quality if brotli_quality is None else brotli_quality
+        cache_size = settings.compression_cache_size if cache_size is None else cache_size
+        self.cache = TTLCache(cache_size, "compression") if cache_size > 0 else None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        # mtime=0: ผลลัพธ์เหมือนกันทุกครั้งสำหรับ body เดียวกัน
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if self.cache is None:
+            return self._compress(body, encoding)
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = self._compress(body, encoding)
+            self.cache.set(key, compressed)
+        return compressed
+
+class CompressionMiddleware:
+    """
+    ASGI middleware: บีบอัด response ที่ส่ง body ครั้งเดียว มีขนาดอย่างน้อย minimum_size
+    และเป็นชนิดข้อความ ตาม Accept-Encoding (br ถ้ามี brotli, ไม่งั้น gzip)
+
+    response แบบ streaming (body หลายชิ้น เช่น SSE) ส่งผ่านตามเดิมโดยไม่รวบ body
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None, compressor: Optional[Compressor] = None):
+        self.app = app
+        self.minimum_size = settings.compression_min_size if minimum_size is None else minimum_size
+        self.compressor = compressor or Compressor()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            async def send_identity(message):
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(raw=message["headers"])
+                    if varies_by_encoding(headers):
+                        headers.add_vary_header("Accept-Encoding")
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if content_type.startswith(UNBUFFERED_TYPES):
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            eligible = (
+                not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+                and "content-encoding" not in headers
+                and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            )
+            passthrough = True
+            if varies_by_encoding(headers):
+                headers.add_vary_header("Accept-Encoding")
+            if not eligible:
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self.compressor.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import Optional
+from datetime import datetime
 import os
 
 class Settings(BaseSettings):
@@ -9,11 +11,98 @@ class Settings(BaseSettings):
     
     # Database settings
     database_url: str = Field(default="sqlite:///./thaitour.db", env="DATABASE_URL")
+    database_replica_urls: list[str] = Field(default=[], env="DATABASE_REPLICA_URLS")  # JSON list
+    replica_sticky_seconds: float = Field(default=5.0, env="REPLICA_STICKY_SECONDS")  # read-your-writes
+    db_echo: bool = Field(default=False, env="DB_ECHO")  # log ทุก SQL statement (ใช้ตอน debug เท่านั้น)
+    db_pool_size: int = Field(default=5, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, env="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, env="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    
+    # SQLite pragmas (ใช้เมื่อ database_url เป็น sqlite เท่านั้น)
+    sqlite_journal_mode: str = Field(default="WAL", env="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", env="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_cache_size: int = Field(default=-64000, env="SQLITE_CACHE_SIZE")  # ค่าติดลบ = KiB
+    sqlite_mmap_size: int = Field(default=268435456, env="SQLITE_MMAP_SIZE")
     
     # Security settings
     secret_key: str = Field(default="your-secret-key-change-this-in-production", env="SECRET_KEY")
     access_token_expire_minutes: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     algorithm: str = "HS256"
+    password_hash_workers: int = Field(default=4, env="PASSWORD_HASH_WORKERS")
+    token_cache_size: int = Field(default=10000, env="TOKEN_CACHE_SIZE")
+    refresh_token_expire_days: int = Field(default=14, env="REFRESH_TOKEN_EXPIRE_DAYS")
+    revoked_refresh_cache_size: int = Field(default=100000, env="REVOKED_REFRESH_CACHE_SIZE")
+    
+    # Login throttling (token bucket ต่อ username และต่อ IP)
+    login_rate_limit_enabled: bool = Field(default=True, env="LOGIN_RATE_LIMIT_ENABLED")
+    login_username_burst: int = Field(default=10, env="LOGIN_USERNAME_BURST")
+    login_username_per_minute: float = Field(default=10.0, gt=0, env="LOGIN_USERNAME_PER_MINUTE")
+    login_ip_burst: int = Field(default=30, env="LOGIN_IP_BURST")
+    login_ip_per_minute: float = Field(default=60.0, gt=0, env="LOGIN_IP_PER_MINUTE")
+    login_rate_limit_max_keys: int = Field(default=100000, env="LOGIN_RATE_LIMIT_MAX_KEYS")
+    
+    # cache ของข้อมูล catalog ที่ไม่ขึ้นกับผู้ใช้ (จังหวัดรอง, สิทธิประโยชน์จังหวัดรอง) 0 = ปิด
+    catalog_cache_ttl_seconds: float = Field(default=60.0, env="CATALOG_CACHE_TTL_SECONDS")
+    
+    # invalidation bus ระหว่าง worker (ตาราง cacheversion) เปิดอัตโนมัติโดย scripts/run-api-prod
+    invalidation_bus_enabled: bool = Field(default=False, env="INVALIDATION_BUS_ENABLED")
+    invalidation_poll_interval_seconds: float = Field(default=0.05, env="INVALIDATION_POLL_INTERVAL_SECONDS")
+    
+    # นโยบายย้ายการลงทะเบียนเก่าไปตาราง registrationarchive (scripts/archive_registrations.py)
+    archive_statuses: list[str] = Field(default=["rejected"], env="ARCHIVE_STATUSES")  # JSON list
+    archive_min_age_days: int = Field(default=30, env="ARCHIVE_MIN_AGE_DAYS")  # ไม่มีการแก้ไขมาแล้วกี่วัน
+    archive_registered_before: Optional[datetime] = Field(default=None, env="ARCHIVE_REGISTERED_BEFORE")  # แคมเปญที่จบแล้ว
+    archive_chunk_size: int = Field(default=500, env="ARCHIVE_CHUNK_SIZE")
+    
+    # audit log: คิวในหน่วยความจำ + writer เบื้องหลังที่เขียนเป็น batch
+    audit_enabled: bool = Field(default=True, env="AUDIT_ENABLED")
+    audit_queue_max: int = Field(default=10000, env="AUDIT_QUEUE_MAX")
+    audit_overflow_policy: str = Field(default="block", env="AUDIT_OVERFLOW_POLICY")  # block | drop_oldest | drop_newest
+    audit_batch_size: int = Field(default=500, env="AUDIT_BATCH_SIZE")
+    audit_flush_interval_seconds: float = Field(default=1.0, env="AUDIT_FLUSH_INTERVAL_SECONDS")
+    
+    # SSE สถานะการลงทะเบียน: broadcaster หนึ่งตัวต่อ worker อ่าน changelog
+    status_stream_enabled: bool = Field(default=True, env="STATUS_STREAM_ENABLED")
+    status_stream_poll_interval_seconds: float = Field(default=0.5, env="STATUS_STREAM_POLL_INTERVAL_SECONDS")
+    status_stream_heartbeat_seconds: float = Field(default=15.0, env="STATUS_STREAM_HEARTBEAT_SECONDS")
+    status_stream_client_queue_size: int = Field(default=16, env="STATUS_STREAM_CLIENT_QUEUE_SIZE")
+    status_stream_replay_buffer_size: int = Field(default=4096, env="STATUS_STREAM_REPLAY_BUFFER_SIZE")
+    status_stream_max_clients: int = Field(default=50000, env="STATUS_STREAM_MAX_CLIENTS")  # ต่อ worker
+    
+    # เขียน last_login แบบ write-behind ทุก ๆ กี่วินาที
+    last_login_flush_interval_seconds: float = Field(default=5.0, env="LAST_LOGIN_FLUSH_INTERVAL_SECONDS")
+    
+    # SQL instrumentation ต่อ request (0 = ปิดการตรวจ)
+    server_timing_enabled: bool = Field(default=True, env="SERVER_TIMING_ENABLED")
+    sql_query_budget: int = Field(default=20, env="SQL_QUERY_BUDGET")
+    sql_repeat_threshold: int = Field(default=5, env="SQL_REPEAT_THRESHOLD")  # statement เดิมซ้ำกี่ครั้งถึงเตือน N+1
+    
+    # /metrics: ไดเรกทอรีสำหรับ snapshot ของแต่ละ worker (None = รายงานเฉพาะ process นี้)
+    metrics_dir: Optional[str] = Field(default=None, env="METRICS_DIR")
+    metrics_snapshot_interval_seconds: float = Field(default=5.0, env="METRICS_SNAPSHOT_INTERVAL_SECONDS")
+    
+    # access log แบบ JSON ทุก request และ slow-request log พร้อม SQL (ไฟล์ None = stderr)
+    access_log_enabled: bool = Field(default=True, env="ACCESS_LOG_ENABLED")
+    access_log_file: Optional[str] = Field(default=None, env="ACCESS_LOG_FILE")
+    slow_request_threshold_ms: float = Field(default=500.0, env="SLOW_REQUEST_THRESHOLD_MS")  # 0 = ปิด
+    slow_request_log_file: Optional[str] = Field(default=None, env="SLOW_REQUEST_LOG_FILE")
+    slow_request_max_statements: int = Field(default=50, env="SLOW_REQUEST_MAX_STATEMENTS")
+    
+    # Profiling ตามคำขอ (admin + header X-Profile: cprofile|sample)
+    profiling_enabled: bool = Field(default=False, env="PROFILING_ENABLED")
+    profile_dir: str = Field(default="./profiles", env="PROFILE_DIR")
+    profile_header: str = Field(default="X-Profile", env="PROFILE_HEADER")
+    profile_sample_interval_seconds: float = Field(default=0.005, env="PROFILE_SAMPLE_INTERVAL_SECONDS")
+    
+    # บีบอัด response ตาม Accept-Encoding (brotli ใช้ได้เมื่อติดตั้ง thaitour[compression])
+    compression_enabled: bool = Field(default=True, env="COMPRESSION_ENABLED")
+    compression_min_size: int = Field(default=1024, env="COMPRESSION_MIN_SIZE")  # bytes
+    compression_gzip_level: int = Field(default=6, env="COMPRESSION_GZIP_LEVEL")  # 1-9
+    compression_brotli_quality: int = Field(default=5, env="COMPRESSION_BROTLI_QUALITY")  # 0-11
+    compression_cache_size: int = Field(default=256, env="COMPRESSION_CACHE_SIZE")  # จำนวน body, 0 = ไม่ cache
     
     # API settings
     api_v1_str: str = "/api/v1"
@@ -32,4 +121,39 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
 
-settings = Settings()
+_settings: Optional[Settings] = None
+
+def get_settings() -> Settings:
+    """Settings ของ process (อ่าน environment/.env ครั้งแรกที่ถูกใช้ ไม่ใช่ตอน import)"""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+def configure_settings(new_settings: Settings) -> Settings:
+    """ใช้ Settings ที่กำหนดเองแทนค่าจาก environment (เช่น create_app(settings) หรือใน tests)"""
+    global _settings
+    _settings = new_settings
+    return new_settings
+
+class _LazySettings:
+    """
+    ตัวแทนของ get_settings(): โค้ดเดิมที่ใช้ settings.xxx ทำงานเหมือนเดิม
+    แต่ Settings จริงถูกสร้างเมื่ออ่านค่าครั้งแรก และเปลี่ยนได้ด้วย configure_settings
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+    def __delattr__(self, name):
+        delattr(get_settings(), name)
+
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+settings = _LazySettings()
@@ -1,58 +1,197 @@
-from typing import Generator
+from dataclasses import dataclass
+import sys
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session, select
-from thaitour.core.security import verify_token
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from thaitour.core.cache import TTLCache
+from thaitour.core.config import settings
+from thaitour.core.instrumentation import record_auth_time
+from thaitour.core.invalidation import on_invalidate, publish
+from thaitour.core.security import decode_token, verify_token
 from thaitour.models.user_model import User, UserRole
-from thaitour.models import get_session
+from thaitour.models import get_database, get_read_session
 
 security = HTTPBearer()
 
+@dataclass(frozen=True)
+class Principal:
+    """ข้อมูลผู้ใช้ที่ยืนยันตัวตนแล้ว (ไม่ผูกกับ database session)"""
+    id: int
+    username: str
+    role: UserRole
+    is_active: bool
+
+# token -> Principal หมดอายุพร้อม exp ของ token
+principal_cache = TTLCache(maxsize=settings.token_cache_size, name="principal")
+
+# username -> token_version ขั้นต่ำที่ยังใช้ได้ (เก็บเฉพาะผู้ใช้ที่เคยถูกเปลี่ยนสิทธิ์/ระงับ)
+_token_versions: dict[str, int] = {}
+_token_versions_loaded = False
+_REVOKED = sys.maxsize
+
+async def _fetch_token_versions() -> dict[str, int]:
+    async with AsyncSession(get_database().async_engine) as session:
+        rows = (await session.exec(
+            select(User.username, User.token_version, User.is_active).where(
+                (User.token_version > 0) | (User.is_active == False)
+            )
+        )).all()
+    return {username: token_version if is_active else _REVOKED for username, token_version, is_active in rows}
+
+async def load_token_versions() -> None:
+    """
+    โหลดตาราง version จากฐานข้อมูลตอน startup หรือครั้งแรกที่ใช้งาน (ผู้ใช้ส่วนใหญ่ไม่อยู่ในตารางนี้)
+    """
+    global _token_versions_loaded
+    # setdefault: ค่าที่ listener เขียนไว้ระหว่างโหลดใหม่กว่าค่าจากฐานข้อมูล
+    for username, token_version in (await _fetch_token_versions()).items():
+        _token_versions.setdefault(username, token_version)
+    _token_versions_loaded = True
+
+@on_invalidate("users")
+async def refresh_token_versions() -> None:
+    """
+    worker อื่นเปลี่ยน role/สถานะหรือลบผู้ใช้: แทนตาราง version ด้วยค่าจากฐานข้อมูลและล้าง Principal ทั้งหมด
+    (ผู้ใช้ที่ถูกลบไม่มีในตาราง แต่ Principal ต้องโหลดใหม่จากฐานข้อมูลจึงไม่ผ่าน)
+    """
+    global _token_versions_loaded
+    versions = await _fetch_token_versions()
+    _token_versions.clear()
+    _token_versions.update(versions)
+    _token_versions_loaded = True
+    principal_cache.clear()
+
+async def is_token_version_current(username: str, token_version: int) -> bool:
+    if not _token_versions_loaded:
+        await load_token_versions()
+    return token_version >= _token_versions.get(username, 0)
+
+def invalidate_user(username: str) -> int:
+    """
+    ลบ Principal ของผู้ใช้ออกจาก cache (เช่น เมื่อเปลี่ยน role หรือระงับบัญชี)
+    """
+    return principal_cache.discard_where(lambda token, principal: principal.username == username)
+
+def _role_or_status_changed(target: User) -> bool:
+    state = inspect(target)
+    return (
+        state.attrs.role.history.has_changes()
+        or state.attrs.is_active.history.has_changes()
+        or state.attrs.username.history.has_changes()
+    )
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(mapper, connection, target: User):
+    if _role_or_status_changed(target):
+        target.token_version = (target.token_version or 0) + 1
+
+def _stage_token_version(target: User, username: str, token_version: int) -> None:
+    """เก็บ version ใหม่ไว้ใน session จนกว่าจะ commit (ถ้า rollback ฐานข้อมูลยังเป็นค่าเดิม)"""
+    object_session(target).info.setdefault("token_versions", {})[username] = token_version
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_user_update(mapper, connection, target: User):
+    if not _role_or_status_changed(target):
+        return
+    _stage_token_version(target, target.username, target.token_version if target.is_active else _REVOKED)
+    for old_username in inspect(target).attrs.username.history.deleted or ():
+        _stage_token_version(target, old_username, _REVOKED)
+    publish(connection, "users")
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_delete(mapper, connection, target: User):
+    _stage_token_version(target, target.username, _REVOKED)
+    publish(connection, "users")
+
+@event.listens_for(Session, "after_commit")
+def _apply_token_versions(session):
+    for username, token_version in session.info.pop("token_versions", {}).items():
+        _token_versions[username] = token_version
+        invalidate_user(username)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_token_versions(session):
+    session.info.pop("token_versions", None)
+
+def _credentials_exception(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """
     Dependency to get current authenticated user
     """
-    token = credentials.credentials
-    username = verify_token(token)
-    if username is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return username
+    started = time.perf_counter()
+    try:
+        token = credentials.credentials
+        principal = principal_cache.get(token)
+        if principal is not None:
+            return principal.username
+        username = verify_token(token)
+        if username is None:
+            raise _credentials_exception()
+        return username
+    finally:
+        record_auth_time(time.perf_counter() - started)
 
-def get_current_user_with_role(
+async def get_current_user_with_role(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: Session = Depends(get_session)
-) -> User:
+    session: AsyncSession = Depends(get_read_session)
+) -> Principal:
     """
     Dependency to get current authenticated user with role information
     """
-    token = credentials.credentials
-    username = verify_token(token)
-    if username is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
+    started = time.perf_counter()
+    try:
+        return await _resolve_principal(credentials.credentials, session)
+    finally:
+        record_auth_time(time.perf_counter() - started)
+
+async def _resolve_principal(token: str, session: AsyncSession) -> Principal:
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    payload = decode_token(token)
+    if payload is None:
+        raise _credentials_exception()
+
+    if "role" in payload and "ver" in payload and "uid" in payload:
+        # ตรวจสิทธิ์จาก claims ใน token โดยไม่ต้อง query ฐานข้อมูล
+        if not await is_token_version_current(payload["sub"], payload["ver"]):
+            raise _credentials_exception("Token has been revoked")
+        principal = Principal(
+            id=payload["uid"],
+            username=payload["sub"],
+            role=UserRole(payload["role"]),
+            is_active=True,
         )
-    
-    # ดึงข้อมูลผู้ใช้จากฐานข้อมูล
-    user = session.exec(
-        select(User).where(User.username == username, User.is_active == True)
-    ).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found or inactive",
-            headers={"WWW-Authenticate": "Bearer"},
+    else:
+        # token รุ่นเก่าที่ไม่มี claims: ดึงข้อมูลผู้ใช้จากฐานข้อมูล
+        user = (await session.exec(
+            select(User).where(User.username == payload["sub"], User.is_active == True)
+        )).first()
+
+        if not user:
+            raise _credentials_exception("User not found or inactive")
+
+        principal = Principal(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            is_active=user.is_active,
         )
-    
-    return user
+    principal_cache.set(token, principal, expires_at=payload.get("exp"))
+    return principal
 
-def require_admin(current_user: User = Depends(get_current_user_with_role)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_user_with_role)) -> Principal:
     """
     Dependency to require ADMIN role
     """
@@ -63,7 +202,7 @@ def require_admin(current_user: User = Depends(get_current_user_with_role)) -> U
         )
     return current_user
 
-def require_admin_or_moderator(current_user: User = Depends(get_current_user_with_role)) -> User:
+def require_admin_or_moderator(current_user: Principal = Depends(get_current_user_with_role)) -> Principal:
     """
     Dependency to require ADMIN or MODERATOR role
     """
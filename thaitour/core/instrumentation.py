@@ -0,0 +1,194 @@
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+import asyncio
+import functools
+import logging
+import time
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from thaitour.core.access_log import log_request
+from thaitour.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class RequestStats:
+    """
+    สถิติของ request เดียว: จำนวน query, เวลาใน DB, จำนวนครั้งที่แต่ละ statement ถูกรัน
+    เวลาตรวจสิทธิ์ (auth) และเวลา serialize response
+    queries เก็บ (statement, เวลา) ตามลำดับไม่เกิน capture_limit รายการ สำหรับ slow-request log
+    """
+
+    __slots__ = (
+        "started", "query_count", "db_time", "statements", "queries", "capture_limit",
+        "auth_time", "serialization_time", "endpoint_finished", "streaming",
+    )
+
+    def __init__(self, capture_limit: Optional[int] = None):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.statements: Counter = Counter()
+        self.queries: list[tuple[str, float]] = []
+        self.capture_limit = settings.slow_request_max_statements if capture_limit is None else capture_limit
+        self.auth_time = 0.0
+        self.serialization_time = 0.0
+        self.endpoint_finished: Optional[float] = None
+        # response แบบ text/event-stream เปิดค้างได้นาน: ไม่นับเป็น slow request
+        self.streaming = False
+
+    def record_query(self, statement: str, duration: float) -> None:
+        self.query_count += 1
+        self.db_time += duration
+        self.statements[statement] += 1
+        if len(self.queries) < self.capture_limit:
+            self.queries.append((statement, duration))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """statement ที่ถูกรันซ้ำอย่างน้อย threshold ครั้ง (มักเป็น N+1)"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.query_count} queries", '
+            f"auth;dur={self.auth_time * 1000:.2f}, "
+            f"ser;dur={self.serialization_time * 1000:.2f}, "
+            f"total;dur={self.elapsed() * 1000:.2f}"
+        )
+
+# สถิติของ request ปัจจุบัน (None เมื่ออยู่นอก request เช่น scripts)
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_request_stats.get() is not None:
+        context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request_stats.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.record_query(statement, time.perf_counter() - started)
+
+def instrument_engine(sync_engine: Engine) -> None:
+    """
+    ติดตั้ง hook นับ query และเวลาใน DB ให้ engine
+    (async engine ให้ส่ง .sync_engine; contextvar ถูกส่งต่อเข้า greenlet ของ SQLAlchemy)
+    """
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+def record_auth_time(duration: float) -> None:
+    """บวกเวลาตรวจสิทธิ์เข้ากับ request ปัจจุบัน (ใช้ใน dependency ของ auth)"""
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.auth_time += duration
+
+def _mark_endpoint_finished() -> None:
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.endpoint_finished = time.perf_counter()
+
+def _timed_endpoint(endpoint):
+    """ห่อ endpoint ให้บันทึกเวลาที่ทำงานเสร็จ (ก่อน FastAPI validate/serialize response)"""
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+    timed._timed = True
+    return timed
+
+class TimedAPIRoute(APIRoute):
+    """
+    APIRoute ที่วัดเวลา serialization: ตั้งแต่ endpoint คืนค่าจนได้ Response
+    (validate ด้วย response_model + jsonable_encoder + render JSON)
+    ใช้กับ router ด้วย APIRouter(route_class=TimedAPIRoute)
+    """
+
+    def get_route_handler(self):
+        if not getattr(self.dependant.call, "_timed", False):
+            self.dependant.call = _timed_endpoint(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            stats = current_request_stats.get()
+            if stats is not None and stats.endpoint_finished is not None:
+                stats.serialization_time += time.perf_counter() - stats.endpoint_finished
+                stats.endpoint_finished = None
+            return response
+
+        return timed_handler
+
+def check_query_budget(stats: RequestStats, method: str, path: str) -> None:
+    """log warning เมื่อ request ใช้ query เกินงบ หรือรัน statement เดิมซ้ำหลายครั้ง"""
+    if settings.sql_query_budget and stats.query_count > settings.sql_query_budget:
+        logger.warning(
+            "%s %s issued %d queries (budget %d, %.1f ms in DB)",
+            method, path, stats.query_count, settings.sql_query_budget, stats.db_time * 1000,
+        )
+    if settings.sql_repeat_threshold:
+        for statement, count in stats.repeated_statements(settings.sql_repeat_threshold):
+            logger.warning(
+                "%s %s repeated the same statement %d times (possible N+1): %s",
+                method, path, count, " ".join(statement.split())[:200],
+            )
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware: เก็บ RequestStats ต่อ request, ใส่ header Server-Timing ตรวจงบ query
+    และเขียน access log / slow-request log
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] != "http.response.start":
+                await send(message)
+                return
+            status = message["status"]
+            stats.streaming = any(
+                name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                for name, value in message.get("headers", ())
+            )
+            if settings.server_timing_enabled:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_stats.reset(token)
+            check_query_budget(stats, scope["method"], scope["path"])
+            log_request(scope, status, stats)
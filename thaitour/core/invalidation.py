@@ -0,0 +1,98 @@
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Union
+import asyncio
+import inspect
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from thaitour.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[], Union[None, Awaitable[None]]]
+
+# channel -> ฟังก์ชันล้าง cache ในหน่วยความจำของ worker นี้
+_handlers: dict[str, list[Handler]] = {}
+
+# upsert แบบ statement เดียว (SQLite 3.24+ และ Postgres ใช้ไวยากรณ์เดียวกัน) ไม่มี race ตอนสร้างแถวแรก
+_PUBLISH_SQL = text(
+    "INSERT INTO cacheversion (channel, version, updated_at) VALUES (:channel, 1, :now) "
+    "ON CONFLICT (channel) DO UPDATE SET version = cacheversion.version + 1, updated_at = excluded.updated_at"
+)
+_VERSIONS_SQL = text("SELECT channel, version FROM cacheversion")
+
+# หน่วงเพิ่มหลัง poll ล้มเหลว (เช่นยังไม่ได้ migrate ตาราง) เพื่อไม่ให้ log ท่วม
+_ERROR_BACKOFF_SECONDS = 5.0
+
+def on_invalidate(channel: str):
+    """ลงทะเบียนฟังก์ชัน (sync หรือ async) ที่ถูกเรียกเมื่อ worker อื่นประกาศว่า channel เปลี่ยน"""
+    def decorator(handler: Handler) -> Handler:
+        _handlers.setdefault(channel, []).append(handler)
+        return handler
+    return decorator
+
+def publish(connection: Connection, channel: str) -> None:
+    """
+    เพิ่ม version ของ channel ใน transaction เดียวกับการเขียนข้อมูล
+    worker อื่นเห็นหลัง commit เท่านั้น และถ้า rollback ก็ไม่มีผล
+    """
+    if settings.invalidation_bus_enabled:
+        connection.execute(_PUBLISH_SQL, {"channel": channel, "now": datetime.utcnow()})
+
+class InvalidationBus:
+    """
+    invalidation ระหว่าง worker โดยไม่ต้องมี broker: แต่ละ worker poll ตาราง cacheversion
+    (แถวละ channel) ทุก INVALIDATION_POLL_INTERVAL_SECONDS และเรียก handler ของ channel
+    ที่ version เปลี่ยน การเขียนของ worker เองก็ถูกเห็นด้วย (ล้างซ้ำได้โดยไม่มีผลเสีย)
+    """
+
+    def __init__(self, engine: Optional[AsyncEngine] = None):
+        self.engine = engine
+        self.versions: Optional[dict[str, int]] = None
+
+    async def _fetch(self) -> dict[str, int]:
+        from thaitour.models import get_database
+
+        # อ่านจาก primary เสมอ (replica อาจยังไม่เห็น version ใหม่)
+        engine = self.engine or get_database().async_engine
+        async with engine.connect() as connection:
+            return dict((await connection.execute(_VERSIONS_SQL)).all())
+
+    async def start(self) -> None:
+        """เก็บ version ปัจจุบันเป็นจุดเริ่ม (ก่อน warm cache ตอน startup)"""
+        self.versions = await self._fetch()
+
+    async def poll(self) -> list[str]:
+        """อ่าน version หนึ่งรอบ เรียก handler ของ channel ที่เปลี่ยน คืนรายชื่อ channel"""
+        versions = await self._fetch()
+        if self.versions is None:
+            self.versions = versions
+            return []
+        changed = [channel for channel, version in versions.items() if self.versions.get(channel) != version]
+        self.versions = versions
+        for channel in changed:
+            await self._dispatch(channel)
+        return changed
+
+    async def _dispatch(self, channel: str) -> None:
+        for handler in _handlers.get(channel, ()):
+            try:
+                result = handler()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Invalidation handler for %r failed", channel)
+
+    async def run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                logger.warning("Invalidation bus poll failed", exc_info=True)
+                await asyncio.sleep(_ERROR_BACKOFF_SECONDS)
+            await asyncio.sleep(interval)
+
+invalidation_bus = InvalidationBus()
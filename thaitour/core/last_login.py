@@ -0,0 +1,73 @@
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+import asyncio
+import logging
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+class LastLoginBuffer:
+    """
+    เก็บเวลา login ล่าสุดไว้ในหน่วยความจำ แล้วเขียนลงฐานข้อมูลเป็น batch เดียว
+    (login หลายครั้งของผู้ใช้คนเดียวในรอบเดียวกันจะรวมเป็น UPDATE เดียว)
+    """
+
+    def __init__(self):
+        self._pending: dict[int, datetime] = {}
+        self._lock = Lock()
+
+    def record(self, user_id: int, when: Optional[datetime] = None) -> None:
+        when = when or datetime.utcnow()
+        with self._lock:
+            previous = self._pending.get(user_id)
+            if previous is None or previous < when:
+                self._pending[user_id] = when
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self, engine: Optional[Engine] = None) -> int:
+        """
+        เขียนค่าที่ค้างอยู่ทั้งหมดด้วย UPDATE แบบ executemany ใน transaction เดียว
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+
+        from thaitour.models.user_model import User
+        if engine is None:
+            from thaitour.models import engine
+
+        user_table = User.__table__
+        statement = (
+            update(user_table)
+            .where(user_table.c.id == bindparam("b_id"))
+            .values(last_login=bindparam("b_last_login"))
+        )
+        rows = [{"b_id": user_id, "b_last_login": when} for user_id, when in pending.items()]
+        try:
+            with engine.begin() as connection:
+                connection.execute(statement, rows)
+        except Exception:
+            # ใส่กลับเข้า buffer เพื่อลองใหม่รอบถัดไป
+            for user_id, when in pending.items():
+                self.record(user_id, when)
+            raise
+        return len(rows)
+
+    async def run_periodic(self, interval: float, engine: Optional[Engine] = None) -> None:
+        """
+        background task: flush ทุก interval วินาทีจนกว่าจะถูก cancel
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush, engine)
+            except Exception:
+                logger.exception("Failed to flush last_login updates")
+
+last_login_buffer = LastLoginBuffer()
@@ -0,0 +1,311 @@
+from bisect import bisect_left
+from typing import Iterable, Optional
+from weakref import WeakValueDictionary
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from thaitour.core.cache import caches
+from thaitour.core.audit import audit_log
+from thaitour.core.security import password_hash_stats
+from thaitour.core.status_stream import status_broadcaster
+from thaitour.core.singleflight import flights
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+# snapshot ที่ไม่ถูกเขียนทับนานกว่านี้ (จำนวนรอบ) ถือว่าเป็นของ worker ที่หยุดไปแล้ว
+STALE_SNAPSHOT_INTERVALS = 3
+
+# name -> (type, help, label names)
+METRICS = {
+    "thaitour_http_requests_total": ("counter", "HTTP requests by route template and status", ("method", "route", "status")),
+    "thaitour_http_request_duration_seconds": ("histogram", "HTTP request latency", ("method", "route", "status")),
+    "thaitour_http_requests_in_flight": ("gauge", "HTTP requests currently being served", ()),
+    "thaitour_db_pool_checkouts_total": ("counter", "Connections checked out from the pool", ("pool",)),
+    "thaitour_db_pool_checkout_wait_seconds": ("histogram", "Time spent waiting for a pooled connection", ("pool",)),
+    "thaitour_db_pool_connections_in_use": ("gauge", "Connections currently checked out", ("pool",)),
+    "thaitour_cache_hits_total": ("counter", "In-process cache hits", ("cache",)),
+    "thaitour_cache_misses_total": ("counter", "In-process cache misses", ("cache",)),
+    "thaitour_cache_entries": ("gauge", "Entries held by in-process caches", ("cache",)),
+    "thaitour_singleflight_calls_total": ("counter", "Coalesced calls by group; shared calls waited for a leader", ("group", "role")),
+    "thaitour_password_hash_inflight": ("gauge", "bcrypt jobs submitted and not yet finished", ()),
+    "thaitour_password_hash_queue_depth": ("gauge", "bcrypt jobs waiting for a free worker thread", ()),
+    "thaitour_audit_queue_depth": ("gauge", "Audit events waiting to be written", ()),
+    "thaitour_audit_events_total": ("counter", "Audit events by outcome", ("outcome",)),
+    "thaitour_status_stream_clients": ("gauge", "Open registration status SSE connections", ()),
+    "thaitour_status_stream_overflows_total": ("counter", "SSE streams closed because the client queue was full", ()),
+}
+
+_BUCKETS = {
+    "thaitour_http_request_duration_seconds": LATENCY_BUCKETS,
+    "thaitour_db_pool_checkout_wait_seconds": POOL_WAIT_BUCKETS,
+}
+
+# engine ที่ตั้งชื่อไว้ (รายงานจำนวน connection ที่ใช้อยู่)
+_engines: "WeakValueDictionary[str, object]" = WeakValueDictionary()
+
+class MetricsRegistry:
+    """
+    เก็บ metrics ของ process นี้ในหน่วยความจำ
+
+    hot path (middleware, pool checkout) อัปเดต dict/list ธรรมดาโดยไม่ใช้ lock
+    (ถ้าหลาย thread อัปเดตพร้อมกันอาจนับตกได้น้อยมาก ซึ่งยอมรับได้สำหรับ metrics)
+    ค่าที่ดึงได้ตอน scrape (cache, pool, bcrypt) คำนวณตอน snapshot เท่านั้น
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        # name -> labels -> [count ต่อ bucket (ไม่สะสม) ..., count +Inf, sum]
+        self._histograms: dict[str, dict[tuple, list]] = {name: {} for name in _BUCKETS}
+        self._counters: dict[str, dict[tuple, float]] = {"thaitour_db_pool_checkouts_total": {}}
+
+    def observe(self, name: str, labels: tuple, value: float) -> None:
+        series = self._histograms[name].get(labels)
+        if series is None:
+            series = self._histograms[name][labels] = [0] * (len(_BUCKETS[name]) + 1) + [0.0]
+        series[bisect_left(_BUCKETS[name], value)] += 1
+        series[-1] += value
+
+    def inc(self, name: str, labels: tuple, amount: float = 1.0) -> None:
+        counter = self._counters[name]
+        counter[labels] = counter.get(labels, 0) + amount
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def snapshot(self) -> dict:
+        """ค่าปัจจุบันของ process นี้ในรูปที่เขียนเป็น JSON ได้"""
+        counters = {name: [[list(k), v] for k, v in series.items()] for name, series in self._counters.items()}
+        gauges = {
+            "thaitour_http_requests_in_flight": [[[], self.in_flight]],
+            "thaitour_password_hash_inflight": [[[], password_hash_stats.inflight]],
+            "thaitour_password_hash_queue_depth": [[[], password_hash_stats.queue_depth]],
+            "thaitour_audit_queue_depth": [[[], audit_log.pending()]],
+            "thaitour_status_stream_clients": [[[], len(status_broadcaster)]],
+            "thaitour_db_pool_connections_in_use": [],
+            "thaitour_cache_entries": [],
+        }
+        counters["thaitour_cache_hits_total"] = []
+        counters["thaitour_cache_misses_total"] = []
+        for cache in list(caches):
+            counters["thaitour_cache_hits_total"].append([[cache.name], cache.hits])
+            counters["thaitour_cache_misses_total"].append([[cache.name], cache.misses])
+            gauges["thaitour_cache_entries"].append([[cache.name], len(cache)])
+        counters["thaitour_singleflight_calls_total"] = []
+        for flight in list(flights):
+            counters["thaitour_singleflight_calls_total"].append([[flight.name, "leader"], flight.leaders])
+            counters["thaitour_singleflight_calls_total"].append([[flight.name, "shared"], flight.shared])
+        counters["thaitour_audit_events_total"] = [
+            [["written"], audit_log.written],
+            [["dropped"], audit_log.dropped],
+        ]
+        counters["thaitour_status_stream_overflows_total"] = [[[], status_broadcaster.overflows]]
+        for label, engine in list(_engines.items()):
+            checkedout = getattr(engine.pool, "checkedout", None)
+            if checkedout is not None:
+                gauges["thaitour_db_pool_connections_in_use"].append([[label], checkedout()])
+
+        return {
+            "pid": os.getpid(),
+            "histograms": {name: [[list(k), v] for k, v in series.items()] for name, series in self._histograms.items()},
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+    def write_snapshot(self, directory: str) -> None:
+        """เขียน snapshot ลงไฟล์ <pid>.json (atomic) ให้ worker อื่นรวมได้"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, path)
+
+    def collect(self, directory: Optional[str] = None) -> list[dict]:
+        """snapshot ของทุก worker: ของ process นี้สดเสมอ ที่เหลืออ่านจากไฟล์"""
+        own = self.snapshot()
+        if not directory:
+            return [own]
+        self.write_snapshot(directory)
+        snapshots = [own]
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            try:
+                with open(path) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if snapshot.get("pid") != own["pid"]:
+                snapshots.append(snapshot)
+        return snapshots
+
+    def remove_stale_snapshots(self, directory: str, interval: float) -> int:
+        """
+        ลบ snapshot ที่ไม่ถูกเขียนทับภายใน STALE_SNAPSHOT_INTERVALS รอบ (worker ที่หยุดแล้ว รวมถึงจาก deployment ก่อน)
+        เรียกตอน startup: counter เก่าไม่ถูกรวมใน /metrics ตลอดไป และไฟล์ไม่สะสมทุกครั้งที่ restart คืนจำนวนไฟล์ที่ลบ
+        """
+        cutoff = time.time() - interval * STALE_SNAPSHOT_INTERVALS
+        removed = 0
+        for path in glob.glob(os.path.join(directory, "*.json*")):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    async def run_periodic(self, directory: str, interval: float) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.write_snapshot, directory)
+            except Exception:
+                logger.exception("Failed to write metrics snapshot")
+            await asyncio.sleep(interval)
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    """
+    รวม snapshot ของหลาย worker: counter/histogram รวมกันทุก worker (รวม worker ที่ตายแล้ว)
+    gauge รวมเฉพาะ worker ที่ยังทำงานอยู่
+    """
+    merged = {"histograms": {}, "counters": {}, "gauges": {}}
+    for snapshot in snapshots:
+        alive = _pid_alive(snapshot["pid"])
+        for name, series in snapshot["histograms"].items():
+            target = merged["histograms"].setdefault(name, {})
+            for labels, values in series:
+                current = target.get(tuple(labels))
+                target[tuple(labels)] = values if current is None else [a + b for a, b in zip(current, values)]
+        for kind in ("counters", "gauges"):
+            if kind == "gauges" and not alive:
+                continue
+            for name, series in snapshot[kind].items():
+                target = merged[kind].setdefault(name, {})
+                for labels, value in series:
+                    target[tuple(labels)] = target.get(tuple(labels), 0) + value
+    return merged
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def render(merged: dict) -> str:
+    """แปลงเป็น Prometheus text exposition format (version 0.0.4)"""
+    request_histogram = merged["histograms"].get("thaitour_http_request_duration_seconds", {})
+    merged["counters"]["thaitour_http_requests_total"] = {
+        labels: sum(values[:-1]) for labels, values in request_histogram.items()
+    }
+
+    lines = []
+    for name, (kind, help_text, label_names) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            buckets = _BUCKETS[name]
+            for labels, values in sorted(merged["histograms"].get(name, {}).items()):
+                cumulative = 0
+                for bound, count in zip(buckets + (float("inf"),), values[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    bucket_labels = _format_labels(label_names, labels, f'le="{le}"')
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(label_names, labels)} {_format_value(values[-1])}")
+                lines.append(f"{name}_count{_format_labels(label_names, labels)} {cumulative}")
+        else:
+            for labels, value in sorted(merged[kind + "s"].get(name, {}).items()):
+                lines.append(f"{name}{_format_labels(label_names, labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+metrics_registry = MetricsRegistry()
+
+class _TimedCheckoutMixin:
+    """นับจำนวน checkout และเวลาที่รอ connection จาก pool"""
+
+    metrics_label = "db"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics_registry.observe(
+                "thaitour_db_pool_checkout_wait_seconds", (self.metrics_label,), time.perf_counter() - started
+            )
+            metrics_registry.inc("thaitour_db_pool_checkouts_total", (self.metrics_label,))
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+def register_engine(label: str, engine) -> None:
+    """ตั้งชื่อ pool ของ engine สำหรับ label ใน /metrics"""
+    engine.pool.metrics_label = label
+    _engines[label] = engine
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: นับ request และ latency ตาม route template (ไม่ใช่ path จริง
+    เพื่อไม่ให้จำนวน series โตตาม id) และจำนวน request ที่กำลังทำงาน
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics_registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.registry.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.registry.in_flight -= 1
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            self.registry.observe(
+                "thaitour_http_request_duration_seconds",
+                (scope["method"], template, str(status)),
+                time.perf_counter() - started,
+            )
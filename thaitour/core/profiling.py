@@ -0,0 +1,128 @@
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+import cProfile
+import os
+import secrets
+import sys
+import threading
+
+from thaitour.core.config import settings
+from thaitour.core.deps import is_token_version_current
+from thaitour.core.security import decode_token
+from thaitour.models.user_model import UserRole
+
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILERS = ("cprofile", "sample")
+
+# profile ได้ทีละ request (cProfile ซ้อนกันไม่ได้)
+_profiling = threading.Lock()
+
+class StackSampler:
+    """
+    sampling profiler: thread แยกอ่าน stack ของ thread เป้าหมายทุก interval
+    แล้วนับเป็น folded stacks (รูปแบบของ flamegraph.pl / speedscope)
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+async def _is_admin(scope) -> bool:
+    """ตรวจ Bearer token จาก header โดยใช้ claims ของ token (ไม่ query ฐานข้อมูล)"""
+    authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    payload = decode_token(token)
+    if payload is None or payload.get("role") != UserRole.ADMIN.value or "ver" not in payload:
+        return False
+    return await is_token_version_current(payload["sub"], payload["ver"])
+
+def new_profile_id() -> str:
+    return f"{datetime.utcnow():%Y%m%dT%H%M%S}-{secrets.token_hex(4)}"
+
+class ProfilingMiddleware:
+    """
+    profile request ของ admin ที่ส่ง header X-Profile: cprofile หรือ sample
+    เขียนไฟล์ลง settings.profile_dir และคืนชื่อไฟล์ใน header X-Profile-Id
+
+    ติดตั้งเฉพาะเมื่อ PROFILING_ENABLED=true จึงไม่มี overhead เมื่อปิด
+    หมายเหตุ: profiler จับทุกอย่างบน thread ของ event loop รวมถึง request อื่นที่ทำงานพร้อมกัน
+    """
+
+    def __init__(self, app, directory: Optional[str] = None, header: Optional[str] = None,
+                 sample_interval: Optional[float] = None):
+        self.app = app
+        self.directory = directory or settings.profile_dir
+        self.header = (header or settings.profile_header).lower().encode("latin-1")
+        self.sample_interval = sample_interval or settings.profile_sample_interval_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mode = dict(scope["headers"]).get(self.header, b"").decode("latin-1").lower()
+        if mode not in PROFILERS or not await _is_admin(scope) or not _profiling.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self._profile(mode, scope, receive, send)
+        finally:
+            _profiling.release()
+
+    async def _profile(self, mode: str, scope, receive, send):
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f"{new_profile_id()}.{'prof' if mode == 'cprofile' else 'folded'}"
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        path = os.path.join(self.directory, profile_id)
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                profiler.disable()
+                profiler.dump_stats(path)
+            return
+
+        sampler = StackSampler(threading.get_ident(), self.sample_interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            sampler.write(path)
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable
+import time
+
+class RateLimiter:
+    """
+    Token bucket แยกตาม key (เช่น username หรือ IP) เก็บ bucket แบบ LRU จำกัดจำนวน
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, maxsize: int = 100000, name: str = "rate_limit"):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.maxsize = maxsize
+        self.name = name
+        # key -> [tokens, last_refill]
+        self._buckets: "OrderedDict[Hashable, list[float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def acquire(self, key: Hashable, cost: float = 1.0) -> float:
+        """
+        ใช้ token จาก bucket ของ key คืน 0 ถ้าผ่าน หรือจำนวนวินาทีที่ต้องรอถ้าไม่ผ่าน
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.capacity, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.maxsize:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                elapsed = now - bucket[1]
+                bucket[0] = min(self.capacity, bucket[0] + elapsed * self.refill_per_second)
+                bucket[1] = now
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0.0
+            if self.refill_per_second <= 0:
+                return float("inf")
+            return (cost - bucket[0]) / self.refill_per_second
+
+    def reset(self, key: Hashable = None) -> None:
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
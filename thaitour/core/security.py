@@ -1,4 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import secrets
 from typing import Any, Union
 from jose import jwt
 from passlib.context import CryptContext
@@ -6,8 +10,27 @@ from thaitour.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt ใช้ CPU ~250ms ต่อครั้ง จึงรันใน thread pool แยกเพื่อไม่ให้ block event loop
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="bcrypt"
+)
+
+class PasswordHashStats:
+    """จำนวนงาน bcrypt ที่ส่งเข้า executor แล้วยังไม่เสร็จ (อัปเดตจาก event loop เท่านั้น)"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.inflight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        # งานที่รอ thread ว่าง (เกินจำนวน worker)
+        return max(0, self.inflight - self.workers)
+
+password_hash_stats = PasswordHashStats(settings.password_hash_workers)
+
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta = None
+    subject: Union[str, Any], expires_delta: timedelta = None, claims: dict = None
 ) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -15,24 +38,64 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(
             minutes=settings.access_token_expire_minutes
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = dict(claims or {})
+    to_encode.update({"exp": expire, "sub": str(subject)})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
+def user_token_claims(user) -> dict:
+    """
+    claims สำหรับตรวจสิทธิ์จาก token โดยไม่ต้อง query ฐานข้อมูล
+    """
+    return {"uid": user.id, "role": user.role.value, "ver": user.token_version}
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_token(token: str) -> Union[str, None]:
+async def _run_password_job(func, *args):
+    loop = asyncio.get_running_loop()
+    password_hash_stats.inflight += 1
+    try:
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        password_hash_stats.inflight -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_password_job(get_password_hash, password)
+
+def decode_token(token: str) -> Union[dict, None]:
+    """
+    ถอดรหัสและตรวจสอบ JWT คืน claims ทั้งหมด หรือ None ถ้าไม่ถูกต้อง
+    """
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
         )
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
     except:
         return None
+    if payload.get("sub") is None:
+        return None
+    return payload
+
+def verify_token(token: str) -> Union[str, None]:
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    return payload["sub"]
+
+def create_refresh_token() -> tuple[str, str]:
+    """
+    สร้าง refresh token แบบสุ่ม คืน (token, token_hash)
+    """
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+def hash_refresh_token(token: str) -> str:
+    # token สุ่ม 256 บิตอยู่แล้ว ใช้ SHA-256 ได้โดยไม่ต้องใช้ bcrypt
+    return hashlib.sha256(token.encode()).hexdigest()
@@ -0,0 +1,50 @@
+from typing import Any, Iterable, List
+import orjson
+
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import Response
+
+def _model_fields(value: Any) -> Any:
+    # model ที่ validate แล้วมีค่าตรงตาม field ใน __dict__ (response model ไม่มี alias/serializer)
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """orjson ที่เข้าใจ pydantic model (datetime, Enum และ list ถูก encode โดย orjson โดยตรง)"""
+    return orjson.dumps(content, default=_model_fields)
+
+class JSONBytesResponse(Response):
+    """Response ที่ body เป็น JSON ที่ encode แล้ว (ไม่ผ่าน response_model ของ FastAPI ซ้ำ)"""
+    media_type = "application/json"
+
+class ResponseSerializer:
+    """
+    สร้าง JSON ของ response model จาก ORM rows โดยตรง: validate ครั้งเดียวด้วย from_attributes
+    (อ่าน attribute ของ row ไม่ต้อง model_dump) แล้ว encode ด้วย orjson
+
+    endpoint ยังประกาศ response_model ไว้สำหรับ OpenAPI แต่คืน JSONBytesResponse
+    FastAPI จึงไม่ validate และ serialize ซ้ำอีกรอบ
+    (endpoint ที่เขียนข้อมูลใช้ validate() แทน เพื่อให้ FastAPI รวม header/cookie
+    จาก dependency เช่น cookie read-your-writes เข้ากับ response)
+    """
+
+    def __init__(self, model: type[BaseModel]):
+        self.model = model
+        self._one = TypeAdapter(model)
+        self._many = TypeAdapter(List[model])
+
+    def validate(self, row: Any) -> BaseModel:
+        return self._one.validate_python(row, from_attributes=True)
+
+    def dumps_one(self, row: Any) -> bytes:
+        return dumps(self._one.validate_python(row, from_attributes=True))
+
+    def dumps_many(self, rows: Iterable[Any]) -> bytes:
+        return dumps(self._many.validate_python(list(rows), from_attributes=True))
+
+    def one(self, row: Any, status_code: int = 200) -> JSONBytesResponse:
+        return JSONBytesResponse(self.dumps_one(row), status_code=status_code)
+
+    def many(self, rows: Iterable[Any], status_code: int = 200) -> JSONBytesResponse:
+        return JSONBytesResponse(self.dumps_many(rows), status_code=status_code)
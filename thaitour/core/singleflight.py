@@ -0,0 +1,74 @@
+from typing import Any, Awaitable, Callable, Hashable
+from urllib.parse import parse_qsl
+from weakref import WeakSet
+import asyncio
+
+from fastapi import Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# SingleFlight ทั้งหมดใน process (ใช้รายงานจำนวน leader/shared ที่ /metrics)
+flights: "WeakSet[SingleFlight]" = WeakSet()
+
+class SingleFlight:
+    """
+    รวมงานที่ key เดียวกันและกำลังทำอยู่พร้อมกันให้ทำครั้งเดียว: request แรก (leader) เริ่มงาน
+    request ที่ตามมาระหว่างนั้นรอผลเดียวกัน เมื่องานเสร็จ key ถูกลบทันที (ไม่ใช่ cache)
+
+    งานรันเป็น task แยก ผู้รอแต่ละคนถูกยกเลิกได้โดยไม่ยกเลิกงานของคนอื่น
+    ถ้างานล้มเหลว ทุกคนที่รออยู่ได้ exception เดียวกัน และ request ถัดไปเริ่มงานใหม่
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.leaders = 0
+        self.shared = 0
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        flights.add(self)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # ผู้รอถูกยกเลิกหมด: ไม่ให้ asyncio เตือน exception ที่ไม่มีใครอ่าน
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(function())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self.leaders += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+def request_key(request: Request) -> tuple:
+    """
+    key ของ GET request: route template + path params + query ที่เรียงแล้ว (ลำดับ query ไม่มีผล)
+    และว่า request อ่านจาก primary หรือไม่ (client ที่เพิ่งเขียนไม่รอผลที่อ่านจาก replica)
+    """
+    from thaitour.models import get_database
+
+    route = request.scope.get("route")
+    return (
+        getattr(route, "path", request.url.path),
+        tuple(sorted(request.path_params.items())),
+        tuple(sorted(parse_qsl(request.url.query, keep_blank_values=True))),
+        get_database().session_router.is_sticky(request),
+    )
+
+def flight_session(request: Request) -> AsyncSession:
+    """
+    session สำหรับงานใน request_flight: งานรันต่อหลัง request ที่เริ่มงานจบหรือถูกยกเลิกได้
+    จึงต้องเปิดและปิด session เองภายในงาน ไม่ใช้ session ของ request นั้น
+    """
+    from thaitour.models import get_database
+
+    session_router = get_database().session_router
+    return session_router.session(read_only=True, sticky=session_router.is_sticky(request))
+
+# GET ที่ผลไม่ขึ้นกับผู้ใช้ (รายการจังหวัด, สิทธิประโยชน์)
+request_flight = SingleFlight("requests")
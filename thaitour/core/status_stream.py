@@ -0,0 +1,231 @@
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Optional
+import asyncio
+import logging
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from thaitour.core.config import settings
+from thaitour.models.changelog_model import ChangeLog
+from thaitour.models.registration_model import Registration
+
+logger = logging.getLogger(__name__)
+
+# ให้ EventSource รอกี่มิลลิวินาทีก่อนเชื่อมต่อใหม่ (ส่ง Last-Event-ID มาด้วย)
+RETRY_MILLISECONDS = 3000
+
+# หน่วงเพิ่มหลัง poll ล้มเหลว เพื่อไม่ให้ log ท่วม
+_ERROR_BACKOFF_SECONDS = 5.0
+
+# entry ของ changelog ที่อ่านต่อรอบ
+_POLL_BATCH = 1000
+
+StatusLoader = Callable[[int], Awaitable[Optional[dict]]]
+
+def _frame(event_id: int, payload: dict) -> bytes:
+    """event ของ SSE หนึ่งรายการ (encode ครั้งเดียว ใช้ร่วมกันทุก client)"""
+    return b"id: %d\nevent: status\ndata: %s\n\n" % (event_id, orjson.dumps(payload))
+
+def status_payload(registration_id: int, status, approved_date) -> dict:
+    return {
+        "registration_id": registration_id,
+        "status": getattr(status, "value", status),
+        "approved_date": approved_date,
+    }
+
+class Subscriber:
+    """client หนึ่งราย: คิวขนาดจำกัด ถ้าเต็ม (client อ่านไม่ทัน) stream จะถูกปิดให้เชื่อมต่อใหม่"""
+    __slots__ = ("registration_id", "queue", "last_status", "min_seq")
+
+    def __init__(self, registration_id: int, queue_size: int, min_seq: int):
+        self.registration_id = registration_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.last_status: Optional[str] = None
+        self.min_seq = min_seq
+
+class StatusBroadcaster:
+    """
+    กระจายการเปลี่ยนสถานะการลงทะเบียนไปยัง client ที่ subscribe (หนึ่ง instance ต่อ worker)
+
+    อ่าน entry ใหม่ของ registration จาก changelog ทุก STATUS_STREAM_POLL_INTERVAL_SECONDS
+    (หรือทันทีเมื่อ worker นี้เปลี่ยนสถานะเอง) ด้วย query เดียวต่อรอบไม่ว่าจะมี client กี่ราย
+    seq ของ changelog เป็น event id จึงใช้ Last-Event-ID กับ worker ใดก็ได้
+    event ล่าสุดเก็บใน ring buffer สำหรับ client ที่เชื่อมต่อใหม่
+    """
+
+    def __init__(self, engine: Optional[AsyncEngine] = None, buffer_size: Optional[int] = None,
+                 queue_size: Optional[int] = None, max_clients: Optional[int] = None):
+        self.engine = engine
+        self._queue_size = queue_size
+        self._max_clients = max_clients
+        self.cursor: Optional[int] = None
+        # (seq, registration_id, status, frame)
+        self._buffer: deque[tuple] = deque(maxlen=buffer_size or settings.status_stream_replay_buffer_size)
+        # event ที่ seq <= floor ไม่อยู่ใน buffer แล้ว (หรือเกิดก่อนเริ่ม)
+        self._floor = 0
+        self._subscribers: dict[int, set[Subscriber]] = {}
+        self._count = 0
+        self._wake: Optional[asyncio.Event] = None
+        self.overflows = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def subscribe(self, registration_id: int, last_event_id: Optional[int] = None) -> Optional[Subscriber]:
+        """คืน None เมื่อจำนวน client เต็ม STATUS_STREAM_MAX_CLIENTS"""
+        max_clients = self._max_clients if self._max_clients is not None else settings.status_stream_max_clients
+        if self._count >= max_clients:
+            return None
+        subscriber = Subscriber(
+            registration_id,
+            self._queue_size or settings.status_stream_client_queue_size,
+            max(self.cursor or 0, last_event_id or 0),
+        )
+        self._subscribers.setdefault(registration_id, set()).add(subscriber)
+        self._count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(subscriber.registration_id)
+        if subscribers and subscriber in subscribers:
+            subscribers.discard(subscriber)
+            self._count -= 1
+            if not subscribers:
+                del self._subscribers[subscriber.registration_id]
+
+    def replay(self, registration_id: int, last_event_id: int) -> Optional[list[tuple[int, str, bytes]]]:
+        """event ของ registration นี้หลัง last_event_id หรือ None ถ้าบางส่วนหลุดจาก buffer ไปแล้ว"""
+        if self.cursor is None or last_event_id < self._floor:
+            return None
+        return [
+            (seq, status, frame) for seq, event_registration_id, status, frame in self._buffer
+            if event_registration_id == registration_id and seq > last_event_id
+        ]
+
+    def publish(self, seq: int, registration_id: int, payload: dict) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            self._floor = self._buffer[0][0]
+        frame = _frame(seq, payload)
+        self._buffer.append((seq, registration_id, payload["status"], frame))
+        for subscriber in self._subscribers.get(registration_id, ()):
+            try:
+                subscriber.queue.put_nowait((seq, payload["status"], frame))
+            except asyncio.QueueFull:
+                # ไม่ให้ client ช้ารายเดียวกินหน่วยความจำ: ปิด stream แล้วให้ resume ด้วย Last-Event-ID
+                self.overflows += 1
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(None)
+
+    def _engine(self) -> AsyncEngine:
+        from thaitour.models import get_database
+
+        # อ่านจาก primary เสมอ (replica อาจยังไม่เห็นการเปลี่ยนแปลงล่าสุด)
+        return self.engine or get_database().async_engine
+
+    async def start(self) -> None:
+        """เริ่มจาก seq ล่าสุด (ไม่ส่งประวัติก่อนเริ่ม worker)"""
+        from thaitour.core.changefeed import settled
+
+        async with self._engine().connect() as connection:
+            self.cursor = (await connection.execute(
+                select(func.max(ChangeLog.seq)).where(settled(connection.dialect.name))
+            )).scalar() or 0
+        self._floor = self.cursor
+
+    async def poll(self) -> int:
+        """อ่าน entry ใหม่ของ registration แล้วกระจายสถานะปัจจุบัน คืนจำนวน event"""
+        from thaitour.core.changefeed import settled
+
+        if self.cursor is None:
+            await self.start()
+            return 0
+        published = 0
+        async with self._engine().connect() as connection:
+            while True:
+                entries = (await connection.execute(
+                    select(ChangeLog.seq, ChangeLog.entity_id)
+                    .where((ChangeLog.entity == "registration") & (ChangeLog.seq > self.cursor)
+                           & settled(connection.dialect.name))
+                    .order_by(ChangeLog.seq).limit(_POLL_BATCH)
+                )).all()
+                if not entries:
+                    return published
+
+                # หลาย entry ของ registration เดียวกันในรอบเดียว: ส่งครั้งเดียวด้วย seq ล่าสุด
+                latest = {int(entity_id): seq for seq, entity_id in entries}
+                rows = (await connection.execute(
+                    select(Registration.id, Registration.status, Registration.approved_date)
+                    .where(Registration.id.in_(latest))
+                )).all()
+                for registration_id, status, approved_date in sorted(rows, key=lambda row: latest[row[0]]):
+                    self.publish(latest[registration_id], registration_id,
+                                 status_payload(registration_id, status, approved_date))
+                    published += 1
+                self.cursor = entries[-1][0]
+                if len(entries) < _POLL_BATCH:
+                    return published
+
+    def wake(self) -> None:
+        """ให้ poll รอบถัดไปเริ่มทันที (เรียกหลัง worker นี้ commit การเปลี่ยนสถานะ)"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run(self, interval: float) -> None:
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                logger.warning("Status stream poll failed", exc_info=True)
+                await asyncio.sleep(_ERROR_BACKOFF_SECONDS)
+            try:
+                await asyncio.wait_for(self._wake.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+async def status_event_stream(broadcaster: StatusBroadcaster, subscriber: Subscriber, load_status: StatusLoader,
+                              last_event_id: Optional[int] = None,
+                              heartbeat_seconds: Optional[float] = None) -> AsyncIterator[bytes]:
+    """
+    body ของ SSE: event ที่พลาดไปตั้งแต่ Last-Event-ID (หรือสถานะปัจจุบันถ้าไม่มี/หลุด buffer แล้ว)
+    ตามด้วยการเปลี่ยนสถานะใหม่ และ comment heartbeat เมื่อไม่มี event ภายใน heartbeat_seconds
+    subscriber ต้อง subscribe ก่อนเรียก (event ที่เกิดระหว่างอ่านสถานะปัจจุบันจึงไม่หาย)
+    """
+    heartbeat_seconds = heartbeat_seconds or settings.status_stream_heartbeat_seconds
+    try:
+        yield b"retry: %d\n\n" % RETRY_MILLISECONDS
+
+        replayed = broadcaster.replay(subscriber.registration_id, last_event_id) if last_event_id is not None else None
+        if replayed is not None:
+            for seq, status, frame in replayed:
+                subscriber.last_status = status
+                yield frame
+        else:
+            payload = await load_status(subscriber.registration_id)
+            if payload is None:
+                return
+            subscriber.last_status = payload["status"]
+            yield _frame(subscriber.min_seq, payload)
+
+        while True:
+            try:
+                item = await asyncio.wait_for(subscriber.queue.get(), heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if item is None:
+                return
+            seq, status, frame = item
+            # เห็นแล้วจาก replay/สถานะตอนเชื่อมต่อ หรือสถานะไม่เปลี่ยน (แก้ไขข้อมูลส่วนอื่น)
+            if seq <= subscriber.min_seq or status == subscriber.last_status:
+                continue
+            subscriber.last_status = status
+            yield frame
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+status_broadcaster = StatusBroadcaster()
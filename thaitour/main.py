@@ -1,39 +1,182 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from thaitour.routers.v1 import authentication_router, registration_router, province_router, tax_router
-from thaitour.core.config import settings
-
-app = FastAPI(
-    title="ThaiTour - คนละครึ่ง API",
-    description="API สำหรับระบบท่องเที่ยวไทยคนละครึ่ง",
-    version="0.1.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # ในการใช้งานจริงควรกำหนด origins ที่เฉพาะเจาะจง
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(authentication_router.router, prefix="/api/v1/auth", tags=["Authentication"])
-app.include_router(registration_router.router, prefix="/api/v1/registration", tags=["Registration"])
-app.include_router(province_router.router, prefix="/api/v1/provinces", tags=["Provinces"])
-app.include_router(tax_router.router, prefix="/api/v1/tax", tags=["Tax Benefits"])
-
-@app.get("/")
-async def root():
-    return {
-        "message": "ยินดีต้อนรับสู่ ThaiTour API - ระบบท่องเที่ยวไทยคนละครึ่ง",
-        "version": "0.1.0",
-        "docs": "/docs"
-    }
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "service": "ThaiTour API"}
+from thaitour.core.config import Settings, configure_settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+async def warm_up(app: FastAPI) -> None:
+    """
+    งานที่ทำครั้งเดียวตอน startup แทนที่จะให้ request แรกเป็นผู้จ่าย:
+    เปิด connection แรกของ pool, โหลดตาราง token version, cache ของ catalog และ OpenAPI schema
+    (ถ้าล้มเหลวเซิร์ฟเวอร์ยังเริ่มได้ แค่ request แรกจะช้ากว่าปกติ)
+    """
+    from thaitour.core.catalog import warm_catalog
+    from thaitour.core.deps import load_token_versions
+
+    app.openapi()
+    try:
+        await load_token_versions()
+        await warm_catalog()
+    except Exception:
+        logger.exception("Warm-up failed; caches will be filled on first use")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from thaitour.core.access_log import start_access_log, stop_access_log
+    from thaitour.core.audit import audit_log
+    from thaitour.core.invalidation import invalidation_bus
+    from thaitour.core.last_login import last_login_buffer
+    from thaitour.core.metrics import metrics_registry
+    from thaitour.core.status_stream import status_broadcaster
+    from thaitour.models import Database, set_database
+
+    app_settings = app.state.settings
+    database = Database(app_settings)
+    previous_database = set_database(database)
+    access_log = start_access_log()
+    flusher = asyncio.create_task(
+        last_login_buffer.run_periodic(app_settings.last_login_flush_interval_seconds)
+    )
+    background = [flusher]
+    if app_settings.audit_enabled:
+        background.append(asyncio.create_task(
+            audit_log.run_periodic(app_settings.audit_flush_interval_seconds)
+        ))
+    if app_settings.metrics_dir:
+        try:
+            metrics_registry.remove_stale_snapshots(
+                app_settings.metrics_dir, app_settings.metrics_snapshot_interval_seconds
+            )
+        except Exception:
+            logger.exception("Failed to remove stale metrics snapshots")
+        background.append(asyncio.create_task(
+            metrics_registry.run_periodic(app_settings.metrics_dir, app_settings.metrics_snapshot_interval_seconds)
+        ))
+    if app_settings.invalidation_bus_enabled:
+        try:
+            # จุดเริ่มก่อน warm cache: การเขียนของ worker อื่นหลังจากนี้จะถูกเห็นทั้งหมด
+            await invalidation_bus.start()
+        except Exception:
+            logger.exception("Invalidation bus start failed; polling will retry")
+        background.append(asyncio.create_task(
+            invalidation_bus.run(app_settings.invalidation_poll_interval_seconds)
+        ))
+    if app_settings.status_stream_enabled:
+        try:
+            await status_broadcaster.start()
+        except Exception:
+            logger.exception("Status stream start failed; polling will retry")
+        background.append(asyncio.create_task(
+            status_broadcaster.run(app_settings.status_stream_poll_interval_seconds)
+        ))
+    try:
+        await warm_up(app)
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        # flush ค่าที่ค้างอยู่ก่อนปิดเซิร์ฟเวอร์
+        await asyncio.to_thread(last_login_buffer.flush)
+        try:
+            await asyncio.to_thread(audit_log.flush)
+        except Exception:
+            logger.exception("Failed to write audit events on shutdown")
+        stop_access_log(access_log)
+        await database.dispose()
+        set_database(previous_database)
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """
+    สร้าง FastAPI app จาก Settings (ค่าเริ่มต้นอ่านจาก environment)
+    engine ถูกสร้างใน lifespan ไม่ใช่ตอน import จึง inject ฐานข้อมูลอื่นใน tests ได้
+    """
+    settings = configure_settings(settings) if settings is not None else get_settings()
+
+    # import router หลังตั้ง settings แล้ว (ค่าที่อ่านตอน import เช่นขนาด cache ใช้ settings นี้)
+    from thaitour.routers.v1 import (
+        audit_router, authentication_router, changes_router, registration_router, province_router, tax_router
+    )
+    from thaitour.core.instrumentation import QueryStatsMiddleware
+    from thaitour.core.metrics import MetricsMiddleware, merge_snapshots, metrics_registry, render
+
+    app = FastAPI(
+        title="ThaiTour - คนละครึ่ง API",
+        description="API สำหรับระบบท่องเที่ยวไทยคนละครึ่ง",
+        version="0.1.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        # response ที่ผ่าน response_model ของ FastAPI encode ด้วย orjson
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
+    app.state.settings = settings
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # ในการใช้งานจริงควรกำหนด origins ที่เฉพาะเจาะจง
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # นับ query และเวลาใน DB ต่อ request (header Server-Timing, access log, slow-request log)
+    app.add_middleware(QueryStatsMiddleware)
+
+    # request count / latency ต่อ route สำหรับ /metrics
+    app.add_middleware(MetricsMiddleware)
+
+    # profiling ตามคำขอของ admin (ไม่ติดตั้งเลยเมื่อปิด)
+    if settings.profiling_enabled:
+        from thaitour.core.profiling import ProfilingMiddleware
+        app.add_middleware(ProfilingMiddleware)
+
+    # gzip/brotli ชั้นนอกสุด: บีบอัด body สุดท้ายหลัง middleware อื่นเติม header แล้ว
+    if settings.compression_enabled:
+        from thaitour.core.compression import CompressionMiddleware
+        app.add_middleware(CompressionMiddleware)
+
+    # Include routers
+    app.include_router(authentication_router.router, prefix="/api/v1/auth", tags=["Authentication"])
+    app.include_router(registration_router.router, prefix="/api/v1/registration", tags=["Registration"])
+    app.include_router(province_router.router, prefix="/api/v1/provinces", tags=["Provinces"])
+    app.include_router(tax_router.router, prefix="/api/v1/tax", tags=["Tax Benefits"])
+    app.include_router(audit_router.router, prefix="/api/v1/audit", tags=["Audit"])
+    app.include_router(changes_router.router, prefix="/api/v1/changes", tags=["Changes"])
+
+    @app.get("/")
+    async def root():
+        return {
+            "message": "ยินดีต้อนรับสู่ ThaiTour API - ระบบท่องเที่ยวไทยคนละครึ่ง",
+            "version": "0.1.0",
+            "docs": "/docs"
+        }
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy", "service": "ThaiTour API"}
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus text exposition format (รวมทุก worker เมื่อตั้ง METRICS_DIR)"""
+        snapshots = metrics_registry.collect(settings.metrics_dir)
+        return PlainTextResponse(
+            render(merge_snapshots(snapshots)),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    return app
+
+def __getattr__(name: str):
+    # uvicorn thaitour.main:app และ from thaitour.main import app ยังใช้ได้ (PEP 562):
+    # app ถูกสร้างครั้งแรกที่ถูกเรียกใช้ ไม่ใช่ตอน import module
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
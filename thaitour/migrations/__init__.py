@@ -0,0 +1,209 @@
+"""
+Versioned schema migrations สำหรับ ThaiTour
+
+แต่ละ revision อยู่ใน thaitour/migrations/versions/NNNN_<name>.py และต้องมี
+    revision: str      เช่น "0001"
+    description: str
+    def upgrade(ctx: MigrationContext) -> None
+
+revision ที่รันแล้วถูกบันทึกในตาราง schema_migrations และ backfill ที่ทำไปแล้ว
+บางส่วนถูกบันทึก checkpoint ใน migration_checkpoints จึงรันต่อจากจุดเดิมได้
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+from typing import Callable, Iterable, Optional, Sequence
+import importlib
+import pkgutil
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+VERSION_TABLE = "schema_migrations"
+CHECKPOINT_TABLE = "migration_checkpoints"
+
+@dataclass
+class Migration:
+    revision: str
+    description: str
+    module: ModuleType
+
+    def upgrade(self, ctx: "MigrationContext") -> None:
+        self.module.upgrade(ctx)
+
+def load_migrations() -> list[Migration]:
+    """โหลดทุก revision ใน thaitour.migrations.versions เรียงตามชื่อไฟล์"""
+    from thaitour.migrations import versions
+
+    migrations = []
+    for info in sorted(pkgutil.iter_modules(versions.__path__), key=lambda m: m.name):
+        module = importlib.import_module(f"{versions.__name__}.{info.name}")
+        migrations.append(Migration(module.revision, module.description, module))
+
+    revisions = [m.revision for m in migrations]
+    if len(revisions) != len(set(revisions)):
+        raise RuntimeError(f"Duplicate migration revisions: {revisions}")
+    return migrations
+
+class MigrationContext:
+    """
+    เครื่องมือที่ revision ใช้: ตรวจโครงสร้างตาราง, รัน DDL และ backfill แบบแบ่ง chunk
+    """
+
+    def __init__(self, engine: Engine, revision: str, chunk_size: int = 1000,
+                 pause_seconds: float = 0.0, log: Callable[[str], None] = print):
+        self.engine = engine
+        self.revision = revision
+        self.chunk_size = chunk_size
+        self.pause_seconds = pause_seconds
+        self.log = log
+
+    @property
+    def dialect(self) -> str:
+        return self.engine.dialect.name
+
+    def has_table(self, table: str) -> bool:
+        return inspect(self.engine).has_table(table)
+
+    def has_column(self, table: str, column: str) -> bool:
+        if not self.has_table(table):
+            return False
+        return column in {c["name"] for c in inspect(self.engine).get_columns(table)}
+
+    def has_index(self, table: str, index: str) -> bool:
+        if not self.has_table(table):
+            return False
+        return index in {i["name"] for i in inspect(self.engine).get_indexes(table)}
+
+    def execute(self, sql: str, params: Optional[dict] = None) -> None:
+        """รัน statement เดียวใน transaction สั้น ๆ ของตัวเอง"""
+        with self.engine.begin() as connection:
+            connection.execute(text(sql), params or {})
+
+    def add_column(self, table: str, column: str, ddl: str) -> None:
+        """ALTER TABLE ADD COLUMN ถ้ายังไม่มี (SQLite/Postgres ทำได้โดยไม่ rewrite ตาราง)"""
+        if self.has_column(table, column):
+            self.log(f"  - {table}.{column} มีอยู่แล้ว")
+            return
+        self.execute(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}')
+        self.log(f"  + เพิ่มคอลัมน์ {table}.{column}")
+
+    def create_index(self, table: str, index: str, columns: Sequence[str], unique: bool = False) -> None:
+        if self.has_index(table, index):
+            self.log(f"  - index {index} มีอยู่แล้ว")
+            return
+        column_list = ", ".join(columns)
+        unique_sql = "UNIQUE " if unique else ""
+        self.execute(f'CREATE {unique_sql}INDEX {index} ON "{table}" ({column_list})')
+        self.log(f"  + สร้าง index {index}")
+
+    def get_checkpoint(self, name: str) -> int:
+        with self.engine.connect() as connection:
+            value = connection.execute(
+                text(f"SELECT last_id FROM {CHECKPOINT_TABLE} WHERE revision = :r AND name = :n"),
+                {"r": self.revision, "n": name},
+            ).scalar()
+        return value or 0
+
+    def _save_checkpoint(self, connection: Connection, name: str, last_id: int) -> None:
+        params = {"r": self.revision, "n": name, "id": last_id, "t": datetime.utcnow()}
+        updated = connection.execute(
+            text(f"UPDATE {CHECKPOINT_TABLE} SET last_id = :id, updated_at = :t WHERE revision = :r AND name = :n"),
+            params,
+        ).rowcount
+        if not updated:
+            connection.execute(
+                text(f"INSERT INTO {CHECKPOINT_TABLE} (revision, name, last_id, updated_at) VALUES (:r, :n, :id, :t)"),
+                params,
+            )
+
+    def backfill(self, name: str, select_sql: str, process_chunk: Callable[[Connection, list], None],
+                 total_sql: Optional[str] = None) -> int:
+        """
+        backfill แบบแบ่ง chunk ตาม primary key
+
+        select_sql ต้องมีพารามิเตอร์ :last_id และ :limit และเรียงตาม id โดยคอลัมน์แรกเป็น id
+        แต่ละ chunk ถูก process และบันทึก checkpoint ใน transaction เดียวกัน
+        จึงหยุดกลางทางแล้วรันใหม่ได้โดยไม่ทำซ้ำ
+        """
+        last_id = self.get_checkpoint(name)
+        total = None
+        if total_sql:
+            with self.engine.connect() as connection:
+                total = connection.execute(text(total_sql), {"last_id": last_id}).scalar()
+        if last_id:
+            self.log(f"  ↻ {name}: ทำต่อจาก id > {last_id}")
+
+        processed = 0
+        started = time.perf_counter()
+        while True:
+            with self.engine.begin() as connection:
+                rows = connection.execute(
+                    text(select_sql), {"last_id": last_id, "limit": self.chunk_size}
+                ).all()
+                if not rows:
+                    break
+                process_chunk(connection, rows)
+                last_id = rows[-1][0]
+                self._save_checkpoint(connection, name, last_id)
+
+            processed += len(rows)
+            rate = processed / max(time.perf_counter() - started, 1e-9)
+            progress = f"{processed}/{total}" if total is not None else f"{processed}"
+            self.log(f"  … {name}: {progress} แถว ({rate:.0f} แถว/วินาที, id ล่าสุด {last_id})")
+            if self.pause_seconds:
+                # เว้นช่วงให้ writer อื่นได้ lock ระหว่าง chunk
+                time.sleep(self.pause_seconds)
+        return processed
+
+class MigrationRunner:
+    def __init__(self, engine: Engine, migrations: Optional[Iterable[Migration]] = None,
+                 log: Callable[[str], None] = print):
+        self.engine = engine
+        self.migrations = list(migrations) if migrations is not None else load_migrations()
+        self.log = log
+
+    def ensure_tables(self) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+                "revision VARCHAR(32) PRIMARY KEY, description VARCHAR(200), applied_at TIMESTAMP)"
+            ))
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+                "revision VARCHAR(32) NOT NULL, name VARCHAR(100) NOT NULL, last_id BIGINT NOT NULL, "
+                "updated_at TIMESTAMP, PRIMARY KEY (revision, name))"
+            ))
+
+    def applied(self) -> set[str]:
+        self.ensure_tables()
+        with self.engine.connect() as connection:
+            return set(connection.execute(text(f"SELECT revision FROM {VERSION_TABLE}")).scalars())
+
+    def pending(self) -> list[Migration]:
+        applied = self.applied()
+        return [m for m in self.migrations if m.revision not in applied]
+
+    def status(self) -> list[tuple[Migration, bool]]:
+        applied = self.applied()
+        return [(m, m.revision in applied) for m in self.migrations]
+
+    def upgrade(self, target: Optional[str] = None, chunk_size: int = 1000, pause_seconds: float = 0.0) -> list[str]:
+        """รันทุก revision ที่ยังไม่ได้รันจนถึง target (ค่าเริ่มต้น = ล่าสุด)"""
+        done = []
+        for migration in self.pending():
+            if target is not None and migration.revision > target:
+                break
+            self.log(f"▶ {migration.revision}: {migration.description}")
+            ctx = MigrationContext(self.engine, migration.revision, chunk_size, pause_seconds, self.log)
+            migration.upgrade(ctx)
+            with self.engine.begin() as connection:
+                connection.execute(
+                    text(f"INSERT INTO {VERSION_TABLE} (revision, description, applied_at) VALUES (:r, :d, :t)"),
+                    {"r": migration.revision, "d": migration.description, "t": datetime.utcnow()},
+                )
+                connection.execute(text(f"DELETE FROM {CHECKPOINT_TABLE} WHERE revision = :r"), {"r": migration.revision})
+            done.append(migration.revision)
+        return done
@@ -0,0 +1,88 @@
+"""
+เพิ่ม registration.user_id และสร้าง User Account ให้ Registration เดิม
+
+แทน scripts/migrate_add_user_id.py: backfill ทีละ chunk ตาม id, ค้นหา user ที่มีอยู่
+ด้วย query เดียวต่อ chunk และใช้ bcrypt hash ของรหัสผ่านเริ่มต้นเพียงครั้งเดียว
+"""
+
+from datetime import datetime
+
+from sqlalchemy import column, insert, select, table, update, bindparam
+
+from thaitour.core.security import get_password_hash
+
+revision = "0001"
+description = "เพิ่ม registration.user_id และ backfill User Account"
+
+# รหัสผ่านเริ่มต้นของบัญชีที่สร้างให้ Registration เดิม (ให้ผู้ใช้เปลี่ยนภายหลัง)
+DEFAULT_PASSWORD = "123456"
+
+# ตารางแบบ lightweight: ไม่ผูกกับ model ปัจจุบันซึ่งอาจมีคอลัมน์ที่ revision ถัดไปเพิ่ม
+user_table = table(
+    "user",
+    column("id"), column("username"), column("hashed_password"), column("email"),
+    column("full_name"), column("role"), column("is_active"), column("is_verified"),
+    column("created_at"),
+)
+registration_table = table("registration", column("id"), column("user_id"))
+
+def upgrade(ctx) -> None:
+    if not ctx.has_table("registration"):
+        return
+
+    ctx.add_column("registration", "user_id", 'INTEGER REFERENCES "user"(id)')
+    hashed_password = None
+
+    def link_users(connection, rows) -> None:
+        nonlocal hashed_password
+        emails = [row.email for row in rows]
+        existing = {
+            key: user_id
+            for user_id, email, username in connection.execute(
+                select(user_table.c.id, user_table.c.email, user_table.c.username).where(
+                    user_table.c.email.in_(emails) | user_table.c.username.in_(emails)
+                )
+            )
+            for key in (email, username)
+            if key
+        }
+
+        missing = [row for row in rows if row.email not in existing]
+        if missing:
+            if hashed_password is None:
+                hashed_password = get_password_hash(DEFAULT_PASSWORD)
+            now = datetime.utcnow()
+            connection.execute(insert(user_table), [
+                {
+                    "username": row.email,  # ใช้อีเมลเป็น username
+                    "hashed_password": hashed_password,
+                    "email": row.email,
+                    "full_name": f"{row.first_name} {row.last_name}",
+                    "role": "USER",  # Enum ถูกเก็บเป็นชื่อสมาชิก
+                    "is_active": True,
+                    "is_verified": True,
+                    "created_at": now,
+                }
+                for row in missing
+            ])
+            created = connection.execute(
+                select(user_table.c.id, user_table.c.email).where(
+                    user_table.c.email.in_([row.email for row in missing])
+                )
+            )
+            existing.update({email: user_id for user_id, email in created})
+
+        connection.execute(
+            update(registration_table)
+            .where(registration_table.c.id == bindparam("b_id"))
+            .values(user_id=bindparam("b_user_id")),
+            [{"b_id": row.id, "b_user_id": existing[row.email]} for row in rows],
+        )
+
+    ctx.backfill(
+        "registration_user_id",
+        "SELECT id, email, first_name, last_name FROM registration "
+        "WHERE id > :last_id AND user_id IS NULL ORDER BY id LIMIT :limit",
+        link_users,
+        total_sql="SELECT count(*) FROM registration WHERE id > :last_id AND user_id IS NULL",
+    )
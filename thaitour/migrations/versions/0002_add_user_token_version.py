@@ -0,0 +1,8 @@
+"""เพิ่ม user.token_version สำหรับยกเลิก access token เมื่อ role/สถานะเปลี่ยน"""
+
+revision = "0002"
+description = "เพิ่ม user.token_version"
+
+def upgrade(ctx) -> None:
+    # มี DEFAULT จึงไม่ต้อง backfill และไม่ rewrite ตาราง
+    ctx.add_column("user", "token_version", "INTEGER NOT NULL DEFAULT 0")
@@ -0,0 +1,16 @@
+"""สร้างตาราง refreshtoken สำหรับ refresh token แบบหมุนเวียน"""
+
+from sqlmodel import SQLModel
+
+revision = "0003"
+description = "สร้างตาราง refreshtoken"
+
+def upgrade(ctx) -> None:
+    from thaitour.models.refresh_token_model import RefreshToken
+
+    if ctx.has_table(RefreshToken.__tablename__):
+        ctx.log("  - ตาราง refreshtoken มีอยู่แล้ว")
+        return
+    # สร้างตารางพร้อม index จาก model (ตารางใหม่ ไม่มีข้อมูลเดิม)
+    SQLModel.metadata.tables[RefreshToken.__tablename__].create(ctx.engine, checkfirst=True)
+    ctx.log("  + สร้างตาราง refreshtoken")
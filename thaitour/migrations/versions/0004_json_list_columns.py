@@ -0,0 +1,90 @@
+"""
+คอลัมน์ list ที่เคยเก็บเป็น JSON string ด้วยมือ (json.dumps/json.loads ใน router) เปลี่ยนเป็นชนิด JSON
+
+SQLite: ชนิด JSON ของ SQLAlchemy เก็บเป็น TEXT เหมือนเดิม แถวที่เป็น JSON ถูกต้องใช้ได้ทันที
+จึงแก้เฉพาะแถวที่ decode ไม่ได้ (string ว่าง หรือข้อความคั่นด้วย comma) แบบแบ่ง chunk
+Postgres: แก้แถวเดียวกันก่อน แล้ว ALTER COLUMN ... TYPE JSONB และสร้าง GIN index
+ให้ตัวกรอง applicable_provinces (@>)
+"""
+
+from typing import Any, Optional
+import orjson
+
+from sqlalchemy import text
+
+revision = "0004"
+description = "คอลัมน์ list เป็นชนิด JSON (JSONB บน Postgres)"
+
+# ตาราง -> คอลัมน์ (คอลัมน์ที่ NOT NULL ใช้ [] แทน NULL)
+COLUMNS = {
+    "province": ("famous_attractions", "local_specialties"),
+    "taxbenefit": ("applicable_provinces", "eligible_activities", "required_documents"),
+    "registration": ("target_provinces", "interests"),
+}
+NOT_NULL = {("registration", "target_provinces")}
+INTEGER_LISTS = {("taxbenefit", "applicable_provinces")}
+
+def normalize(value: Any, integers: bool = False) -> tuple[bool, Optional[list]]:
+    """
+    คืน (ต้องแก้หรือไม่, ค่าใหม่): JSON array ที่ถูกต้องไม่ต้องแก้,
+    ค่าว่างเป็น None และข้อความอื่นแยกด้วย comma เป็น list
+    """
+    if not isinstance(value, (str, bytes)):
+        return False, value
+    try:
+        decoded = orjson.loads(value) if value.strip() else None
+    except orjson.JSONDecodeError:
+        items = [item.strip() for item in value.split(",") if item.strip()]
+        if integers:
+            items = [int(item) if item.isdigit() else item for item in items]
+        return True, items or None
+    if decoded is None:
+        return True, None
+    if isinstance(decoded, list):
+        return False, decoded
+    return True, [decoded]
+
+def _column_type(ctx, table: str, column: str) -> Optional[str]:
+    with ctx.engine.connect() as connection:
+        return connection.execute(
+            text("SELECT data_type FROM information_schema.columns WHERE table_name = :t AND column_name = :c"),
+            {"t": table, "c": column},
+        ).scalar()
+
+def upgrade(ctx) -> None:
+    for table, columns in COLUMNS.items():
+        for column in columns:
+            if not ctx.has_column(table, column):
+                continue
+            fallback = [] if (table, column) in NOT_NULL else None
+            integers = (table, column) in INTEGER_LISTS
+
+            def fix_chunk(connection, rows, table=table, column=column, fallback=fallback, integers=integers):
+                updates = []
+                for row in rows:
+                    changed, value = normalize(row[1], integers)
+                    if changed:
+                        value = fallback if value is None else value
+                        updates.append({"id": row[0], "value": None if value is None else orjson.dumps(value).decode()})
+                if updates:
+                    connection.execute(text(f'UPDATE "{table}" SET {column} = :value WHERE id = :id'), updates)
+
+            ctx.backfill(
+                f"{table}.{column}",
+                f'SELECT id, {column} FROM "{table}" WHERE id > :last_id AND {column} IS NOT NULL '
+                "ORDER BY id LIMIT :limit",
+                fix_chunk,
+            )
+
+            if ctx.dialect == "postgresql" and _column_type(ctx, table, column) != "jsonb":
+                ctx.execute(f'ALTER TABLE "{table}" ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb')
+                ctx.log(f"  + {table}.{column} เป็น JSONB")
+
+    if ctx.dialect == "postgresql" and ctx.has_table("taxbenefit") and not ctx.has_index(
+        "taxbenefit", "ix_taxbenefit_applicable_provinces"
+    ):
+        ctx.execute(
+            "CREATE INDEX ix_taxbenefit_applicable_provinces ON taxbenefit "
+            "USING GIN (applicable_provinces jsonb_path_ops)"
+        )
+        ctx.log("  + สร้าง GIN index ix_taxbenefit_applicable_provinces")
@@ -0,0 +1,15 @@
+"""สร้างตาราง cacheversion สำหรับ invalidation bus ระหว่าง worker"""
+
+from sqlmodel import SQLModel
+
+revision = "0005"
+description = "สร้างตาราง cacheversion"
+
+def upgrade(ctx) -> None:
+    from thaitour.models.cache_version_model import CacheVersion
+
+    if ctx.has_table(CacheVersion.__tablename__):
+        ctx.log("  - ตาราง cacheversion มีอยู่แล้ว")
+        return
+    SQLModel.metadata.tables[CacheVersion.__tablename__].create(ctx.engine, checkfirst=True)
+    ctx.log("  + สร้างตาราง cacheversion")
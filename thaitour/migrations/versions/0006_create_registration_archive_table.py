@@ -0,0 +1,15 @@
+"""สร้างตาราง registrationarchive สำหรับการลงทะเบียนที่ย้ายออกจากตารางหลัก"""
+
+from sqlmodel import SQLModel
+
+revision = "0006"
+description = "สร้างตาราง registrationarchive"
+
+def upgrade(ctx) -> None:
+    from thaitour.models.registration_model import RegistrationArchive
+
+    if ctx.has_table(RegistrationArchive.__tablename__):
+        ctx.log("  - ตาราง registrationarchive มีอยู่แล้ว")
+        return
+    SQLModel.metadata.tables[RegistrationArchive.__tablename__].create(ctx.engine, checkfirst=True)
+    ctx.log("  + สร้างตาราง registrationarchive")
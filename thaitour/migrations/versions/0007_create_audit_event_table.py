@@ -0,0 +1,15 @@
+"""สร้างตาราง auditevent (append-only) พร้อม index ตาม entity และเวลา"""
+
+from sqlmodel import SQLModel
+
+revision = "0007"
+description = "สร้างตาราง auditevent"
+
+def upgrade(ctx) -> None:
+    from thaitour.models.audit_model import AuditEvent
+
+    if ctx.has_table(AuditEvent.__tablename__):
+        ctx.log("  - ตาราง auditevent มีอยู่แล้ว")
+        return
+    SQLModel.metadata.tables[AuditEvent.__tablename__].create(ctx.engine, checkfirst=True)
+    ctx.log("  + สร้างตาราง auditevent")
@@ -0,0 +1,46 @@
+"""change feed: สร้างตาราง changelog, index updated_at และบันทึกแถวที่มีอยู่เป็น upsert"""
+
+from datetime import datetime
+
+from sqlmodel import SQLModel
+
+revision = "0008"
+description = "สร้างตาราง changelog และ index updated_at"
+
+# entity -> ตาราง (แถวที่มีอยู่ก่อน change feed: cursor 0 จึงได้ข้อมูลครบ)
+ENTITY_TABLES = {
+    "province": "province",
+    "tax_benefit": "taxbenefit",
+    "registration": "registration",
+}
+
+def upgrade(ctx) -> None:
+    from thaitour.models.changelog_model import ChangeLog
+
+    if ctx.has_table(ChangeLog.__tablename__):
+        ctx.log("  - ตาราง changelog มีอยู่แล้ว")
+    else:
+        SQLModel.metadata.tables[ChangeLog.__tablename__].create(ctx.engine, checkfirst=True)
+        ctx.log("  + สร้างตาราง changelog")
+
+    for table in (*ENTITY_TABLES.values(), "registrationarchive"):
+        if ctx.has_column(table, "updated_at"):
+            ctx.create_index(table, f"ix_{table}_updated_at", ["updated_at"])
+
+    changelog = ChangeLog.__table__
+    for entity, table in ENTITY_TABLES.items():
+        if not ctx.has_table(table):
+            continue
+
+        def record(connection, rows, entity=entity):
+            now = datetime.utcnow()
+            connection.execute(changelog.insert(), [
+                {"entity": entity, "entity_id": str(row[0]), "op": "upsert", "changed_at": now} for row in rows
+            ])
+
+        ctx.backfill(
+            f"changelog_{table}",
+            f'SELECT id FROM "{table}" WHERE id > :last_id ORDER BY id LIMIT :limit',
+            record,
+            total_sql=f'SELECT count(*) FROM "{table}" WHERE id > :last_id',
+        )
@@ -0,0 +1,35 @@
+"""
+สร้างตาราง idsequence และตั้ง id ล่าสุดของ registration จาก id สูงสุดของตารางหลักและ archive
+
+SQLite ใช้ max(id) + 1 ของตารางหลัก จึงออก id ที่ถูกย้ายไป registrationarchive ซ้ำ
+registration ใหม่จองจาก idsequence แทน (ไม่ต้องสร้างตาราง registration ใหม่ ไม่ล็อกตารางนาน)
+"""
+
+from sqlmodel import SQLModel
+
+revision = "0009"
+description = "สร้างตาราง idsequence (id ของ registration ไม่ซ้ำกับที่ archive แล้ว)"
+
+def upgrade(ctx) -> None:
+    from thaitour.models.id_sequence_model import IdSequence
+
+    if ctx.has_table(IdSequence.__tablename__):
+        ctx.log("  - ตาราง idsequence มีอยู่แล้ว")
+    else:
+        SQLModel.metadata.tables[IdSequence.__tablename__].create(ctx.engine, checkfirst=True)
+        ctx.log("  + สร้างตาราง idsequence")
+
+    if not ctx.has_table("registration"):
+        return
+    tables = ["registration"]
+    if ctx.has_table("registrationarchive"):
+        tables.append("registrationarchive")
+    highest = " UNION ALL ".join(f'SELECT MAX(id) AS id FROM "{table}"' for table in tables)
+    # ค่าที่มีอยู่แล้วไม่ลดลง (รันซ้ำได้)
+    ctx.execute(
+        "INSERT INTO idsequence (name, last_id) "
+        f"SELECT 'registration', COALESCE(MAX(id), 0) FROM ({highest}) AS highest WHERE true "
+        "ON CONFLICT (name) DO UPDATE SET last_id = CASE WHEN excluded.last_id > idsequence.last_id "
+        "THEN excluded.last_id ELSE idsequence.last_id END"
+    )
+    ctx.log("  + ตั้ง id ล่าสุดของ registration")
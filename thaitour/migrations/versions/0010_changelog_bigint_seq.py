@@ -0,0 +1,24 @@
+"""
+changelog.seq เป็น BIGINT บน Postgres
+
+writer ไม่ล็อกร่วมกันแล้ว seq มาจาก txid ของ transaction (txid << 20) จึงเกินช่วงของ INTEGER
+SQLite: INTEGER เก็บได้ 64 บิตอยู่แล้ว ไม่ต้องแก้
+"""
+
+from sqlalchemy import text
+
+revision = "0010"
+description = "changelog.seq เป็น BIGINT (seq จาก txid บน Postgres)"
+
+def upgrade(ctx) -> None:
+    if ctx.dialect != "postgresql" or not ctx.has_table("changelog"):
+        return
+    with ctx.engine.connect() as connection:
+        data_type = connection.execute(
+            text("SELECT data_type FROM information_schema.columns WHERE table_name = 'changelog' AND column_name = 'seq'")
+        ).scalar()
+    if data_type == "bigint":
+        ctx.log("  - changelog.seq เป็น BIGINT อยู่แล้ว")
+        return
+    ctx.execute("ALTER TABLE changelog ALTER COLUMN seq TYPE BIGINT")
+    ctx.log("  + เปลี่ยน changelog.seq เป็น BIGINT")
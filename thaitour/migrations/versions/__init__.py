@@ -0,0 +1 @@
+"""revision ของ schema เรียงตามเลขนำหน้าชื่อไฟล์"""
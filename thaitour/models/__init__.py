@@ -1,24 +1,176 @@
+from fastapi import Request, Response
 from sqlmodel import SQLModel, create_engine, Session
-from typing import Generator
-import os
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from typing import AsyncGenerator, Generator, Optional
+from thaitour.core.config import Settings, get_settings
+from thaitour.core.instrumentation import instrument_engine
+from thaitour.core.metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, register_engine
+from thaitour.models.routing import READ_METHODS, SessionRouter
+from thaitour.models.types import json_dumps, json_loads
 
-# Database URL
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./thaitour.db")
+def get_async_database_url(database_url: str) -> str:
+    """
+    แปลง URL ของ driver แบบ sync ให้เป็น driver แบบ async (aiosqlite / asyncpg)
+    """
+    scheme, sep, rest = database_url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return database_url
 
-# Create engine
-engine = create_engine(DATABASE_URL, echo=True)
+def _is_sqlite(database_url: str) -> bool:
+    return database_url.startswith("sqlite")
 
-def create_db_and_tables():
-    """สร้างตารางฐานข้อมูลทั้งหมด"""
+def _engine_options(database_url: str, config: Settings, poolclass=None) -> dict:
+    """
+    ตัวเลือกของ engine จาก Settings (pool, pre-ping, echo) และ orjson สำหรับคอลัมน์ JSON
+    """
+    options = {"echo": config.db_echo, "json_serializer": json_dumps, "json_deserializer": json_loads}
+    database = make_url(database_url).database
+    if _is_sqlite(database_url) and database in (None, "", ":memory:"):
+        # in-memory SQLite ใช้ pool พิเศษของ SQLAlchemy ที่ไม่รองรับการตั้งขนาด
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        pool_recycle=config.db_pool_recycle,
+        pool_pre_ping=config.db_pool_pre_ping,
+    )
+    return options
+
+def _apply_sqlite_pragmas(sync_engine: Engine, config: Settings) -> None:
+    pragmas = [
+        f"PRAGMA journal_mode={config.sqlite_journal_mode}",
+        f"PRAGMA synchronous={config.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout_ms)}",
+        f"PRAGMA cache_size={int(config.sqlite_cache_size)}",
+        f"PRAGMA mmap_size={int(config.sqlite_mmap_size)}",
+    ]
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+def build_engine(database_url: str, config: Optional[Settings] = None, name: Optional[str] = None) -> Engine:
+    """สร้าง sync engine ตาม Settings (name = label ของ pool ใน /metrics)"""
+    config = config or get_settings()
+    new_engine = create_engine(database_url, **_engine_options(database_url, config, TimedQueuePool))
+    if _is_sqlite(database_url):
+        _apply_sqlite_pragmas(new_engine, config)
+    instrument_engine(new_engine)
+    if name:
+        register_engine(name, new_engine)
+    return new_engine
+
+def build_async_engine(database_url: str, config: Optional[Settings] = None, name: Optional[str] = None) -> AsyncEngine:
+    """สร้าง async engine ตาม Settings (name = label ของ pool ใน /metrics)"""
+    config = config or get_settings()
+    async_url = get_async_database_url(database_url)
+    new_engine = create_async_engine(async_url, **_engine_options(async_url, config, TimedAsyncAdaptedQueuePool))
+    if _is_sqlite(async_url):
+        _apply_sqlite_pragmas(new_engine.sync_engine, config)
+    instrument_engine(new_engine.sync_engine)
+    if name:
+        register_engine(name, new_engine.sync_engine)
+    return new_engine
+
+class Database:
+    """
+    engine ทั้งหมดของ process: sync (scripts และงาน background ที่รันใน thread),
+    async primary สำหรับ request handlers และ read replicas
+    (GET และ dependency แบบ read-only อ่านจาก replica, นอกนั้นไป primary)
+    """
+
+    def __init__(self, config: Optional[Settings] = None):
+        config = config or get_settings()
+        self.url = config.database_url
+        self.engine = build_engine(self.url, config, name="sync")
+        self.async_engine = build_async_engine(self.url, config, name="primary")
+        self.replica_engines = [
+            build_async_engine(url, config, name=f"replica{index}")
+            for index, url in enumerate(config.database_replica_urls)
+        ]
+        self.session_router = SessionRouter(self.async_engine, self.replica_engines, config.replica_sticky_seconds)
+
+    async def dispose(self) -> None:
+        for async_engine in [self.async_engine, *self.replica_engines]:
+            await async_engine.dispose()
+        self.engine.dispose()
+
+_database: Optional[Database] = None
+
+def get_database() -> Database:
+    """Database ของ process (สร้าง engine ครั้งแรกที่ถูกใช้ ไม่ใช่ตอน import)"""
+    global _database
+    if _database is None:
+        _database = Database()
+    return _database
+
+def set_database(database: Optional[Database]) -> Optional[Database]:
+    """เปลี่ยน Database ของ process (lifespan ของ create_app หรือ tests) คืนค่าเดิม"""
+    global _database
+    previous, _database = _database, database
+    return previous
+
+_DATABASE_ATTRIBUTES = ("engine", "async_engine", "replica_engines", "session_router")
+
+def __getattr__(name: str):
+    # from thaitour.models import engine ยังใช้ได้ (PEP 562) โดยสร้าง Database เมื่อถูกเรียกใช้
+    if name in _DATABASE_ATTRIBUTES:
+        return getattr(get_database(), name)
+    if name == "DATABASE_URL":
+        return get_settings().database_url
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def create_db_and_tables(bind: Optional[Engine] = None):
+    """สร้างตารางฐานข้อมูลทั้งหมด (ค่าเริ่มต้นคือ engine ของ process)"""
     # Import models เพื่อให้ SQLModel รู้จักตาราง
     from thaitour.models.province_model import Province
-    from thaitour.models.registration_model import Registration
+    from thaitour.models.registration_model import Registration, RegistrationArchive
     from thaitour.models.tax_model import TaxBenefit
     from thaitour.models.user_model import User
-    
-    SQLModel.metadata.create_all(engine)
+    from thaitour.models.refresh_token_model import RefreshToken
+    from thaitour.models.cache_version_model import CacheVersion
+    from thaitour.models.audit_model import AuditEvent
+    from thaitour.models.changelog_model import ChangeLog
+    from thaitour.models.id_sequence_model import IdSequence
+
+    SQLModel.metadata.create_all(bind or get_database().engine)
 
 def get_session() -> Generator[Session, None, None]:
     """สร้าง database session"""
-    with Session(engine) as session:
+    with Session(get_database().engine) as session:
+        yield session
+
+async def get_async_session(request: Request, response: Response) -> AsyncGenerator[AsyncSession, None]:
+    """
+    สร้าง async database session (ไม่ block event loop ระหว่างรอ query)
+    GET ใช้ replica; method อื่นใช้ primary และทำให้ client อ่านจาก primary ต่อช่วงสั้น ๆ
+    """
+    session_router = get_database().session_router
+    if request.method in READ_METHODS:
+        async with session_router.session(read_only=True, sticky=session_router.is_sticky(request)) as session:
+            yield session
+        return
+
+    session_router.mark_sticky(response)
+    async with session_router.session() as session:
+        yield session
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """async session แบบ read-only (ใช้ replica ถ้ามี)"""
+    session_router = get_database().session_router
+    async with session_router.session(read_only=True, sticky=session_router.is_sticky(request)) as session:
         yield session
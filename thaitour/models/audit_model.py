@@ -0,0 +1,24 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, event
+from typing import Optional
+from datetime import datetime
+from thaitour.models.types import JSONType
+
+class AuditEvent(SQLModel, table=True):
+    # ค้นประวัติของ entity หนึ่งตามช่วงเวลา
+    __table_args__ = (Index("ix_auditevent_entity_time", "entity", "entity_id", "occurred_at"),)
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    occurred_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    
+    # ใครทำอะไรกับอะไร
+    actor: Optional[str] = Field(default=None, max_length=100)  # username
+    entity: str = Field(max_length=50)  # registration, province, tax_benefit
+    entity_id: str = Field(max_length=50)
+    action: str = Field(max_length=30)  # create, update, status_change, delete
+    changes: Optional[dict] = Field(default=None, sa_type=JSONType)  # field -> [ค่าเดิม, ค่าใหม่]
+
+@event.listens_for(AuditEvent, "before_update")
+@event.listens_for(AuditEvent, "before_delete")
+def _append_only(mapper, connection, target):
+    raise ValueError("audit events are append-only")
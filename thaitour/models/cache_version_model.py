@@ -0,0 +1,10 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class CacheVersion(SQLModel, table=True):
+    # ช่องทาง invalidation ระหว่าง worker: เพิ่ม version เมื่อข้อมูลของช่องทางนี้เปลี่ยน
+    channel: str = Field(primary_key=True, max_length=50)
+    version: int = Field(default=0)
+    
+    # System fields
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
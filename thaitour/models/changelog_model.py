@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Index, Integer
+from typing import Optional
+from datetime import datetime
+
+class ChangeLog(SQLModel, table=True):
+    # seq คือ cursor ของ change feed: AUTOINCREMENT บน SQLite ไม่นำเลขที่ถูกลบกลับมาใช้ซ้ำ
+    # Postgres ใช้ BIGINT เพราะ seq มาจาก txid (ดู thaitour.core.changefeed)
+    __table_args__ = (
+        Index("ix_changelog_entity_seq", "entity", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+    
+    seq: Optional[int] = Field(default=None, primary_key=True, sa_type=BigInteger().with_variant(Integer, "sqlite"))
+    entity: str = Field(max_length=50)  # province, tax_benefit, registration
+    entity_id: str = Field(max_length=50)
+    op: str = Field(max_length=10)  # upsert, delete (tombstone)
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,6 @@
+from sqlmodel import SQLModel, Field
+
+class IdSequence(SQLModel, table=True):
+    # id ล่าสุดที่ออกไปแล้วของแต่ละตาราง: ไม่ลดลงเมื่อแถวถูกย้ายไป archive หรือถูกลบ จึงไม่ออก id ซ้ำ
+    name: str = Field(primary_key=True, max_length=50)
+    last_id: int = Field(default=0)
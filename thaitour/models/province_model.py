@@ -1,7 +1,8 @@
 from sqlmodel import SQLModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
+from thaitour.models.types import JSONType
 
 class ProvinceType(str, Enum):
     PRIMARY = "primary"      # จังหวัดหลัก
@@ -21,8 +22,8 @@ class Province(SQLModel, table=True):
     
     # Tourism Information
     description: Optional[str] = Field(max_length=2000)
-    famous_attractions: Optional[str] = Field(max_length=1000)  # JSON string
-    local_specialties: Optional[str] = Field(max_length=1000)   # JSON string
+    famous_attractions: Optional[List[str]] = Field(default=None, sa_type=JSONType)
+    local_specialties: Optional[List[str]] = Field(default=None, sa_type=JSONType)
     
     # Tax Reduction Information
     tax_reduction_percentage: float = Field(default=0.0)  # เปอร์เซ็นต์ลดหย่อน
@@ -33,4 +34,4 @@ class Province(SQLModel, table=True):
     
     # System fields
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = Field(default=None, index=True)
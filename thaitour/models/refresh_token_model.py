@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class RefreshToken(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    
+    # Owner
+    user_id: int = Field(foreign_key="user.id", index=True)
+    
+    # เก็บเฉพาะ SHA-256 ของ token ไม่เก็บ token จริง
+    token_hash: str = Field(max_length=64, unique=True, index=True)
+    family_id: str = Field(max_length=32, index=True)  # token ที่ rotate ต่อกันมาใช้ family เดียวกัน
+    
+    # Lifetime
+    expires_at: datetime
+    revoked_at: Optional[datetime] = None
+    replaced_by_id: Optional[int] = None
+    
+    # System fields
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,7 +1,10 @@
+from sqlalchemy import event, func, select, text
+from sqlalchemy.engine import Connection
 from sqlmodel import SQLModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
+from thaitour.models.types import JSONType
 
 class RegistrationStatus(str, Enum):
     PENDING = "pending"
@@ -10,7 +13,8 @@ class RegistrationStatus(str, Enum):
     ACTIVE = "active"
     SUSPENDED = "suspended"
 
-class Registration(SQLModel, table=True):
+class RegistrationBase(SQLModel):
+    """คอลัมน์ที่ใช้ร่วมกันของตาราง registration (ข้อมูลปัจจุบัน) และ registrationarchive"""
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Link to User Account
@@ -38,9 +42,44 @@ class Registration(SQLModel, table=True):
     approved_by: Optional[str] = None
     
     # Travel Preferences
-    target_provinces: str = Field(max_length=1000)  # JSON string of selected provinces
-    interests: Optional[str] = Field(max_length=1000)  # JSON string of interests
+    target_provinces: List[str] = Field(sa_type=JSONType)  # จังหวัดที่เลือก
+    interests: Optional[List[str]] = Field(default=None, sa_type=JSONType)
     
     # System fields
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = Field(default=None, index=True)
+
+class Registration(RegistrationBase, table=True):
+    pass
+
+class RegistrationArchive(RegistrationBase, table=True):
+    """
+    การลงทะเบียนที่ย้ายออกจากตารางหลักโดยงาน archive (id เดิม) ตารางหลักจึงเหลือเฉพาะแคมเปญปัจจุบัน
+    """
+    archived_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+_RESERVE_SQL = text("UPDATE idsequence SET last_id = last_id + :count WHERE name = 'registration' RETURNING last_id")
+_SEED_SQL = text(
+    "INSERT INTO idsequence (name, last_id) VALUES ('registration', :last_id) ON CONFLICT (name) DO NOTHING"
+)
+
+def reserve_registration_ids(connection: Connection, count: int = 1) -> int:
+    """
+    จอง id ของ registration จำนวน count ต่อจาก id สูงสุดที่เคยออก (รวมแถวที่ archive แล้ว) คืน id แรก
+    SQLite ใช้ max(id) + 1 ของตารางหลัก จึงออก id ที่ถูกย้ายไป archive ซ้ำถ้าไม่จองจาก idsequence
+    """
+    last_id = connection.execute(_RESERVE_SQL, {"count": count}).scalar()
+    if last_id is None:
+        # ยังไม่มีแถวของ registration: เริ่มจาก id สูงสุดของทั้งสองตาราง
+        highest = max(
+            connection.execute(select(func.max(Registration.id))).scalar() or 0,
+            connection.execute(select(func.max(RegistrationArchive.id))).scalar() or 0,
+        )
+        connection.execute(_SEED_SQL, {"last_id": highest})
+        last_id = connection.execute(_RESERVE_SQL, {"count": count}).scalar()
+    return last_id - count + 1
+
+@event.listens_for(Registration, "before_insert")
+def _assign_registration_id(mapper, connection, target):
+    if target.id is None:
+        target.id = reserve_registration_ids(connection)
@@ -0,0 +1,62 @@
+from itertools import cycle
+from typing import Optional, Sequence
+from threading import Lock
+import time
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# cookie ที่บอกว่า client นี้เพิ่งเขียนข้อมูล ให้อ่านจาก primary จนถึงเวลาที่กำหนด
+STICKY_COOKIE = "tt_primary_until"
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+class SessionRouter:
+    """
+    เลือก engine ให้แต่ละ session: เขียนไป primary, อ่านไป replica แบบ round-robin
+    """
+
+    def __init__(self, primary: AsyncEngine, replicas: Sequence[AsyncEngine] = (), sticky_seconds: float = 5.0):
+        self.primary = primary
+        self.sticky_seconds = sticky_seconds
+        self._lock = Lock()
+        self.set_replicas(replicas)
+
+    def set_replicas(self, replicas: Sequence[AsyncEngine]) -> None:
+        with self._lock:
+            self.replicas = list(replicas)
+            self._next_replica = cycle(self.replicas) if self.replicas else None
+
+    def engine_for(self, read_only: bool, sticky: bool = False) -> AsyncEngine:
+        if not read_only or sticky or self._next_replica is None:
+            return self.primary
+        with self._lock:
+            return next(self._next_replica)
+
+    def session(self, read_only: bool = False, sticky: bool = False) -> AsyncSession:
+        return AsyncSession(self.engine_for(read_only, sticky), expire_on_commit=False)
+
+    def is_sticky(self, request: Optional[Request]) -> bool:
+        """client เขียนข้อมูลไปเมื่อไม่นานนี้หรือไม่ (read-your-writes)"""
+        if request is None:
+            return False
+        value = request.cookies.get(STICKY_COOKIE)
+        if not value:
+            return False
+        try:
+            return float(value) > time.time()
+        except ValueError:
+            return False
+
+    def mark_sticky(self, response: Response) -> None:
+        if not self.replicas or self.sticky_seconds <= 0:
+            return
+        until = time.time() + self.sticky_seconds
+        response.set_cookie(
+            STICKY_COOKIE,
+            f"{until:.3f}",
+            max_age=max(1, int(self.sticky_seconds)),
+            httponly=True,
+            samesite="lax",
+        )
@@ -1,7 +1,8 @@
 from sqlmodel import SQLModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
+from thaitour.models.types import JSONType
 
 class TaxBenefitType(str, Enum):
     PROVINCE_SPECIFIC = "province_specific"  # ลดหย่อนเฉพาะจังหวัด
@@ -18,7 +19,7 @@ class TaxBenefit(SQLModel, table=True):
     
     # Province Information
     province_id: Optional[int] = Field(foreign_key="province.id")
-    applicable_provinces: Optional[str] = Field(max_length=1000)  # JSON list of province IDs
+    applicable_provinces: Optional[List[int]] = Field(default=None, sa_type=JSONType)  # province IDs
     
     # Financial Information
     reduction_percentage: float = Field(default=0.0)  # เปอร์เซ็นต์ลดหย่อน
@@ -26,8 +27,8 @@ class TaxBenefit(SQLModel, table=True):
     min_spending_amount: float = Field(default=0.0)   # จำนวนเงินใช้จ่ายขั้นต่ำ
     
     # Eligibility Criteria
-    eligible_activities: Optional[str] = Field(max_length=1000)  # JSON list
-    required_documents: Optional[str] = Field(max_length=1000)   # JSON list
+    eligible_activities: Optional[List[str]] = Field(default=None, sa_type=JSONType)
+    required_documents: Optional[List[str]] = Field(default=None, sa_type=JSONType)
     
     # Validity Period
     start_date: datetime
@@ -38,4 +39,4 @@ class TaxBenefit(SQLModel, table=True):
     
     # System fields
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = Field(default=None, index=True)
@@ -0,0 +1,49 @@
+from typing import Any
+import orjson
+
+from sqlalchemy import JSON, Boolean, Integer, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+# คอลัมน์ list/dict: SQLite เก็บเป็น TEXT (JSON1), Postgres เป็น JSONB
+# ค่าถูก decode ครั้งเดียวตอนโหลด row (ORM object ถือ list ไม่ใช่ string)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+def json_dumps(value: Any) -> str:
+    """json_serializer ของ engine: orjson และเก็บภาษาไทยตามตัวอักษร (ไม่ escape เป็น \\uXXXX)"""
+    return orjson.dumps(value).decode()
+
+def json_loads(value: Any) -> Any:
+    """json_deserializer ของ engine"""
+    return orjson.loads(value)
+
+class json_array_contains(ColumnElement):
+    """
+    เงื่อนไข "array JSON ในคอลัมน์มีค่า value" ที่เทียบทีละสมาชิก (ไม่ใช่ LIKE บนข้อความ
+    ซึ่ง 1 จะไปตรงกับ 10, 11, ...)
+    Postgres ใช้ @> (ใช้ GIN index ได้), SQLite ใช้ json_each
+    """
+    type = Boolean()
+    inherit_cache = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("value", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, column, value: int):
+        self.column = column
+        self.value = literal(value, Integer)
+
+@compiles(json_array_contains)
+def _compile_json_each(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    value = compiler.process(element.value, **kw)
+    return f"EXISTS (SELECT 1 FROM json_each({column}) WHERE json_each.value = {value})"
+
+@compiles(json_array_contains, "postgresql")
+def _compile_jsonb_contains(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    value = compiler.process(element.value, **kw)
+    return f"({column} @> jsonb_build_array({value}))"
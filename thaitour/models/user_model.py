@@ -24,6 +24,9 @@ class User(SQLModel, table=True):
     is_active: bool = Field(default=True)
     is_verified: bool = Field(default=False)
     
+    # เพิ่มค่าเมื่อ role/สถานะเปลี่ยน เพื่อยกเลิก access token ที่ออกไปก่อนหน้า
+    token_version: int = Field(default=0)
+    
     # Timestamps
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
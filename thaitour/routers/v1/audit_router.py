@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from thaitour.schemas.audit_schema import AuditEventResponse
+from thaitour.models.audit_model import AuditEvent
+from thaitour.models import get_async_session
+from thaitour.core.audit import audit_log
+from thaitour.core.instrumentation import TimedAPIRoute
+from thaitour.core.serialization import ResponseSerializer
+from thaitour.core.deps import Principal, require_admin
+from datetime import datetime
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedAPIRoute)
+
+audit_response = ResponseSerializer(AuditEventResponse)
+
+@router.get("/", response_model=List[AuditEventResponse])
+async def get_audit_events(
+    entity: Optional[str] = Query(None, description="ประเภทข้อมูล เช่น registration, province, tax_benefit"),
+    entity_id: Optional[str] = Query(None, description="ID ของข้อมูล"),
+    since: Optional[datetime] = Query(None, description="ตั้งแต่เวลา"),
+    until: Optional[datetime] = Query(None, description="ถึงเวลา"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_admin: Principal = Depends(require_admin),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    ดูประวัติการแก้ไขข้อมูล ล่าสุดก่อน (สำหรับ Admin เท่านั้น)
+    """
+    # เขียน event ที่ยังค้างในคิวก่อน ผลจึงรวมการเปลี่ยนแปลงล่าสุด
+    # (ถ้าเขียนไม่สำเร็จ event ยังอยู่ในคิวให้ flush รอบถัดไป การอ่านไม่ควรล้มเหลวตาม)
+    try:
+        await asyncio.to_thread(audit_log.flush)
+    except Exception:
+        logger.exception("Failed to write audit events")
+
+    query = select(AuditEvent)
+    if entity:
+        query = query.where(AuditEvent.entity == entity)
+    if entity_id:
+        query = query.where(AuditEvent.entity_id == entity_id)
+    if since:
+        query = query.where(AuditEvent.occurred_at >= since)
+    if until:
+        query = query.where(AuditEvent.occurred_at < until)
+
+    events = (await session.exec(
+        query.order_by(AuditEvent.occurred_at.desc(), AuditEvent.id.desc()).limit(limit)
+    )).all()
+
+    return audit_response.many(events)
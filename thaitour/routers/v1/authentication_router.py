@@ -1,78 +1,239 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer
 from pydantic import BaseModel
 from datetime import timedelta, datetime
-from sqlmodel import Session, select
-from thaitour.core.security import create_access_token, verify_password
+from typing import Optional
+from uuid import uuid4
+import math
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from thaitour.core.cache import TTLCache
+from thaitour.core.instrumentation import TimedAPIRoute
+from thaitour.core.last_login import last_login_buffer
+from thaitour.core.rate_limit import RateLimiter
+from thaitour.core.security import (
+    create_access_token,
+    create_refresh_token,
+    hash_refresh_token,
+    user_token_claims,
+    verify_password_async
+)
 from thaitour.core.config import settings
 from thaitour.models.user_model import User
-from thaitour.models import get_session
+from thaitour.models.refresh_token_model import RefreshToken
+from thaitour.models import get_async_session
 
-router = APIRouter()
+router = APIRouter(route_class=TimedAPIRoute)
 security = HTTPBearer()
 
+# token_hash -> family_id ของ refresh token ที่ถูกยกเลิกแล้ว (ตัดสินได้โดยไม่ต้อง query)
+revoked_refresh_tokens = TTLCache(maxsize=settings.revoked_refresh_cache_size, name="revoked_refresh")
+
+# จำกัดความถี่การ login ก่อนถึงขั้นตอน query และ bcrypt
+MAX_RETRY_AFTER_SECONDS = 3600
+login_username_limiter = RateLimiter(
+    capacity=settings.login_username_burst,
+    refill_per_second=settings.login_username_per_minute / 60,
+    maxsize=settings.login_rate_limit_max_keys,
+    name="login_username"
+)
+login_ip_limiter = RateLimiter(
+    capacity=settings.login_ip_burst,
+    refill_per_second=settings.login_ip_per_minute / 60,
+    maxsize=settings.login_rate_limit_max_keys,
+    name="login_ip"
+)
+
+def _throttle_login(request: Request, username: str) -> None:
+    if not settings.login_rate_limit_enabled:
+        return
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = login_ip_limiter.acquire(client_ip)
+    if not retry_after:
+        retry_after = login_username_limiter.acquire(username.lower())
+    if retry_after:
+        # bucket ที่ไม่ refill คืน inf: Retry-After ต้องเป็นจำนวนเต็มจำกัด
+        retry_after = min(retry_after, MAX_RETRY_AFTER_SECONDS)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="พยายามเข้าสู่ระบบบ่อยเกินไป กรุณาลองใหม่ภายหลัง",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
 class LoginRequest(BaseModel):
     username: str
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
     expires_in: int
+    refresh_token: Optional[str] = None
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token ไม่ถูกต้องหรือหมดอายุ",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _issue_tokens(session: AsyncSession, user: User, family_id: Optional[str] = None) -> tuple[TokenResponse, RefreshToken]:
+    """
+    ออก access token และ refresh token ใหม่ (ยังไม่ commit)
+    """
+    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    access_token = create_access_token(
+        subject=user.username,
+        expires_delta=access_token_expires,
+        claims=user_token_claims(user)
+    )
+
+    refresh_token, token_hash = create_refresh_token()
+    db_refresh_token = RefreshToken(
+        user_id=user.id,
+        token_hash=token_hash,
+        family_id=family_id or uuid4().hex,
+        expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+    )
+    session.add(db_refresh_token)
+
+    return TokenResponse(
+        access_token=access_token,
+        token_type="bearer",
+        expires_in=settings.access_token_expire_minutes * 60,
+        refresh_token=refresh_token
+    ), db_refresh_token
+
+async def _revoke_family(session: AsyncSession, family_id: str) -> None:
+    now = datetime.utcnow()
+    revoked = (await session.exec(
+        select(RefreshToken.token_hash, RefreshToken.expires_at).where(
+            RefreshToken.family_id == family_id,
+            RefreshToken.revoked_at.is_(None)
+        )
+    )).all()
+    await session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    await session.commit()
+    for token_hash, expires_at in revoked:
+        revoked_refresh_tokens.set(token_hash, family_id, expires_at=_timestamp(expires_at))
+
+def _timestamp(value: datetime) -> float:
+    return (value - datetime(1970, 1, 1)).total_seconds()
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
     login_data: LoginRequest,
-    session: Session = Depends(get_session)
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     เข้าสู่ระบบด้วย username และ password
     """
+    _throttle_login(request, login_data.username)
+
     # ค้นหาผู้ใช้จากฐานข้อมูล
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(
             User.username == login_data.username,
             User.is_active == True
         )
-    ).first()
-    
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    )).first()
+
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="ชื่อผู้ใช้หรือรหัสผ่านไม่ถูกต้อง",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    # อัปเดต last_login
-    user.last_login = datetime.utcnow()
-    session.add(user)
-    session.commit()
-    
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        subject=user.username, expires_delta=access_token_expires
-    )
-    
-    return TokenResponse(
-        access_token=access_token,
-        token_type="bearer",
-        expires_in=settings.access_token_expire_minutes * 60
-    )
 
-@router.post("/refresh")
-async def refresh_token():
+    # อัปเดต last_login แบบ write-behind (ไม่ต้อง UPDATE ตาราง user ทุกครั้งที่ login)
+    last_login_buffer.record(user.id)
+
+    token_response, _ = _issue_tokens(session, user)
+    await session.commit()
+
+    return token_response
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_token(
+    refresh_data: RefreshRequest,
+    session: AsyncSession = Depends(get_async_session)
+):
     """
-    รีเฟรช token
+    รีเฟรช token ด้วย refresh token (rotate ทุกครั้ง ใช้ซ้ำไม่ได้)
     """
-    # Implementation for token refresh
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Token refresh not implemented yet"
+    token_hash = hash_refresh_token(refresh_data.refresh_token)
+
+    # token ที่เคยถูกยกเลิก/rotate ไปแล้วถูกนำมาใช้ซ้ำ: ยกเลิกทั้ง family
+    revoked_family = revoked_refresh_tokens.get(token_hash)
+    if revoked_family is not None:
+        await _revoke_family(session, revoked_family)
+        raise _invalid_refresh_token()
+
+    db_token = (await session.exec(
+        select(RefreshToken).where(RefreshToken.token_hash == token_hash)
+    )).first()
+
+    if not db_token:
+        raise _invalid_refresh_token()
+
+    if db_token.revoked_at is not None:
+        await _revoke_family(session, db_token.family_id)
+        raise _invalid_refresh_token()
+
+    if db_token.expires_at <= datetime.utcnow():
+        raise _invalid_refresh_token()
+
+    user = await session.get(User, db_token.user_id)
+    if not user or not user.is_active:
+        raise _invalid_refresh_token()
+
+    token_response, new_token = _issue_tokens(session, user, family_id=db_token.family_id)
+    await session.flush()
+
+    # rotate แบบ atomic: ถ้ามี request อื่น rotate token นี้ไปก่อน ให้ถือเป็นการใช้ซ้ำ
+    result = await session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.id == db_token.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow(), replaced_by_id=new_token.id)
     )
+    if result.rowcount != 1:
+        await session.rollback()
+        await _revoke_family(session, db_token.family_id)
+        raise _invalid_refresh_token()
+
+    await session.commit()
+    revoked_refresh_tokens.set(token_hash, db_token.family_id, expires_at=_timestamp(db_token.expires_at))
+
+    return token_response
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    logout_data: Optional[LogoutRequest] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
     """
     ออกจากระบบ
     """
+    if logout_data and logout_data.refresh_token:
+        token_hash = hash_refresh_token(logout_data.refresh_token)
+        family_id = revoked_refresh_tokens.get(token_hash)
+        if family_id is None:
+            family_id = (await session.exec(
+                select(RefreshToken.family_id).where(RefreshToken.token_hash == token_hash)
+            )).first()
+        if family_id is not None:
+            await _revoke_family(session, family_id)
+
     return {"message": "ออกจากระบบเรียบร้อยแล้ว"}
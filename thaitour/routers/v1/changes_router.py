@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from thaitour.schemas.change_schema import ChangeFeedResponse
+from thaitour.schemas.province_schema import ProvinceResponse
+from thaitour.schemas.registration_schema import RegistrationResponse
+from thaitour.schemas.tax_schema import TaxBenefitResponse
+from thaitour.models.changelog_model import ChangeLog
+from thaitour.models.province_model import Province
+from thaitour.models.registration_model import Registration, RegistrationArchive
+from thaitour.models.tax_model import TaxBenefit
+from thaitour.models import get_async_session
+from thaitour.core.changefeed import DELETE, settled
+from thaitour.core.instrumentation import TimedAPIRoute
+from thaitour.core.serialization import JSONBytesResponse, ResponseSerializer, dumps
+from thaitour.core.deps import Principal, require_admin_or_moderator
+
+router = APIRouter(route_class=TimedAPIRoute)
+
+# entity -> (ตารางที่อ่านข้อมูลปัจจุบัน, serializer) registration ที่ archive แล้วยังถือว่ามีอยู่
+entity_sources = {
+    "province": ((Province,), ResponseSerializer(ProvinceResponse)),
+    "tax_benefit": ((TaxBenefit,), ResponseSerializer(TaxBenefitResponse)),
+    "registration": ((Registration, RegistrationArchive), ResponseSerializer(RegistrationResponse)),
+}
+
+async def _load_current(session: AsyncSession, entity: str, entity_ids: set[str]) -> dict:
+    """ข้อมูลปัจจุบันของ entity_ids (query เดียวต่อตาราง) คืน entity_id -> response model"""
+    models, serializer = entity_sources[entity]
+    remaining = {int(entity_id) for entity_id in entity_ids}
+    found = {}
+    for model in models:
+        if not remaining:
+            break
+        rows = (await session.exec(select(model).where(model.id.in_(remaining)))).all()
+        for row in rows:
+            found[str(row.id)] = serializer.validate(row)
+            remaining.discard(row.id)
+    return found
+
+@router.get("/", response_model=ChangeFeedResponse)
+async def get_changes(
+    since: int = Query(0, ge=0, description="cursor จากการเรียกครั้งก่อน (0 = ตั้งแต่ต้น)"),
+    entity: Optional[str] = Query(None, description="province, tax_benefit หรือ registration"),
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: Principal = Depends(require_admin_or_moderator),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    รายการข้อมูลที่เพิ่ม แก้ไข หรือลบหลัง cursor since เรียงตามลำดับ commit (สำหรับ Admin/Moderator)
+    entity เดียวกันที่เปลี่ยนหลายครั้งในหน้าเดียวกันคืนเฉพาะครั้งล่าสุดพร้อมข้อมูลปัจจุบัน
+    """
+    query = select(ChangeLog).where((ChangeLog.seq > since) & settled(session.bind.dialect.name))
+    if entity:
+        query = query.where(ChangeLog.entity == entity)
+    entries = (await session.exec(query.order_by(ChangeLog.seq).limit(limit + 1))).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}
+    for entry in entries:
+        latest.pop((entry.entity, entry.entity_id), None)
+        latest[(entry.entity, entry.entity_id)] = entry
+
+    upserts: dict[str, set[str]] = {}
+    for entry in latest.values():
+        if entry.op != DELETE and entry.entity in entity_sources:
+            upserts.setdefault(entry.entity, set()).add(entry.entity_id)
+    current = {name: await _load_current(session, name, ids) for name, ids in upserts.items()}
+
+    changes = []
+    for entry in latest.values():
+        data = current.get(entry.entity, {}).get(entry.entity_id)
+        changes.append({
+            "seq": entry.seq,
+            "entity": entry.entity,
+            "entity_id": entry.entity_id,
+            # ถูกลบหลังจากนี้ (tombstone อยู่ในหน้าถัดไป): รายงานเป็นการลบเลย
+            "op": entry.op if data is not None else DELETE,
+            "changed_at": entry.changed_at,
+            "data": data,
+        })
+
+    return JSONBytesResponse(dumps({
+        "changes": changes,
+        "next_cursor": entries[-1].seq if entries else since,
+        "has_more": has_more,
+    }))
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, Request, status, Depends, Query
 from typing import List, Optional
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from thaitour.schemas.province_schema import (
     ProvinceCreate, 
     ProvinceUpdate, 
@@ -9,30 +10,50 @@ from thaitour.schemas.province_schema import (
     ProvinceType
 )
 from thaitour.models.province_model import Province
-from thaitour.models.user_model import User
-from thaitour.models import get_session
-from thaitour.core.deps import get_current_user, require_admin, require_admin_or_moderator
+from thaitour.models import get_async_session
+from thaitour.core.catalog import catalog_loader, get_catalog, watch_catalog_model
+from thaitour.core.audit import audit_log, diff
+from thaitour.core.instrumentation import TimedAPIRoute
+from thaitour.core.serialization import JSONBytesResponse, ResponseSerializer
+from thaitour.core.singleflight import flight_session, request_flight, request_key
+from thaitour.core.deps import Principal, get_current_user, require_admin, require_admin_or_moderator
 from datetime import datetime
-import json
 
-router = APIRouter()
+router = APIRouter(route_class=TimedAPIRoute)
+
+province_response = ResponseSerializer(ProvinceResponse)
+tax_info_response = ResponseSerializer(ProvinceTaxInfo)
+
+watch_catalog_model(Province)
+
+def _tax_info(province: Province) -> dict:
+    """payload ของ ProvinceTaxInfo จาก row (ชื่อ field ไม่ตรงกับคอลัมน์จึงสร้าง dict เอง)"""
+    return {
+        "province_id": province.id,
+        "name_th": province.name_th,
+        "name_en": province.name_en,
+        "province_type": province.province_type,
+        "tax_reduction_percentage": province.tax_reduction_percentage,
+        "max_reduction_amount": province.max_reduction_amount,
+        "is_secondary_province": province.province_type == ProvinceType.SECONDARY,
+    }
 
 @router.post("/", response_model=ProvinceResponse, status_code=status.HTTP_201_CREATED)
 async def create_province(
     province: ProvinceCreate,
-    current_admin: User = Depends(require_admin),
-    session: Session = Depends(get_session)
+    current_admin: Principal = Depends(require_admin),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     เพิ่มจังหวัดใหม่ (สำหรับ Admin เท่านั้น)
     """
     # ตรวจสอบว่าชื่อจังหวัดซ้ำหรือไม่
-    existing_province = session.exec(
+    existing_province = (await session.exec(
         select(Province).where(
             (Province.name_th == province.name_th) | 
             (Province.code == province.code)
         )
-    ).first()
+    )).first()
     
     if existing_province:
         raise HTTPException(
@@ -40,10 +61,6 @@ async def create_province(
             detail="ชื่อจังหวัดหรือรหัสจังหวัดนี้มีอยู่แล้ว"
         )
     
-    # แปลง list เป็น JSON string
-    famous_attractions_json = json.dumps(province.famous_attractions, ensure_ascii=False) if province.famous_attractions else None
-    local_specialties_json = json.dumps(province.local_specialties, ensure_ascii=False) if province.local_specialties else None
-    
     db_province = Province(
         name_th=province.name_th,
         name_en=province.name_en,
@@ -51,8 +68,8 @@ async def create_province(
         province_type=province.province_type,
         region=province.region,
         description=province.description,
-        famous_attractions=famous_attractions_json,
-        local_specialties=local_specialties_json,
+        famous_attractions=province.famous_attractions or None,
+        local_specialties=province.local_specialties or None,
         tax_reduction_percentage=province.tax_reduction_percentage,
         max_reduction_amount=province.max_reduction_amount,
         is_active=True,
@@ -60,29 +77,22 @@ async def create_province(
     )
     
     session.add(db_province)
-    session.commit()
-    session.refresh(db_province)
-    
-    # แปลง JSON string กลับเป็น list สำหรับ response
-    response_data = db_province.model_dump()
-    if db_province.famous_attractions:
-        response_data["famous_attractions"] = json.loads(db_province.famous_attractions)
-    if db_province.local_specialties:
-        response_data["local_specialties"] = json.loads(db_province.local_specialties)
+    await session.commit()
+    await session.refresh(db_province)
     
-    return ProvinceResponse(**response_data)
+    return province_response.validate(db_province)
 
 @router.get("/", response_model=List[ProvinceResponse])
 async def get_provinces(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     province_type: Optional[ProvinceType] = Query(None, description="ประเภทจังหวัด"),
     region: Optional[str] = Query(None, description="ภาค"),
-    is_active: Optional[bool] = Query(True, description="สถานะ"),
-    session: Session = Depends(get_session)
+    is_active: Optional[bool] = Query(True, description="สถานะ")
 ):
     """
-    ดูรายการจังหวัดทั้งหมด
+    ดูรายการจังหวัดทั้งหมด (request ที่เหมือนกันและมาพร้อมกันใช้ query เดียวกัน)
     """
     statement = select(Province)
     
@@ -101,100 +111,72 @@ async def get_provinces(
     # Add pagination
     statement = statement.offset(skip).limit(limit)
     
-    provinces = session.exec(statement).all()
-    
-    # แปลง JSON string กลับเป็น list สำหรับ response
-    result = []
-    for province in provinces:
-        province_data = province.model_dump()
-        if province.famous_attractions:
-            province_data["famous_attractions"] = json.loads(province.famous_attractions)
-        if province.local_specialties:
-            province_data["local_specialties"] = json.loads(province.local_specialties)
-        result.append(ProvinceResponse(**province_data))
+    async def load() -> bytes:
+        async with flight_session(request) as session:
+            provinces = (await session.exec(statement)).all()
+            return province_response.dumps_many(provinces)
     
-    return result
+    return JSONBytesResponse(await request_flight.do(request_key(request), load))
 
-@router.get("/secondary", response_model=List[ProvinceTaxInfo])
-async def get_secondary_provinces(session: Session = Depends(get_session)):
-    """
-    ดูรายการจังหวัดรองที่มีสิทธิลดหย่อนภาษี
-    """
-    secondary_provinces = session.exec(
+@catalog_loader("provinces:secondary")
+async def load_secondary_provinces(session: AsyncSession) -> bytes:
+    secondary_provinces = (await session.exec(
         select(Province).where(
             (Province.province_type == ProvinceType.SECONDARY) & 
             (Province.is_active == True)
         )
-    ).all()
-    
-    result = []
-    for province in secondary_provinces:
-        result.append(ProvinceTaxInfo(
-            province_id=province.id,
-            name_th=province.name_th,
-            name_en=province.name_en,
-            province_type=province.province_type,
-            tax_reduction_percentage=province.tax_reduction_percentage,
-            max_reduction_amount=province.max_reduction_amount,
-            is_secondary_province=True
-        ))
-    
-    return result
+    )).all()
+    
+    return tax_info_response.dumps_many(
+        _tax_info(province) for province in secondary_provinces
+    )
+
+@router.get("/secondary", response_model=List[ProvinceTaxInfo])
+async def get_secondary_provinces():
+    """
+    ดูรายการจังหวัดรองที่มีสิทธิลดหย่อนภาษี (cache ร่วมกันทุก request)
+    """
+    return JSONBytesResponse(await get_catalog("provinces:secondary"))
 
 @router.get("/{province_id}", response_model=ProvinceResponse)
-async def get_province(province_id: int, session: Session = Depends(get_session)):
+async def get_province(province_id: int, session: AsyncSession = Depends(get_async_session)):
     """
     ดูข้อมูลจังหวัดตาม ID
     """
-    province = session.get(Province, province_id)
+    province = await session.get(Province, province_id)
     if not province:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ไม่พบข้อมูลจังหวัด"
         )
     
-    # แปลง JSON string กลับเป็น list สำหรับ response
-    province_data = province.model_dump()
-    if province.famous_attractions:
-        province_data["famous_attractions"] = json.loads(province.famous_attractions)
-    if province.local_specialties:
-        province_data["local_specialties"] = json.loads(province.local_specialties)
-    
-    return ProvinceResponse(**province_data)
+    return province_response.one(province)
 
 @router.get("/{province_id}/tax-info", response_model=ProvinceTaxInfo)
-async def get_province_tax_info(province_id: int, session: Session = Depends(get_session)):
+async def get_province_tax_info(province_id: int, session: AsyncSession = Depends(get_async_session)):
     """
     ดูข้อมูลลดหย่อนภาษีของจังหวัด
     """
-    province = session.get(Province, province_id)
+    province = await session.get(Province, province_id)
     if not province:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ไม่พบข้อมูลจังหวัด"
         )
     
-    return ProvinceTaxInfo(
-        province_id=province.id,
-        name_th=province.name_th,
-        name_en=province.name_en,
-        province_type=province.province_type,
-        tax_reduction_percentage=province.tax_reduction_percentage,
-        max_reduction_amount=province.max_reduction_amount,
-        is_secondary_province=province.province_type == ProvinceType.SECONDARY
-    )
+    return tax_info_response.one(_tax_info(province))
 
 @router.put("/{province_id}", response_model=ProvinceResponse)
 async def update_province(
     province_id: int,
     province_update: ProvinceUpdate,
-    current_admin: User = Depends(require_admin),
-    session: Session = Depends(get_session)
+    current_admin: Principal = Depends(require_admin),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     แก้ไขข้อมูลจังหวัด (สำหรับ Admin เท่านั้น)
     """
-    province = session.get(Province, province_id)
+    province = await session.get(Province, province_id)
     if not province:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -202,48 +184,39 @@ async def update_province(
         )
     
     update_data = province_update.model_dump(exclude_unset=True)
+    changes = diff(province, update_data)
     
     for field, value in update_data.items():
         if value is not None:
-            if field == "famous_attractions" and isinstance(value, list):
-                setattr(province, field, json.dumps(value, ensure_ascii=False))
-            elif field == "local_specialties" and isinstance(value, list):
-                setattr(province, field, json.dumps(value, ensure_ascii=False))
-            else:
-                setattr(province, field, value)
+            setattr(province, field, value)
     
     province.updated_at = datetime.utcnow()
     
     session.add(province)
-    session.commit()
-    session.refresh(province)
-    
-    # แปลง JSON string กลับเป็น list สำหรับ response
-    province_data = province.model_dump()
-    if province.famous_attractions:
-        province_data["famous_attractions"] = json.loads(province.famous_attractions)
-    if province.local_specialties:
-        province_data["local_specialties"] = json.loads(province.local_specialties)
+    await session.commit()
+    await session.refresh(province)
+    await audit_log.emit("province", province_id, "update", current_admin.username, changes)
     
-    return ProvinceResponse(**province_data)
+    return province_response.validate(province)
 
 @router.delete("/{province_id}")
 async def delete_province(
     province_id: int,
-    current_admin: User = Depends(require_admin),
-    session: Session = Depends(get_session)
+    current_admin: Principal = Depends(require_admin),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     ลบข้อมูลจังหวัด (สำหรับ Admin เท่านั้น)
     """
-    province = session.get(Province, province_id)
+    province = await session.get(Province, province_id)
     if not province:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ไม่พบข้อมูลจังหวัด"
         )
     
-    session.delete(province)
-    session.commit()
+    await session.delete(province)
+    await session.commit()
+    await audit_log.emit("province", province_id, "delete", current_admin.username)
     
     return {"message": "ลบข้อมูลจังหวัดเรียบร้อยแล้ว"}
@@ -1,35 +1,54 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
-from sqlmodel import Session, select
+from fastapi import APIRouter, HTTPException, status, Depends, Header
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from thaitour.schemas.registration_schema import (
     RegistrationCreate, 
     RegistrationUpdate, 
     RegistrationResponse, 
     RegistrationStatusUpdate
 )
-from thaitour.models.registration_model import Registration
+from thaitour.models.registration_model import Registration, RegistrationArchive, RegistrationBase
 from thaitour.models.user_model import User, UserRole
-from thaitour.models import get_session
-from thaitour.core.deps import get_current_user, require_admin, require_admin_or_moderator
-from thaitour.core.security import get_password_hash
-import json
+from thaitour.models import get_async_session, get_database
+from thaitour.core.audit import audit_log, diff
+from thaitour.core.config import settings
+from thaitour.core.instrumentation import TimedAPIRoute
+from thaitour.core.serialization import ResponseSerializer
+from thaitour.core.deps import Principal, get_current_user, require_admin, require_admin_or_moderator
+from thaitour.core.security import get_password_hash_async
+from thaitour.core.status_stream import status_broadcaster, status_event_stream, status_payload
 from datetime import datetime
 
-router = APIRouter()
+router = APIRouter(route_class=TimedAPIRoute)
+
+registration_response = ResponseSerializer(RegistrationResponse)
+
+async def _find_registration(session: AsyncSession, condition_for) -> Optional[RegistrationBase]:
+    """
+    หาในตารางหลักก่อน แล้วจึงหาใน archive (แถวที่ถูกย้ายยังนับว่ามีอยู่)
+    condition_for(model) คืนเงื่อนไขของ model นั้น
+    """
+    for model in (Registration, RegistrationArchive):
+        row = (await session.exec(select(model).where(condition_for(model)))).first()
+        if row is not None:
+            return row
+    return None
 
 @router.post("/", response_model=RegistrationResponse, status_code=status.HTTP_201_CREATED)
 async def create_registration(
     registration: RegistrationCreate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     สร้างการลงทะเบียนใหม่สำหรับระบบท่องเที่ยวคนละครึ่ง
     พร้อมสร้าง User Account สำหรับเข้าสู่ระบบ
     """
-    # ตรวจสอบว่าเลขบัตรประชาชนซ้ำหรือไม่
-    existing_citizen = session.exec(
-        select(Registration).where(Registration.citizen_id == registration.citizen_id)
-    ).first()
+    # ตรวจสอบว่าเลขบัตรประชาชนซ้ำหรือไม่ (รวมแถวที่ archive แล้ว)
+    existing_citizen = await _find_registration(
+        session, lambda model: model.citizen_id == registration.citizen_id
+    )
     
     if existing_citizen:
         raise HTTPException(
@@ -38,13 +57,13 @@ async def create_registration(
         )
     
     # ตรวจสอบว่าอีเมลซ้ำหรือไม่ (ทั้งใน Registration และ User table)
-    existing_email_registration = session.exec(
-        select(Registration).where(Registration.email == registration.email)
-    ).first()
+    existing_email_registration = await _find_registration(
+        session, lambda model: model.email == registration.email
+    )
     
-    existing_email_user = session.exec(
+    existing_email_user = (await session.exec(
         select(User).where(User.email == registration.email)
-    ).first()
+    )).first()
     
     if existing_email_registration or existing_email_user:
         raise HTTPException(
@@ -58,7 +77,7 @@ async def create_registration(
     
     new_user = User(
         username=username,
-        hashed_password=get_password_hash(registration.password),
+        hashed_password=await get_password_hash_async(registration.password),
         email=registration.email,
         full_name=full_name,
         role=UserRole.USER,  # กำหนดเป็น USER role
@@ -67,8 +86,8 @@ async def create_registration(
     )
     
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
     
     # สร้างข้อมูลการลงทะเบียนใหม่
     db_registration = Registration(
@@ -84,53 +103,41 @@ async def create_registration(
         district=registration.district,
         sub_district=registration.sub_district,
         postal_code=registration.postal_code,
-        target_provinces=json.dumps(registration.target_provinces, ensure_ascii=False),
-        interests=json.dumps(registration.interests, ensure_ascii=False) if registration.interests else None
+        target_provinces=registration.target_provinces,
+        interests=registration.interests or None
     )
     
     session.add(db_registration)
-    session.commit()
-    session.refresh(db_registration)
+    await session.commit()
+    await session.refresh(db_registration)
     
-    # Convert back for response
-    response_data = db_registration.model_dump()
-    response_data["target_provinces"] = json.loads(db_registration.target_provinces)
-    response_data["interests"] = json.loads(db_registration.interests) if db_registration.interests else None
-    
-    return RegistrationResponse(**response_data)
+    return registration_response.validate(db_registration)
 
 @router.get("/", response_model=List[RegistrationResponse])
 async def get_registrations(
     skip: int = 0, 
     limit: int = 100,
-    current_admin: User = Depends(require_admin_or_moderator),
-    session: Session = Depends(get_session)
+    current_admin: Principal = Depends(require_admin_or_moderator),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     ดูรายการการลงทะเบียนทั้งหมด (สำหรับ Admin/Moderator เท่านั้น)
     """
-    registrations = session.exec(
+    registrations = (await session.exec(
         select(Registration).offset(skip).limit(limit)
-    ).all()
-    
-    result = []
-    for reg in registrations:
-        reg_data = reg.model_dump()
-        reg_data["target_provinces"] = json.loads(reg.target_provinces)
-        reg_data["interests"] = json.loads(reg.interests) if reg.interests else None
-        result.append(RegistrationResponse(**reg_data))
+    )).all()
     
-    return result
+    return registration_response.many(registrations)
 
 @router.get("/{registration_id}", response_model=RegistrationResponse)
 async def get_registration(
     registration_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     ดูข้อมูลการลงทะเบียนตาม ID
     """
-    registration = session.get(Registration, registration_id)
+    registration = await session.get(Registration, registration_id)
     
     if not registration:
         raise HTTPException(
@@ -138,23 +145,17 @@ async def get_registration(
             detail="ไม่พบข้อมูลการลงทะเบียน"
         )
     
-    reg_data = registration.model_dump()
-    reg_data["target_provinces"] = json.loads(registration.target_provinces)
-    reg_data["interests"] = json.loads(registration.interests) if registration.interests else None
-    
-    return RegistrationResponse(**reg_data)
+    return registration_response.one(registration)
 
 @router.get("/citizen/{citizen_id}", response_model=RegistrationResponse)
 async def get_registration_by_citizen_id(
     citizen_id: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
-    ดูข้อมูลการลงทะเบียนตามเลขบัตรประชาชน
+    ดูข้อมูลการลงทะเบียนตามเลขบัตรประชาชน (รวมการลงทะเบียนที่ archive แล้ว)
     """
-    registration = session.exec(
-        select(Registration).where(Registration.citizen_id == citizen_id)
-    ).first()
+    registration = await _find_registration(session, lambda model: model.citizen_id == citizen_id)
     
     if not registration:
         raise HTTPException(
@@ -162,23 +163,85 @@ async def get_registration_by_citizen_id(
             detail="ไม่พบข้อมูลการลงทะเบียนสำหรับเลขบัตรประชาชนนี้"
         )
     
-    reg_data = registration.model_dump()
-    reg_data["target_provinces"] = json.loads(registration.target_provinces)
-    reg_data["interests"] = json.loads(registration.interests) if registration.interests else None
+    return registration_response.one(registration)
+
+async def _load_status(registration_id: int) -> Optional[dict]:
+    """สถานะปัจจุบันสำหรับ event แรกของ stream (session สั้น ๆ ไม่ถือ connection ไว้ตลอด stream)"""
+    async with get_database().session_router.session() as session:
+        registration = await _find_registration(session, lambda model: model.id == registration_id)
+    if registration is None:
+        return None
+    return status_payload(registration.id, registration.status, registration.approved_date)
+
+def _status_stream(registration_id: int, last_event_id: Optional[str]) -> StreamingResponse:
+    if not settings.status_stream_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="ไม่ได้เปิดใช้งานการแจ้งสถานะแบบ real-time"
+        )
+    resume_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    subscriber = status_broadcaster.subscribe(registration_id, resume_from)
+    if subscriber is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="มีผู้เชื่อมต่อมากเกินไป กรุณาลองใหม่ภายหลัง"
+        )
+    return StreamingResponse(
+        status_event_stream(status_broadcaster, subscriber, _load_status, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/{registration_id}/events")
+async def stream_registration_status(
+    registration_id: int,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    รับการเปลี่ยนสถานะการลงทะเบียนแบบ Server-Sent Events แทนการ poll ซ้ำ ๆ
+    event แรกคือสถานะปัจจุบัน; เชื่อมต่อใหม่พร้อม Last-Event-ID เพื่อรับ event ที่พลาดไป
+    """
+    registration = await _find_registration(session, lambda model: model.id == registration_id)
     
-    return RegistrationResponse(**reg_data)
+    if not registration:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="ไม่พบข้อมูลการลงทะเบียน"
+        )
+    
+    return _status_stream(registration.id, last_event_id)
+
+@router.get("/citizen/{citizen_id}/events")
+async def stream_registration_status_by_citizen_id(
+    citizen_id: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    รับการเปลี่ยนสถานะการลงทะเบียนตามเลขบัตรประชาชนแบบ Server-Sent Events
+    """
+    registration = await _find_registration(session, lambda model: model.citizen_id == citizen_id)
+    
+    if not registration:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="ไม่พบข้อมูลการลงทะเบียนสำหรับเลขบัตรประชาชนนี้"
+        )
+    
+    return _status_stream(registration.id, last_event_id)
 
 @router.put("/{registration_id}", response_model=RegistrationResponse)
 async def update_registration(
     registration_id: int, 
     registration_update: RegistrationUpdate,
     current_user: str = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     แก้ไขข้อมูลการลงทะเบียน
     """
-    registration = session.get(Registration, registration_id)
+    registration = await session.get(Registration, registration_id)
     
     if not registration:
         raise HTTPException(
@@ -188,38 +251,43 @@ async def update_registration(
     
     update_data = registration_update.model_dump(exclude_unset=True)
     
+    # อีเมลใหม่ต้องไม่ซ้ำกับการลงทะเบียนอื่น ทั้งในตารางหลักและ archive
+    new_email = update_data.get("email")
+    if new_email and new_email != registration.email:
+        if await _find_registration(session, lambda model: model.email == new_email):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="อีเมลนี้ได้ลงทะเบียนแล้ว"
+            )
+    
+    changes = diff(registration, update_data)
     for field, value in update_data.items():
         if value is not None:
-            if field == "target_provinces":
-                setattr(registration, field, json.dumps(value, ensure_ascii=False))
-            elif field == "interests":
-                setattr(registration, field, json.dumps(value, ensure_ascii=False) if value else None)
+            if field == "interests":
+                setattr(registration, field, value or None)
             else:
                 setattr(registration, field, value)
     
     registration.updated_at = datetime.utcnow()
     
     session.add(registration)
-    session.commit()
-    session.refresh(registration)
+    await session.commit()
+    await session.refresh(registration)
+    await audit_log.emit("registration", registration_id, "update", current_user, changes)
     
-    reg_data = registration.model_dump()
-    reg_data["target_provinces"] = json.loads(registration.target_provinces)
-    reg_data["interests"] = json.loads(registration.interests) if registration.interests else None
-    
-    return RegistrationResponse(**reg_data)
+    return registration_response.validate(registration)
 
 @router.patch("/{registration_id}/status", response_model=RegistrationResponse)
 async def update_registration_status(
     registration_id: int,
     status_update: RegistrationStatusUpdate,
-    current_admin: User = Depends(require_admin_or_moderator),
-    session: Session = Depends(get_session)
+    current_admin: Principal = Depends(require_admin_or_moderator),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     อัปเดตสถานะการลงทะเบียน (สำหรับ Admin/Moderator เท่านั้น)
     """
-    registration = session.get(Registration, registration_id)
+    registration = await session.get(Registration, registration_id)
     
     if not registration:
         raise HTTPException(
@@ -227,34 +295,36 @@ async def update_registration_status(
             detail="ไม่พบข้อมูลการลงทะเบียน"
         )
     
+    changes = {"status": [registration.status, status_update.status]}
     registration.status = status_update.status
     
     if status_update.status.value == "approved":
         registration.approved_date = datetime.utcnow()
         registration.approved_by = status_update.approved_by or current_admin.username
+        changes["approved_by"] = [None, registration.approved_by]
+    if status_update.notes:
+        changes["notes"] = [None, status_update.notes]
     
     registration.updated_at = datetime.utcnow()
     
     session.add(registration)
-    session.commit()
-    session.refresh(registration)
-    
-    reg_data = registration.model_dump()
-    reg_data["target_provinces"] = json.loads(registration.target_provinces)
-    reg_data["interests"] = json.loads(registration.interests) if registration.interests else None
+    await session.commit()
+    await session.refresh(registration)
+    await audit_log.emit("registration", registration_id, "status_change", current_admin.username, changes)
+    status_broadcaster.wake()
     
-    return RegistrationResponse(**reg_data)
+    return registration_response.validate(registration)
 
 @router.delete("/{registration_id}")
 async def delete_registration(
     registration_id: int,
-    current_admin: User = Depends(require_admin),
-    session: Session = Depends(get_session)
+    current_admin: Principal = Depends(require_admin),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     ลบการลงทะเบียน (สำหรับ Admin เท่านั้น)
     """
-    registration = session.get(Registration, registration_id)
+    registration = await session.get(Registration, registration_id)
     
     if not registration:
         raise HTTPException(
@@ -262,7 +332,8 @@ async def delete_registration(
             detail="ไม่พบข้อมูลการลงทะเบียน"
         )
     
-    session.delete(registration)
-    session.commit()
+    await session.delete(registration)
+    await session.commit()
+    await audit_log.emit("registration", registration_id, "delete", current_admin.username)
     
     return {"message": "ลบข้อมูลการลงทะเบียนเรียบร้อยแล้ว"}
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, Request, status, Depends, Query
 from typing import List, Optional
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from thaitour.schemas.tax_schema import (
     TaxBenefitCreate,
     TaxBenefitUpdate,
@@ -10,40 +11,43 @@ from thaitour.schemas.tax_schema import (
     TaxBenefitType
 )
 from thaitour.models.tax_model import TaxBenefit
+from thaitour.models.types import json_array_contains
 from thaitour.models.province_model import Province
-from thaitour.models.user_model import User
-from thaitour.models import get_session
-from thaitour.core.deps import get_current_user, require_admin, require_admin_or_moderator
+from thaitour.models import get_async_session
+from thaitour.core.catalog import catalog_loader, get_catalog, watch_catalog_model
+from thaitour.core.audit import audit_log, diff
+from thaitour.core.instrumentation import TimedAPIRoute
+from thaitour.core.serialization import JSONBytesResponse, ResponseSerializer
+from thaitour.core.singleflight import flight_session, request_flight, request_key
+from thaitour.core.deps import Principal, get_current_user, require_admin, require_admin_or_moderator
 from datetime import datetime
-import json
 
-router = APIRouter()
+router = APIRouter(route_class=TimedAPIRoute)
+
+benefit_response = ResponseSerializer(TaxBenefitResponse)
+
+watch_catalog_model(TaxBenefit)
 
 @router.post("/benefits", response_model=TaxBenefitResponse, status_code=status.HTTP_201_CREATED)
 async def create_tax_benefit(
     benefit: TaxBenefitCreate,
-    current_admin: User = Depends(require_admin),
-    session: Session = Depends(get_session)
+    current_admin: Principal = Depends(require_admin),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     เพิ่มสิทธิประโยชน์ลดหย่อนภาษีใหม่ (สำหรับ Admin เท่านั้น)
     """
-    # แปลง list เป็น JSON string
-    applicable_provinces_json = json.dumps(benefit.applicable_provinces) if benefit.applicable_provinces else None
-    eligible_activities_json = json.dumps(benefit.eligible_activities, ensure_ascii=False) if benefit.eligible_activities else None
-    required_documents_json = json.dumps(benefit.required_documents, ensure_ascii=False) if benefit.required_documents else None
-    
     db_benefit = TaxBenefit(
         benefit_name=benefit.benefit_name,
         benefit_type=benefit.benefit_type,
         description=benefit.description,
         province_id=benefit.province_id,
-        applicable_provinces=applicable_provinces_json,
+        applicable_provinces=benefit.applicable_provinces or None,
         reduction_percentage=benefit.reduction_percentage,
         max_reduction_amount=benefit.max_reduction_amount,
         min_spending_amount=benefit.min_spending_amount,
-        eligible_activities=eligible_activities_json,
-        required_documents=required_documents_json,
+        eligible_activities=benefit.eligible_activities or None,
+        required_documents=benefit.required_documents or None,
         start_date=benefit.start_date,
         end_date=benefit.end_date,
         is_active=True,
@@ -51,31 +55,22 @@ async def create_tax_benefit(
     )
     
     session.add(db_benefit)
-    session.commit()
-    session.refresh(db_benefit)
+    await session.commit()
+    await session.refresh(db_benefit)
     
-    # แปลง JSON string กลับเป็น list สำหรับ response
-    response_data = db_benefit.model_dump()
-    if db_benefit.applicable_provinces:
-        response_data["applicable_provinces"] = json.loads(db_benefit.applicable_provinces)
-    if db_benefit.eligible_activities:
-        response_data["eligible_activities"] = json.loads(db_benefit.eligible_activities)
-    if db_benefit.required_documents:
-        response_data["required_documents"] = json.loads(db_benefit.required_documents)
-    
-    return TaxBenefitResponse(**response_data)
+    return benefit_response.validate(db_benefit)
 
 @router.get("/benefits", response_model=List[TaxBenefitResponse])
 async def get_tax_benefits(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     benefit_type: Optional[TaxBenefitType] = Query(None, description="ประเภทสิทธิประโยชน์"),
     province_id: Optional[int] = Query(None, description="ID จังหวัด"),
-    is_active: Optional[bool] = Query(True, description="สถานะ"),
-    session: Session = Depends(get_session)
+    is_active: Optional[bool] = Query(True, description="สถานะ")
 ):
     """
-    ดูรายการสิทธิประโยชน์ลดหย่อนภาษี
+    ดูรายการสิทธิประโยชน์ลดหย่อนภาษี (request ที่เหมือนกันและมาพร้อมกันใช้ query เดียวกัน)
     """
     statement = select(TaxBenefit)
     
@@ -99,91 +94,65 @@ async def get_tax_benefits(
         # สิทธิประโยชน์ที่ใช้ได้กับจังหวัดนี้
         statement = statement.where(
             (TaxBenefit.province_id == province_id) |
-            (TaxBenefit.applicable_provinces.contains(str(province_id)))
+            json_array_contains(TaxBenefit.applicable_provinces, province_id)
         )
     
     # Add pagination
     statement = statement.offset(skip).limit(limit)
     
-    benefits = session.exec(statement).all()
+    async def load() -> bytes:
+        async with flight_session(request) as session:
+            benefits = (await session.exec(statement)).all()
+            return benefit_response.dumps_many(benefits)
     
-    # แปลง JSON string กลับเป็น list สำหรับ response
-    result = []
-    for benefit in benefits:
-        benefit_data = benefit.model_dump()
-        if benefit.applicable_provinces:
-            benefit_data["applicable_provinces"] = json.loads(benefit.applicable_provinces)
-        if benefit.eligible_activities:
-            benefit_data["eligible_activities"] = json.loads(benefit.eligible_activities)
-        if benefit.required_documents:
-            benefit_data["required_documents"] = json.loads(benefit.required_documents)
-        result.append(TaxBenefitResponse(**benefit_data))
-    
-    return result
+    return JSONBytesResponse(await request_flight.do(request_key(request), load))
 
-@router.get("/benefits/secondary-provinces", response_model=List[TaxBenefitResponse])
-async def get_secondary_province_benefits(session: Session = Depends(get_session)):
-    """
-    ดูสิทธิประโยชน์ลดหย่อนภาษีสำหรับจังหวัดรองโดยเฉพาะ
-    """
+@catalog_loader("tax:secondary-province-benefits")
+async def load_secondary_province_benefits(session: AsyncSession) -> bytes:
     current_date = datetime.utcnow()
     
-    secondary_benefits = session.exec(
+    secondary_benefits = (await session.exec(
         select(TaxBenefit).where(
             (TaxBenefit.benefit_type == TaxBenefitType.SECONDARY_PROVINCE) &
             (TaxBenefit.is_active == True) &
             (TaxBenefit.start_date <= current_date) &
             (TaxBenefit.end_date >= current_date)
         )
-    ).all()
+    )).all()
     
-    # แปลง JSON string กลับเป็น list สำหรับ response
-    result = []
-    for benefit in secondary_benefits:
-        benefit_data = benefit.model_dump()
-        if benefit.applicable_provinces:
-            benefit_data["applicable_provinces"] = json.loads(benefit.applicable_provinces)
-        if benefit.eligible_activities:
-            benefit_data["eligible_activities"] = json.loads(benefit.eligible_activities)
-        if benefit.required_documents:
-            benefit_data["required_documents"] = json.loads(benefit.required_documents)
-        result.append(TaxBenefitResponse(**benefit_data))
-    
-    return result
+    return benefit_response.dumps_many(secondary_benefits)
+
+@router.get("/benefits/secondary-provinces", response_model=List[TaxBenefitResponse])
+async def get_secondary_province_benefits():
+    """
+    ดูสิทธิประโยชน์ลดหย่อนภาษีสำหรับจังหวัดรองโดยเฉพาะ (cache ร่วมกันทุก request)
+    """
+    return JSONBytesResponse(await get_catalog("tax:secondary-province-benefits"))
 
 @router.get("/benefits/{benefit_id}", response_model=TaxBenefitResponse)
-async def get_tax_benefit(benefit_id: int, session: Session = Depends(get_session)):
+async def get_tax_benefit(benefit_id: int, session: AsyncSession = Depends(get_async_session)):
     """
     ดูข้อมูลสิทธิประโยชน์ลดหย่อนภาษีตาม ID
     """
-    benefit = session.get(TaxBenefit, benefit_id)
+    benefit = await session.get(TaxBenefit, benefit_id)
     if not benefit:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ไม่พบข้อมูลสิทธิประโยชน์"
         )
     
-    # แปลง JSON string กลับเป็น list สำหรับ response
-    benefit_data = benefit.model_dump()
-    if benefit.applicable_provinces:
-        benefit_data["applicable_provinces"] = json.loads(benefit.applicable_provinces)
-    if benefit.eligible_activities:
-        benefit_data["eligible_activities"] = json.loads(benefit.eligible_activities)
-    if benefit.required_documents:
-        benefit_data["required_documents"] = json.loads(benefit.required_documents)
-    
-    return TaxBenefitResponse(**benefit_data)
+    return benefit_response.one(benefit)
 
 @router.post("/calculate", response_model=TaxCalculationResponse)
 async def calculate_tax_reduction(
     calculation: TaxCalculationRequest, 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     คำนวณลดหย่อนภาษีตามการใช้จ่ายและจังหวัดที่เที่ยว
     """
     # ตรวจสอบว่าจังหวัดมีอยู่หรือไม่
-    province = session.get(Province, calculation.province_id)
+    province = await session.get(Province, calculation.province_id)
     if not province:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -201,13 +170,13 @@ async def calculate_tax_reduction(
     current_date = datetime.utcnow()
     
     # ดึงสิทธิประโยชน์ที่เปิดใช้งานและยังไม่หมดอายุ
-    benefits = session.exec(
+    benefits = (await session.exec(
         select(TaxBenefit).where(
             (TaxBenefit.is_active == True) &
             (TaxBenefit.start_date <= current_date) &
             (TaxBenefit.end_date >= current_date)
         )
-    ).all()
+    )).all()
     
     for benefit in benefits:
         # ตรวจสอบว่าจังหวัดมีสิทธิ์หรือไม่
@@ -216,8 +185,7 @@ async def calculate_tax_reduction(
         if benefit.province_id == calculation.province_id:
             is_applicable = True
         elif benefit.applicable_provinces:
-            applicable_provinces_list = json.loads(benefit.applicable_provinces)
-            if calculation.province_id in applicable_provinces_list:
+            if calculation.province_id in benefit.applicable_provinces:
                 is_applicable = True
         elif benefit.benefit_type == TaxBenefitType.SECONDARY_PROVINCE and is_secondary:
             is_applicable = True
@@ -247,13 +215,13 @@ async def calculate_tax_reduction(
 async def update_tax_benefit(
     benefit_id: int,
     benefit_update: TaxBenefitUpdate,
-    current_admin: User = Depends(require_admin),
-    session: Session = Depends(get_session)
+    current_admin: Principal = Depends(require_admin),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     แก้ไขสิทธิประโยชน์ลดหย่อนภาษี (สำหรับ Admin เท่านั้น)
     """
-    benefit = session.get(TaxBenefit, benefit_id)
+    benefit = await session.get(TaxBenefit, benefit_id)
     if not benefit:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -261,54 +229,39 @@ async def update_tax_benefit(
         )
     
     update_data = benefit_update.model_dump(exclude_unset=True)
+    changes = diff(benefit, update_data)
     
     for field, value in update_data.items():
         if value is not None:
-            if field == "applicable_provinces" and isinstance(value, list):
-                setattr(benefit, field, json.dumps(value))
-            elif field == "eligible_activities" and isinstance(value, list):
-                setattr(benefit, field, json.dumps(value, ensure_ascii=False))
-            elif field == "required_documents" and isinstance(value, list):
-                setattr(benefit, field, json.dumps(value, ensure_ascii=False))
-            else:
-                setattr(benefit, field, value)
+            setattr(benefit, field, value)
     
     benefit.updated_at = datetime.utcnow()
     
     session.add(benefit)
-    session.commit()
-    session.refresh(benefit)
-    
-    # แปลง JSON string กลับเป็น list สำหรับ response
-    benefit_data = benefit.model_dump()
-    if benefit.applicable_provinces:
-        benefit_data["applicable_provinces"] = json.loads(benefit.applicable_provinces)
-    if benefit.eligible_activities:
-        benefit_data["eligible_activities"] = json.loads(benefit.eligible_activities)
-    if benefit.required_documents:
-        benefit_data["required_documents"] = json.loads(benefit.required_documents)
-    
-    return TaxBenefitResponse(**benefit_data)
+    await session.commit()
+    await session.refresh(benefit)
+    await audit_log.emit("tax_benefit", benefit_id, "update", current_admin.username, changes)
     
-    return TaxBenefitResponse(**benefit)
+    return benefit_response.validate(benefit)
 
 @router.delete("/benefits/{benefit_id}")
 async def delete_tax_benefit(
     benefit_id: int,
-    current_admin: User = Depends(require_admin),
-    session: Session = Depends(get_session)
+    current_admin: Principal = Depends(require_admin),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     ลบสิทธิประโยชน์ลดหย่อนภาษี (สำหรับ Admin เท่านั้น)
     """
-    benefit = session.get(TaxBenefit, benefit_id)
+    benefit = await session.get(TaxBenefit, benefit_id)
     if not benefit:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ไม่พบข้อมูลสิทธิประโยชน์"
         )
     
-    session.delete(benefit)
-    session.commit()
+    await session.delete(benefit)
+    await session.commit()
+    await audit_log.emit("tax_benefit", benefit_id, "delete", current_admin.username)
     
     return {"message": "ลบข้อมูลสิทธิประโยชน์เรียบร้อยแล้ว"}
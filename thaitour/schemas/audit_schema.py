@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+from datetime import datetime
+
+class AuditEventResponse(BaseModel):
+    id: int
+    occurred_at: datetime
+    actor: Optional[str]
+    entity: str
+    entity_id: str
+    action: str
+    changes: Optional[dict[str, Any]]
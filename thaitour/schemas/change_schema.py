@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+from datetime import datetime
+from enum import Enum
+from thaitour.schemas.province_schema import ProvinceResponse
+from thaitour.schemas.registration_schema import RegistrationResponse
+from thaitour.schemas.tax_schema import TaxBenefitResponse
+
+class ChangeOperation(str, Enum):
+    UPSERT = "upsert"  # เพิ่มหรือแก้ไข: data คือข้อมูลปัจจุบัน
+    DELETE = "delete"  # tombstone: ข้อมูลถูกลบ
+
+class ChangeResponse(BaseModel):
+    seq: int
+    entity: str
+    entity_id: str
+    op: ChangeOperation
+    changed_at: datetime
+    data: Optional[Union[ProvinceResponse, TaxBenefitResponse, RegistrationResponse]] = None
+
+class ChangeFeedResponse(BaseModel):
+    changes: List[ChangeResponse]
+    next_cursor: int = Field(..., description="ส่งเป็น since ในการเรียกครั้งถัดไป")
+    has_more: bool